@@ -0,0 +1,3 @@
+"""
+Benchmarks for smpteparsers, run them from the root directory, eg. `python -m benchmarks.bench_flmx_memory`
+"""
@@ -0,0 +1,47 @@
+"""
+Validating a library of CPLs one at a time with CPL.validate against cpl.batch.parse_cpls.
+
+    python -m benchmarks.bench_cpl_batch --cpls 200 --reels 6
+"""
+import os, time, shutil, tempfile, multiprocessing
+from optparse import OptionParser
+
+from smpteparsers.cpl import CPL
+from smpteparsers.cpl.batch import parse_cpls
+
+from benchmarks.generators import make_cpl
+
+def one_at_a_time(paths):
+    for path in paths:
+        cpl = CPL(path)
+        cpl.validate()
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-c", "--cpls", dest="cpls", type="int", default=200, help="number of CPLs")
+    parser.add_option("-r", "--reels", dest="reels", type="int", default=6, help="reels per CPL")
+    options, args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        paths = []
+        for n in range(options.cpls):
+            path = os.path.join(tmp, "cpl-{0}.xml".format(n))
+            with open(path, 'wb') as f:
+                f.write(make_cpl(options.reels))
+            paths.append(path)
+
+        start = time.time()
+        one_at_a_time(paths)
+        print("{0:<28} {1:>8.2f}s".format("CPL + validate", time.time() - start))
+
+        for processes in sorted(set([1, 2, multiprocessing.cpu_count()])):
+            start = time.time()
+            results = list(parse_cpls(paths, processes=processes))
+            assert all(r.valid for r in results), [r.error for r in results if r.error][:1]
+            print("{0:<28} {1:>8.2f}s".format("parse_cpls, {0} process(es)".format(processes), time.time() - start))
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Micro-benchmarks for util.date_utils.parse_date.
+
+Times the fixed-format fast path, the general regex parser, and memoised repeat lookups of the
+same strings, which is what scanning a library of CPLs and KDMs mostly does.
+
+    python -m benchmarks.bench_dates --number 100000
+"""
+import timeit
+from optparse import OptionParser
+
+from smpteparsers.util import date_utils
+from smpteparsers.util.date_utils import parse_date
+
+DATES = [
+    '2013-02-19T15:57:55+00:00',
+    '2013-02-19T15:57:55-05:00',
+    '2013-02-19T15:57:55Z',
+    '2013-02-19T15:57:55',
+    '20130219T155755Z',
+    '2013-02-19T15:57:55.250+01:00',
+]
+
+def unique_dates(n):
+    """n distinct offset dates, so the memo never hits."""
+    return ['2013-{0:02d}-{1:02d}T{2:02d}:{3:02d}:{4:02d}+01:00'.format(
+        i % 12 + 1, i % 28 + 1, i % 24, i // 24 % 60, i // 1440 % 60) for i in range(n)]
+
+def run(label, func, number):
+    seconds = min(timeit.repeat(func, number=1, repeat=3))
+    print("{0:<40} {1:>10.2f} us/date {2:>12,.0f} dates/sec".format(label, seconds / number * 1e6, number / seconds))
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-n", "--number", dest="number", type="int", default=100000, help="dates parsed per run")
+    options, args = parser.parse_args()
+    number = options.number
+    uncached = parse_date.__wrapped__
+
+    for s in DATES:
+        fast = date_utils._parse_date_fast(s, True) is not None
+        repeated = [s] * number
+        print("{0!r} ({1})".format(s, "fast path" if fast else "general"))
+        run("  general parser", lambda: [date_utils._parse_date_general(d, True) for d in repeated], number)
+        run("  parse_date, uncached", lambda: [uncached(d) for d in repeated], number)
+        run("  parse_date, memoised", lambda: [parse_date(d) for d in repeated], number)
+
+    dates = unique_dates(number)
+    print("{0} distinct dates".format(number))
+    run("  general parser", lambda: [date_utils._parse_date_general(d, True) for d in dates], number)
+    run("  parse_date, uncached", lambda: [uncached(d) for d in dates], number)
+
+if __name__ == '__main__':
+    main()
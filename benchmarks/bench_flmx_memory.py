@@ -0,0 +1,74 @@
+"""
+Peak memory of FLM parsing on synthetic multi-megabyte FLMs.
+
+Compares the streaming FacilityParser against the previous approach of reading the whole
+response, validating it and then building a BeautifulSoup tree from it.
+
+    python -m benchmarks.bench_flmx_memory --auditoriums 50,200,800 --skip-schemas
+"""
+import os, shutil, tempfile
+from optparse import OptionParser
+
+from lxml import etree
+from bs4 import BeautifulSoup
+
+from smpteparsers.flmx import helper
+from smpteparsers.flmx.facility import FacilityParser, Auditorium
+
+from benchmarks.common import measure, format_bytes, skip_flmx_schemas
+from benchmarks.generators import iter_flm
+
+def parse_streaming(path):
+    with open(path, 'rb') as f:
+        FacilityParser(f)
+
+def parse_read_all(path, validate):
+    with open(path, 'rb') as f:
+        xml = f.read()
+    if validate:
+        xsd = os.path.join(os.path.dirname(helper.__file__), 'schema', 'schema_facility.xsd')
+        helper.get_schema(xsd).assertValid(etree.fromstring(xml))
+    soup = BeautifulSoup(xml, 'xml')
+    fp = FacilityParser.__new__(FacilityParser)
+    fp.setup_facility(soup)
+    fp.auditoriums = {}
+    for auditorium in soup('Auditorium'):
+        fp.add_auditorium(Auditorium(auditorium))
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-a", "--auditoriums", dest="auditoriums", default="50,200,800",
+                      help="comma separated auditorium counts to generate FLMs for")
+    parser.add_option("-d", "--devices", dest="devices", type="int", default=4, help="devices per auditorium")
+    parser.add_option("--skip-schemas", dest="skip_schemas", action="store_true", default=False,
+                      help="don't validate against the FLM-x schemas (they need network access)")
+    options, args = parser.parse_args()
+
+    if options.skip_schemas:
+        skip_flmx_schemas()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        print("{0:>12} {1:>10} {2:>14} {3:>14} {4:>10} {5:>10}".format(
+            "auditoriums", "size", "read+soup", "streaming", "read+soup", "streaming"))
+        for count in [int(a) for a in options.auditoriums.split(",")]:
+            path = os.path.join(tmp, "flm-{0}.xml".format(count))
+            with open(path, 'wb') as f:
+                for chunk in iter_flm(count, options.devices):
+                    f.write(chunk.encode("utf-8"))
+
+            old = measure(parse_read_all, path, not options.skip_schemas)
+            new = measure(parse_streaming, path)
+            for result in (old, new):
+                if "error" in result:
+                    raise SystemExit("Benchmark failed: " + result["error"])
+
+            print("{0:>12} {1:>10} {2:>14} {3:>14} {4:>9.2f}s {5:>9.2f}s".format(
+                count, format_bytes(os.path.getsize(path)),
+                format_bytes(old["peak_memory"]), format_bytes(new["peak_memory"]),
+                old["seconds"], new["seconds"]))
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Time to import each subpackage in a fresh interpreter, and which of the heavy dependencies
+it loads.
+
+    python -m benchmarks.bench_imports --runs 5
+    python -m benchmarks.bench_imports --only cpl,kdm
+"""
+import json, subprocess, sys
+from optparse import OptionParser
+
+MODULES = (
+    'smpteparsers.util',
+    'smpteparsers.assetmap',
+    'smpteparsers.pkl',
+    'smpteparsers.cpl',
+    'smpteparsers.kdm',
+    'smpteparsers.dcp',
+    'smpteparsers.library',
+    'smpteparsers.mxf',
+    'smpteparsers.subtitle',
+    'smpteparsers.playlist',
+    'smpteparsers.flmx',
+)
+
+HEAVY = ('lxml.etree', 'requests', 'bs4', 'jsonschema', 'asyncio', 'ssl', 'sqlite3')
+
+SCRIPT = """
+import json, sys, time
+start = time.time()
+import {module}
+elapsed = time.time() - start
+print(json.dumps([elapsed, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+def time_import(module):
+    """
+    Imports a module in a new interpreter, returning the seconds it took and the heavy
+    dependencies loaded.
+    """
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT.format(module=module, heavy=HEAVY)])
+    elapsed, loaded = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+    return elapsed, loaded
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-r", "--runs", dest="runs", type="int", default=5, help="imports of each module, the best is reported")
+    parser.add_option("--only", dest="only", default="", help="comma separated subpackages, e.g. cpl,kdm")
+    options, args = parser.parse_args()
+
+    modules = MODULES
+    if options.only:
+        modules = ["smpteparsers." + name for name in options.only.split(",")]
+
+    for module in modules:
+        try:
+            results = [time_import(module) for _ in range(options.runs)]
+        except subprocess.CalledProcessError:
+            print("{0:<24} {1:>10}".format(module, "failed"))
+            continue
+        best = min(elapsed for elapsed, _ in results)
+        print("{0:<24} {1:>8.1f} ms  {2}".format(module, best * 1000, " ".join(results[0][1])))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Validating and compiling a week of show playlists for a circuit, which share a small pool
+of CPLs. The playlist module is Python 2 only.
+
+    python -m benchmarks.bench_playlists --shows 500 --cpls 60 --events 12
+"""
+import random, time
+from optparse import OptionParser
+
+from smpteparsers.cpl import CPL
+from smpteparsers.playlist import Playlist, validate_playlists
+from smpteparsers.playlist.compiler import PlaylistCompiler
+
+from benchmarks.generators import make_cpl
+
+def make_playlist(cpls, events):
+    return Playlist({
+        "title": "Show",
+        "duration": 0,
+        "events": [{
+            "cpl_id": cpl.id,
+            "type": "composition",
+            "text": cpl.content_title_text,
+            "duration_in_frames": 0,
+            "duration_in_seconds": 0,
+            "edit_rate": [24, 1]
+        } for cpl in random.sample(cpls, events)]
+    }, validate=False)
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-s", "--shows", dest="shows", type="int", default=500, help="number of show playlists")
+    parser.add_option("-c", "--cpls", dest="cpls", type="int", default=60, help="number of distinct CPLs")
+    parser.add_option("-e", "--events", dest="events", type="int", default=12, help="events per show")
+    options, args = parser.parse_args()
+
+    cpls = []
+    for _ in range(options.cpls):
+        cpl = CPL()
+        cpl.fromstring(make_cpl(random.randint(1, 6)))
+        cpls.append(cpl)
+    playlists = [make_playlist(cpls, options.events) for _ in range(options.shows)]
+
+    start = time.time()
+    for playlist in playlists:
+        playlist.validate()
+    print("{0:<24} {1:>8.3f}s".format("Playlist.validate", time.time() - start))
+
+    start = time.time()
+    validate_playlists(playlists)
+    print("{0:<24} {1:>8.3f}s".format("validate_playlists", time.time() - start))
+
+    compiler = PlaylistCompiler(dict((cpl.id, cpl) for cpl in cpls))
+    start = time.time()
+    compiler.compile_all(playlists)
+    print("{0:<24} {1:>8.3f}s".format("first compile", time.time() - start))
+
+    start = time.time()
+    compiler.compile_all(playlists)
+    print("{0:<24} {1:>8.3f}s".format("cached", time.time() - start))
+
+    # One trailer is re-parsed, only the shows playing it are recompiled
+    cpls[0].fromstring(make_cpl(2))
+    start = time.time()
+    compiler.compile_all(playlists)
+    print("{0:<24} {1:>8.3f}s".format("one CPL changed", time.time() - start))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Parsing a subtitle document and finding the cues on screen, scanning every cue against
+SubtitleReel.active.
+
+    python -m benchmarks.bench_subtitles --cues 2000 --lookups 100000
+"""
+import io, random, time
+from optparse import OptionParser
+
+from smpteparsers.subtitle import parse_subtitles
+
+from benchmarks.generators import make_subtitles
+
+def scan_cues(reel, frame):
+    return [cue for cue in reel.cues if cue.start <= frame < cue.end]
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-c", "--cues", dest="cues", type="int", default=2000, help="cues in the document")
+    parser.add_option("-l", "--lookups", dest="lookups", type="int", default=100000, help="frames to look up")
+    options, args = parser.parse_args()
+
+    xml = make_subtitles(options.cues)
+    start = time.time()
+    reel = parse_subtitles(io.BytesIO(xml))
+    print("{0:<20} {1:>10.3f} sec ({2} cues, {3} KB)".format("parse", time.time() - start, len(reel), len(xml) // 1024))
+
+    end = reel.ends[-1]
+    frames = [random.randrange(end) for _ in range(options.lookups)]
+
+    scans = max(1, options.lookups // 100)
+    start = time.time()
+    for frame in frames[:scans]:
+        scan_cues(reel, frame)
+    print("{0:<20} {1:>10.0f} lookups/sec".format("scan cues", scans / (time.time() - start)))
+
+    start = time.time()
+    for frame in frames:
+        reel.active(frame)
+    print("{0:<20} {1:>10.0f} lookups/sec".format("reel.active", options.lookups / (time.time() - start)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Finding the reel and offset of a playback position, walking the reels against CPL.timeline.
+
+    python -m benchmarks.bench_timeline --reels 12 --lookups 100000
+"""
+import random, time
+from optparse import OptionParser
+
+from smpteparsers.cpl import CPL
+
+from benchmarks.generators import make_cpl
+
+def walk_reels(cpl, frame):
+    # What callers had to do before the timeline existed
+    start = 0
+    for reel in cpl.reels:
+        duration = cpl.assets[reel.picture.id].duration
+        if frame < start + duration:
+            return reel, frame - start
+        start += duration
+    raise IndexError(frame)
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-r", "--reels", dest="reels", type="int", default=12, help="reels in the CPL")
+    parser.add_option("-l", "--lookups", dest="lookups", type="int", default=100000, help="positions to look up")
+    options, args = parser.parse_args()
+
+    cpl = CPL()
+    cpl.fromstring(make_cpl(options.reels))
+    frames = [random.randrange(cpl.duration_in_frames) for _ in range(options.lookups)]
+
+    start = time.time()
+    for frame in frames:
+        walk_reels(cpl, frame)
+    print("{0:<20} {1:>10.0f} lookups/sec".format("walk reels", options.lookups / (time.time() - start)))
+
+    timeline = cpl.timeline
+    start = time.time()
+    for frame in frames:
+        timeline.locate(frame)
+    print("{0:<20} {1:>10.0f} lookups/sec".format("timeline.locate", options.lookups / (time.time() - start)))
+
+    start = time.time()
+    for frame in frames:
+        timeline.timecode(frame)
+    print("{0:<20} {1:>10.0f} lookups/sec".format("timeline.timecode", options.lookups / (time.time() - start)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Batch against one at a time timezone conversion in util.date_utils.
+
+Converts a week of showtimes every five minutes for a set of facility timezones.
+
+    python -m benchmarks.bench_timezones --weeks 1
+"""
+import time, datetime
+from optparse import OptionParser
+
+from smpteparsers.util import date_utils
+
+TIMEZONES = ['Europe/London', 'Europe/Berlin', 'America/New_York', 'America/Los_Angeles',
+             'Australia/Sydney', 'Asia/Kolkata']
+
+def timed(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-w", "--weeks", dest="weeks", type="int", default=1, help="weeks of showtimes per timezone")
+    options, args = parser.parse_args()
+
+    start = 1382745600 # 2013-10-26, across the European DST change
+    timestamps = list(range(start, start + options.weeks * 7 * 86400, 300))
+    local_datetimes = [datetime.datetime(2013, 10, 26) + datetime.timedelta(seconds=t - start) for t in timestamps]
+    count = len(timestamps) * len(TIMEZONES)
+
+    rows = [
+        ("posix -> local", lambda tz: [date_utils.posix_to_local_datetime(t, tz) for t in timestamps],
+                           lambda tz: date_utils.posix_to_local_datetimes(timestamps, tz)),
+        ("local -> posix", lambda tz: [date_utils.local_datetime_to_posix(d, tz) for d in local_datetimes],
+                           lambda tz: date_utils.local_datetimes_to_posix(local_datetimes, tz)),
+        ("tz offset", lambda tz: [date_utils.datetime_tz_offset(d, tz) for d in local_datetimes],
+                      lambda tz: date_utils.datetime_tz_offsets(local_datetimes, tz)),
+    ]
+
+    print("{0} conversions per run".format(count))
+    print("{0:<16} {1:>12} {2:>12} {3:>8}".format("", "scalar", "batch", "speedup"))
+    for label, scalar, batch in rows:
+        scalar_seconds = sum(timed(scalar, tz) for tz in TIMEZONES)
+        batch_seconds = sum(timed(batch, tz) for tz in TIMEZONES)
+        print("{0:<16} {1:>11.3f}s {2:>11.3f}s {3:>7.1f}x".format(
+            label, scalar_seconds, batch_seconds, scalar_seconds / batch_seconds))
+
+if __name__ == '__main__':
+    main()
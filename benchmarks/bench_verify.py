@@ -0,0 +1,56 @@
+"""
+Verifying a DCP with one truncated file, hashing every file in turn against the staged
+verify_dcp, which finds the truncated file from its size.
+
+    python -m benchmarks.bench_verify --files 20 --size 50
+"""
+import os, shutil, tempfile, time
+from optparse import OptionParser
+
+from smpteparsers.assetmap import AssetData
+from smpteparsers.pkl import PKLData, generate_hash
+from smpteparsers.dcp.verify import verify_dcp
+
+from benchmarks.generators import write_binary
+
+def hash_everything(dcp_path, assets, pkl_assets):
+    # What PKL.validate_hashes used to do, with the MXF files included
+    for asset_id, pkl_data in pkl_assets.items():
+        full_path = os.path.join(dcp_path, assets[asset_id].path)
+        if os.path.isfile(full_path) and generate_hash(full_path).decode("ascii") != pkl_data.file_hash:
+            return False
+    return True
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-f", "--files", dest="files", type="int", default=20, help="number of files in the DCP")
+    parser.add_option("-s", "--size", dest="size", type="int", default=50, help="size of each file in MB")
+    options, args = parser.parse_args()
+
+    dcp_path = tempfile.mkdtemp()
+    try:
+        assets, pkl_assets = {}, {}
+        for n in range(options.files):
+            name = "reel{0}.mxf".format(n)
+            full_path = os.path.join(dcp_path, name)
+            write_binary(full_path, options.size * 1024 * 1024)
+            assets[name] = AssetData(name, 1, 0, None)
+            pkl_assets[name] = PKLData(generate_hash(full_path).decode("ascii"), str(os.path.getsize(full_path)), "application/mxf")
+
+        # Truncate the last file, so hashing in order reads every other file first
+        with open(os.path.join(dcp_path, "reel{0}.mxf".format(options.files - 1)), 'r+b') as f:
+            f.truncate(options.size * 1024 * 1024 // 2)
+
+        start = time.time()
+        hash_everything(dcp_path, assets, pkl_assets)
+        print("{0:<20} {1:>10.4f}s".format("hash every file", time.time() - start))
+
+        start = time.time()
+        report = verify_dcp(dcp_path, assets, pkl_assets)
+        assert not report.ok
+        print("{0:<20} {1:>10.4f}s".format("verify_dcp", time.time() - start))
+    finally:
+        shutil.rmtree(dcp_path)
+
+if __name__ == '__main__':
+    main()
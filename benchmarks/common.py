@@ -0,0 +1,58 @@
+"""
+Shared helpers for the benchmarks.
+"""
+import os, sys, json, time, resource
+
+def _maxrss_bytes():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, OS X reports bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def measure(func, *args, **kwargs):
+    """
+    Runs func in a forked child process and returns a dict with its wall time in seconds and the
+    increase in peak resident memory in bytes. Running in a child keeps each measurement
+    independent of anything allocated by earlier ones.
+    """
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        status = 0
+        try:
+            # The child's high water mark starts at the RSS it inherited
+            baseline = _maxrss_bytes()
+            start = time.time()
+            func(*args, **kwargs)
+            result = {"seconds": time.time() - start, "peak_memory": _maxrss_bytes() - baseline}
+        except Exception as e:
+            result = {"error": repr(e)}
+            status = 1
+        os.write(w, json.dumps(result).encode("utf-8"))
+        os.close(w)
+        os._exit(status)
+
+    os.close(w)
+    chunks = []
+    while True:
+        chunk = os.read(r, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(r)
+    os.waitpid(pid, 0)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return "{0:.1f}{1}".format(n, unit)
+        n /= 1024.0
+
+def skip_flmx_schemas():
+    """
+    The FLM-x schemas import further schemas from flm.foxpico.com, so they can't be compiled
+    without access to it. This turns FLM-x validation off, for benchmarking the rest of the parse.
+    """
+    from smpteparsers.flmx import helper
+    helper.get_schema = lambda xsd: None
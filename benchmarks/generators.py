@@ -0,0 +1,325 @@
+"""
+Generators for synthetic documents of any size, for use in the benchmarks.
+"""
+import uuid
+
+FLM_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<FacilityListMessage xmlns="http://isdcf.com/2010/06/FLM" xmlns:ds="http://www.w3.org/2000/09/xmldsig#">
+  <MessageId>urn:uuid:{message_id}</MessageId>
+  <IssueDate>2013-07-19T09:24:10-10:00</IssueDate>
+  <FacilityInfo>
+    <FacilityID>urn:x-facilityID:example.com:{facility_id}</FacilityID>
+    <FacilityName>Benchmark Cinema</FacilityName>
+    <FacilityTimeZone>Europe/London</FacilityTimeZone>
+    <Circuit>Independent</Circuit>
+    <AddressList>
+      <Address>
+        <Physical>
+          <StreetAddress>A Street</StreetAddress>
+          <City>A City</City>
+          <Province>A Province</Province>
+          <Country>GB</Country>
+        </Physical>
+      </Address>
+    </AddressList>
+  </FacilityInfo>
+  <AuditoriumList>
+"""
+
+FLM_AUDITORIUM = """    <Auditorium>
+      <AuditoriumNumber>{number}</AuditoriumNumber>
+      <Supports35MM>false</Supports35MM>
+      <ScreenAspectRatio>1.85</ScreenAspectRatio>
+      <AudioFormat>5.1</AudioFormat>
+      <DeviceGroupList>
+        <DeviceGroup>
+{devices}        </DeviceGroup>
+      </DeviceGroupList>
+    </Auditorium>
+"""
+
+FLM_DEVICE = """          <Device>
+            <DeviceTypeID>PLY</DeviceTypeID>
+            <DeviceIdentifier idtype="DeviceUID">urn:uuid:{device_id}</DeviceIdentifier>
+            <DeviceSerial>{serial}</DeviceSerial>
+            <ManufacturerName>Manufacturer</ManufacturerName>
+            <ModelNumber>Model</ModelNumber>
+            <IsActive>true</IsActive>
+            <KeyInfoList>
+              <ds:KeyInfo>
+                <ds:X509Data>
+                  <ds:X509SubjectName>CN=SM.ca.example.com,O=ca.example.com,OU=ca.example.com,dnQualifier={thumbprint}</ds:X509SubjectName>
+                  <ds:X509Certificate>{certificate}</ds:X509Certificate>
+                </ds:X509Data>
+              </ds:KeyInfo>
+            </KeyInfoList>
+          </Device>
+"""
+
+FLM_FOOTER = """  </AuditoriumList>
+</FacilityListMessage>
+"""
+
+# Roughly the size of a base64 encoded device certificate
+CERTIFICATE = "MIIE" + "A" * 1600
+
+def iter_flm(auditoriums, devices=4, facility_id=1):
+    """
+    Yields the chunks of an FLM with the given number of auditoriums, each with `devices` devices
+    holding one certificate each.
+    """
+    yield FLM_HEADER.format(message_id=uuid.uuid4(), facility_id=facility_id)
+    for number in range(1, auditoriums + 1):
+        device_xml = "".join(
+            FLM_DEVICE.format(device_id=uuid.uuid4(), serial=d, thumbprint="%028d=" % (number * 1000 + d),
+                              certificate=CERTIFICATE)
+            for d in range(devices)
+        )
+        yield FLM_AUDITORIUM.format(number=number, devices=device_xml)
+    yield FLM_FOOTER
+
+def make_flm(auditoriums, devices=4, facility_id=1):
+    return "".join(iter_flm(auditoriums, devices, facility_id)).encode("utf-8")
+
+SITELIST_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<SiteList xmlns="http://isdcf.com/2010/04/SiteList" xmlns:xlink="http://www.w3.org/1999/xlink">
+  <Originator>http://example.com/sites.xml</Originator>
+  <SystemName>Benchmark</SystemName>
+  <DateTimeCreated>2013-07-19T09:24:10-10:00</DateTimeCreated>
+  <FacilityList>
+"""
+
+SITELIST_FACILITY = """    <Facility id="example.com:{n}" modified="2013-07-19T09:24:10-10:00" xlink:href="flm/{n}.xml" xlink:type="simple"/>
+"""
+
+SITELIST_FOOTER = """  </FacilityList>
+</SiteList>
+"""
+
+def make_sitelist(facilities):
+    """
+    Returns a site list linking to the given number of facilities.
+    """
+    body = "".join(SITELIST_FACILITY.format(n=n) for n in range(facilities))
+    return (SITELIST_HEADER + body + SITELIST_FOOTER).encode("utf-8")
+
+ASSETMAP_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<AssetMap xmlns="http://www.digicine.com/PROTO-ASDCP-AM-20040311#">
+  <Id>urn:uuid:{id}</Id>
+  <AnnotationText>Benchmark ASSETMAP</AnnotationText>
+  <VolumeCount>1</VolumeCount>
+  <IssueDate>2013-05-28T10:47:08+00:00</IssueDate>
+  <Issuer>Benchmark</Issuer>
+  <Creator>Benchmark</Creator>
+  <AssetList>
+"""
+
+ASSETMAP_ASSET = """    <Asset>
+      <Id>urn:uuid:{id}</Id>
+      <ChunkList>
+        <Chunk>
+          <Path>{id}.mxf</Path>
+          <VolumeIndex>1</VolumeIndex>
+          <Offset>0</Offset>
+          <Length>{length}</Length>
+        </Chunk>
+      </ChunkList>
+    </Asset>
+"""
+
+ASSETMAP_FOOTER = """  </AssetList>
+</AssetMap>
+"""
+
+def make_assetmap(assets):
+    """
+    Returns an ASSETMAP listing the given number of assets.
+    """
+    body = "".join(ASSETMAP_ASSET.format(id=uuid.uuid4(), length=1000000 + n) for n in range(assets))
+    return (ASSETMAP_HEADER.format(id=uuid.uuid4()) + body + ASSETMAP_FOOTER).encode("utf-8")
+
+PKL_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<PackingList xmlns="http://www.digicine.com/PROTO-ASDCP-PKL-20040311#">
+  <Id>urn:uuid:{id}</Id>
+  <AnnotationText>Benchmark PKL</AnnotationText>
+  <IssueDate>2013-05-28T10:47:08+00:00</IssueDate>
+  <Issuer>Benchmark</Issuer>
+  <Creator>Benchmark</Creator>
+  <AssetList>
+"""
+
+PKL_ASSET = """    <Asset>
+      <Id>urn:uuid:{id}</Id>
+      <Hash>Hx9iKr8Kr2vFzz8e6JkZ2yJ1Xsc=</Hash>
+      <Size>{size}</Size>
+      <Type>application/x-smpte-mxf;asdcpKind=Picture</Type>
+    </Asset>
+"""
+
+PKL_FOOTER = """  </AssetList>
+</PackingList>
+"""
+
+def make_pkl(assets):
+    """
+    Returns a PKL listing the given number of assets.
+    """
+    body = "".join(PKL_ASSET.format(id=uuid.uuid4(), size=1000000 + n) for n in range(assets))
+    return (PKL_HEADER.format(id=uuid.uuid4()) + body + PKL_FOOTER).encode("utf-8")
+
+CPL_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<CompositionPlaylist xmlns="http://www.smpte-ra.org/schemas/429-7/2006/CPL">
+  <Id>urn:uuid:{id}</Id>
+  <AnnotationText>Benchmark CPL</AnnotationText>
+  <IssueDate>2013-02-19T15:57:55+00:00</IssueDate>
+  <Issuer>Benchmark</Issuer>
+  <Creator>Benchmark</Creator>
+  <ContentTitleText>Benchmark CPL</ContentTitleText>
+  <ContentKind>feature</ContentKind>
+  <ContentVersion>
+    <Id>urn:uuid:{id}</Id>
+    <LabelText>Benchmark CPL</LabelText>
+  </ContentVersion>
+  <RatingList/>
+  <ReelList>
+"""
+
+CPL_REEL = """    <Reel>
+      <Id>urn:uuid:{id}</Id>
+      <AssetList>
+        <MainPicture>
+          <Id>urn:uuid:{picture_id}</Id>
+          <EditRate>24 1</EditRate>
+          <IntrinsicDuration>{duration}</IntrinsicDuration>
+          <EntryPoint>0</EntryPoint>
+          <Duration>{duration}</Duration>
+          <FrameRate>24 1</FrameRate>
+          <ScreenAspectRatio>1998 1080</ScreenAspectRatio>
+        </MainPicture>
+        <MainSound>
+          <Id>urn:uuid:{sound_id}</Id>
+          <EditRate>24 1</EditRate>
+          <IntrinsicDuration>{duration}</IntrinsicDuration>
+          <EntryPoint>0</EntryPoint>
+          <Duration>{duration}</Duration>
+        </MainSound>
+      </AssetList>
+    </Reel>
+"""
+
+CPL_FOOTER = """  </ReelList>
+</CompositionPlaylist>
+"""
+
+def make_cpl(reels, duration=24 * 60 * 20):
+    """
+    Returns a CPL with the given number of reels, each with a picture and a sound asset.
+    """
+    body = "".join(CPL_REEL.format(id=uuid.uuid4(), picture_id=uuid.uuid4(), sound_id=uuid.uuid4(), duration=duration)
+                   for _ in range(reels))
+    return (CPL_HEADER.format(id=uuid.uuid4()) + body + CPL_FOOTER).encode("utf-8")
+
+SUBTITLE_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<DCSubtitle Version="1.0">
+  <SubtitleID>{id}</SubtitleID>
+  <MovieTitle>Benchmark</MovieTitle>
+  <ReelNumber>1</ReelNumber>
+  <Language>English</Language>
+  <LoadFont Id="Font1" URI="font.ttf"/>
+  <Font Id="Font1" Size="42">
+"""
+
+SUBTITLE_CUE = """    <Subtitle SpotNumber="{n}" TimeIn="{time_in}" TimeOut="{time_out}" FadeUpTime="20" FadeDownTime="20">
+      <Text VAlign="bottom" VPosition="16">Subtitle number {n}, the first line</Text>
+      <Text VAlign="bottom" VPosition="10">and the second line of it</Text>
+    </Subtitle>
+"""
+
+SUBTITLE_FOOTER = """  </Font>
+</DCSubtitle>
+"""
+
+def _interop_time(ticks):
+    seconds, ticks = divmod(ticks, 250)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{0:02d}:{1:02d}:{2:02d}:{3:03d}".format(hours, minutes, seconds, ticks)
+
+def make_subtitles(cues):
+    """
+    Returns an Interop subtitle document with the given number of cues, each shown for three
+    seconds with a second between them.
+    """
+    body = "".join(SUBTITLE_CUE.format(n=n + 1, time_in=_interop_time(n * 1000), time_out=_interop_time(n * 1000 + 750))
+                   for n in range(cues))
+    return (SUBTITLE_HEADER.format(id=uuid.uuid4()) + body + SUBTITLE_FOOTER).encode("utf-8")
+
+KDM_HEADER = """<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
+<DCinemaSecurityMessage xmlns="{etm_ns}" xmlns:dsig="http://www.w3.org/2000/09/xmldsig#" xmlns:enc="http://www.w3.org/2001/04/xmlenc#">
+  <AuthenticatedPublic Id="ID_AuthenticatedPublic">
+    <MessageId>urn:uuid:{id}</MessageId>
+    <MessageType>{etm_ns}</MessageType>
+    <AnnotationText>Benchmark KDM</AnnotationText>
+    <IssueDate>2012-11-22T11:20:04+00:00</IssueDate>
+    <Signer>
+      <dsig:X509IssuerName>dnQualifier=vVfvxXz1gOzEDwm2NoiJtcy4REQ=,CN=.example.com,O=.example.com</dsig:X509IssuerName>
+      <dsig:X509SerialNumber>38981</dsig:X509SerialNumber>
+    </Signer>
+    <RequiredExtensions>
+{extensions_open}        <CompositionPlaylistId>urn:uuid:{cpl_id}</CompositionPlaylistId>
+        <ContentTitleText>Benchmark CPL</ContentTitleText>
+        <ContentKeysNotValidBefore>2012-06-08T00:00:00+00:00</ContentKeysNotValidBefore>
+        <ContentKeysNotValidAfter>2019-01-01T23:59:00+00:00</ContentKeysNotValidAfter>
+        <KeyIdList>
+{key_ids}        </KeyIdList>
+{extensions_close}    </RequiredExtensions>
+    <NonCriticalExtensions/>
+  </AuthenticatedPublic>
+  <AuthenticatedPrivate Id="ID_AuthenticatedPrivate">
+{encrypted_keys}  </AuthenticatedPrivate>
+</DCinemaSecurityMessage>
+"""
+
+KDM_KEY_ID = """          <TypedKeyId>
+            <KeyType>MDIK</KeyType>
+            <KeyId>urn:uuid:{id}</KeyId>
+          </TypedKeyId>
+"""
+
+KDM_ENCRYPTED_KEY = """    <enc:EncryptedKey>
+      <enc:CipherData>
+        <enc:CipherValue>{cipher}</enc:CipherValue>
+      </enc:CipherData>
+    </enc:EncryptedKey>
+"""
+
+KDM_SMPTE_NS = "http://www.smpte-ra.org/schemas/430-3/2006/ETM"
+KDM_INTEROP_NS = "http://www.digicine.com/PROTO-ASDCP-KDM-20040311#"
+
+def make_kdm(keys=8, smpte=True):
+    """
+    Returns a SMPTE or interop KDM carrying the given number of content keys.
+    """
+    if smpte:
+        extensions_open = '      <KDMRequiredExtensions xmlns="http://www.smpte-ra.org/schemas/430-1/2006/KDM">\n'
+        extensions_close = '      </KDMRequiredExtensions>\n'
+    else:
+        extensions_open = extensions_close = ''
+    return KDM_HEADER.format(
+        etm_ns=KDM_SMPTE_NS if smpte else KDM_INTEROP_NS,
+        id=uuid.uuid4(), cpl_id=uuid.uuid4(),
+        extensions_open=extensions_open, extensions_close=extensions_close,
+        key_ids="".join(KDM_KEY_ID.format(id=uuid.uuid4()) for _ in range(keys)),
+        encrypted_keys="".join(KDM_ENCRYPTED_KEY.format(cipher="A" * 344) for _ in range(keys)),
+    ).encode("utf-8")
+
+def write_binary(path, size, chunk_size=1048576):
+    """
+    Writes a file of the given size in bytes, filled with a repeating byte pattern, for hashing.
+    """
+    block = bytearray(range(256)) * (chunk_size // 256)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
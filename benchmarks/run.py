@@ -0,0 +1,175 @@
+"""
+Throughput and peak memory of every parser, and of the hash path, on synthetic documents.
+
+Each case is run with each of its backends (the kinds of source passed to the parser, or
+alternative implementations) in a forked child, and reports documents/sec, MB/sec and the
+increase in peak memory.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --only cpl,pkl --scale 10 --json results.json
+    python -m benchmarks.run --skip-schemas   # FLM-x schemas need network access
+"""
+import os, sys, mmap, json, shutil, tempfile, platform
+from optparse import OptionParser
+
+from lxml import etree
+
+from smpteparsers.assetmap import Assetmap
+from smpteparsers.pkl import PKL, generate_hash
+from smpteparsers.cpl import CPL
+from smpteparsers.kdm import KDM
+from smpteparsers.flmx.sitelist import SiteListParser
+from smpteparsers.flmx.facility import FacilityParser
+
+from benchmarks import generators
+from benchmarks.common import measure, format_bytes, skip_flmx_schemas
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def source_backends(parse, paths=True):
+    """
+    The same parser fed a path, the document as bytes, an open file and an mmap.
+    The FLM-x parsers don't take paths, so those pass paths=False.
+
+    Each backend takes the document path and number of runs, and returns the function to time.
+    Bytes are read before timing starts, files are opened as part of each run.
+    """
+    def from_path(path, number):
+        def run():
+            for _ in range(number):
+                parse(path)
+        return run
+
+    def from_bytes(path, number):
+        data = _read(path)
+        def run():
+            for _ in range(number):
+                parse(data)
+        return run
+
+    def from_file(path, number):
+        def run():
+            for _ in range(number):
+                with open(path, 'rb') as f:
+                    parse(f)
+        return run
+
+    def from_mmap(path, number):
+        def run():
+            for _ in range(number):
+                with open(path, 'rb') as f:
+                    m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        parse(m)
+                    finally:
+                        m.close()
+        return run
+
+    backends = [("bytes", from_bytes), ("file", from_file), ("mmap", from_mmap)]
+    return [("path", from_path)] + backends if paths else backends
+
+def flm_read_all(path, number):
+    """
+    The previous FLM parser: read the whole document and build a BeautifulSoup tree from it.
+    """
+    from benchmarks.bench_flmx_memory import parse_read_all
+    def run():
+        for _ in range(number):
+            parse_read_all(path, False)
+    return run
+
+def hash_backends():
+    def from_path(path, number):
+        def run():
+            for _ in range(number):
+                generate_hash(path)
+        return run
+    return [("generate_hash", from_path)]
+
+def cases(scale, hash_size):
+    """
+    (name, function to write the document to a path, number of runs, backends) for each case.
+    """
+    def write(data):
+        def writer(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+        return writer
+
+    return [
+        ("assetmap", write(generators.make_assetmap(1000 * scale)), 5, source_backends(Assetmap)),
+        ("pkl", write(generators.make_pkl(1000 * scale)), 5, source_backends(PKL)),
+        ("cpl", write(generators.make_cpl(50 * scale)), 20, source_backends(CPL)),
+        ("kdm-smpte", write(generators.make_kdm(16 * scale, smpte=True)), 200, source_backends(KDM)),
+        ("kdm-interop", write(generators.make_kdm(16 * scale, smpte=False)), 200, source_backends(KDM)),
+        ("sitelist", write(generators.make_sitelist(2000 * scale)), 5, source_backends(SiteListParser, paths=False)),
+        ("flm", write(generators.make_flm(100 * scale)), 3,
+         source_backends(FacilityParser, paths=False) + [("read+soup", flm_read_all)]),
+        ("hash", lambda path: generators.write_binary(path, hash_size), 1, hash_backends()),
+    ]
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-o", "--only", dest="only", default="", help="comma separated cases to run")
+    parser.add_option("-s", "--scale", dest="scale", type="int", default=1, help="multiply document sizes by this")
+    parser.add_option("--hash-size", dest="hash_size", type="int", default=64, help="size of the hashed file in MB")
+    parser.add_option("--json", dest="json", default=None, help="write the results as JSON to this file ('-' for stdout)")
+    parser.add_option("--skip-schemas", dest="skip_schemas", action="store_true", default=False,
+                      help="don't validate against the FLM-x schemas (they need network access)")
+    options, args = parser.parse_args()
+
+    if options.skip_schemas:
+        skip_flmx_schemas()
+
+    only = set(filter(None, options.only.split(",")))
+    out = sys.stderr if options.json == "-" else sys.stdout
+    results = []
+
+    tmp = tempfile.mkdtemp()
+    try:
+        out.write("{0:<12} {1:<14} {2:>10} {3:>12} {4:>10} {5:>12}\n".format(
+            "case", "backend", "size", "docs/sec", "MB/sec", "peak memory"))
+        for name, write, number, backends in cases(options.scale, options.hash_size * 1048576):
+            if only and name not in only:
+                continue
+            path = os.path.join(tmp, name)
+            write(path)
+            size = os.path.getsize(path)
+
+            for backend_name, backend in backends:
+                result = measure(backend(path, number))
+                row = {
+                    "case": name, "backend": backend_name, "documents": number, "document_size": size,
+                }
+                if "error" in result:
+                    row["error"] = result["error"]
+                    out.write("{0:<12} {1:<14} {2:>10} {3}\n".format(name, backend_name, format_bytes(size), result["error"]))
+                else:
+                    seconds = max(result["seconds"], 1e-9)
+                    row.update(seconds=result["seconds"], docs_per_sec=number / seconds,
+                               mb_per_sec=number * size / 1048576.0 / seconds, peak_memory=result["peak_memory"])
+                    out.write("{0:<12} {1:<14} {2:>10} {3:>12.1f} {4:>10.1f} {5:>12}\n".format(
+                        name, backend_name, format_bytes(size), row["docs_per_sec"], row["mb_per_sec"],
+                        format_bytes(row["peak_memory"])))
+                results.append(row)
+    finally:
+        shutil.rmtree(tmp)
+
+    if options.json:
+        report = {
+            "python": platform.python_version(),
+            "lxml": ".".join(str(v) for v in etree.LXML_VERSION),
+            "platform": platform.platform(),
+            "scale": options.scale,
+            "results": results,
+        }
+        if options.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+        else:
+            with open(options.json, 'w') as f:
+                json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from distutils.core import setup
+from setuptools import setup
 from smpteparsers import __version__
 
 setup(
@@ -8,7 +8,34 @@ setup(
     author = 'Arts Alliance Media',
     author_email = 'dev@artsalliancemedia.com',
     url = 'http://www.artsalliancemedia.com',
-    packages = ('smpteparsers',),
-    requires = ('beautifulsoup4==4.2.1', 'lxml==3.2.1', 'requests==1.2.3', 'jsonschema==2.3.0', 'pytz'),
-    extras_require = {"docs": ("sphinx",)}
+    packages = (
+        'smpteparsers',
+        'smpteparsers.assetmap',
+        'smpteparsers.cpl',
+        'smpteparsers.dcp',
+        'smpteparsers.flmx',
+        'smpteparsers.kdm',
+        'smpteparsers.library',
+        'smpteparsers.mxf',
+        'smpteparsers.pkl',
+        'smpteparsers.playlist',
+        'smpteparsers.subtitle',
+        'smpteparsers.util',
+    ),
+    package_data = {
+        'smpteparsers.assetmap': ['*.xsd'],
+        'smpteparsers.cpl': ['*.xsd'],
+        'smpteparsers.flmx': ['schema/*.xsd'],
+        'smpteparsers.kdm': ['xsd/*.xsd'],
+        'smpteparsers.pkl': ['*.xsd'],
+        'smpteparsers.playlist': ['schema.json'],
+    },
+    # The DCP parsers only need these. FLM-x and playlists have their own dependencies, which
+    # are imported when they're first used.
+    install_requires = ('lxml==3.2.1', 'pytz'),
+    extras_require = {
+        "docs": ("sphinx",),
+        "flmx": ("beautifulsoup4==4.2.1", "requests==1.2.3"),
+        "playlist": ("jsonschema==2.3.0",),
+    }
 )
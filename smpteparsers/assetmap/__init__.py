@@ -1,12 +1,13 @@
 import os
-from lxml import etree
 try:
     import xml.etree.cElementTree as ET
 except ImportError:
     import xml.etree.ElementTree as ET
 
 from smpteparsers.util.date_utils import parse_date
-from smpteparsers.util import get_element, get_element_text, get_element_iterator, get_namespace, validate_xml, create_child_element
+from smpteparsers.util import get_namespace, validate_xml, create_child_element, profiling
+from smpteparsers.util.fields import Field, FieldMap, FieldError, urn_uuid
+from smpteparsers.util.files import DirectoryListing
 
 class AssetmapError(Exception):
     pass
@@ -14,11 +15,39 @@ class AssetmapValidationError(AssetmapError):
     pass
 
 class Assetmap(object):
+    """
+    Parses an ASSETMAP.
+
+    :param path: path of the ASSETMAP, or any other source accepted by smpteparsers.util.parse_xml
+        (bytes, a memoryview or mmap, or a binary file object).
+    """
+    fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("AnnotationText", "annotation_text"),
+        Field("VolumeCount", "volume_count", convert=int, required=True),
+        Field("IssueDate", "issue_date", convert=parse_date, required=True),
+        Field("Issuer", "issuer"),
+        Field("Creator", "creator"),
+        Field("AssetList", "asset_list", element=True, required=True),
+    )
+    asset_fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("ChunkList", "chunk_lists", element=True, many=True),
+    )
+    chunk_fields = FieldMap(
+        Field("Path", "path"),
+        Field("VolumeIndex", "volume_index", convert=int),
+        Field("Offset", "offset", convert=int),
+        Field("Length", "length", convert=int),
+    )
+
     def __init__(self, path, parse=True):
         self.path = path
 
-        # A list of the assets contained in the DCP.
+        # A list of the assets contained in the DCP, with the first chunk of each.
         self.assets = {}
+        # Every chunk of each asset, in order of offset
+        self.chunks = {}
 
         if parse:
             self.parse()
@@ -61,64 +90,81 @@ class Assetmap(object):
         files against the paths from the ASSETMAP file.
         """
         try:
-            self.validate()
+            # Validated while it's parsed, so the document is only read once
+            with profiling.span("assetmap.parse"):
+                root = self.validate()
         except Exception as e:
             raise AssetmapError(e)
 
-        tree = ET.parse(self.path)
-        root = tree.getroot()
         # ElementTree prepends the namespace to all elements, so we need to extract
         # it so that we can perform sensible searching on elements.
         assetmap_ns = get_namespace(root.tag)
 
-        self.id = get_element_text(root, "Id", assetmap_ns).split(":")[2]
-        self.annotation_text = get_element_text(root, "AnnotationText", assetmap_ns)
-        self.volume_count = int(get_element_text(root, "VolumeCount", assetmap_ns))
-        self.issue_date = parse_date(get_element_text(root, "IssueDate", assetmap_ns))
-        self.issuer = get_element_text(root, "Issuer", assetmap_ns)
-        self.creator = get_element_text(root, "Creator", assetmap_ns)
-
-        asset_list = get_element(root, "AssetList", assetmap_ns)
-        # Get the data from the ASSETMAP file
-        for asset in asset_list.getchildren():
-            asset_id = get_element_text(asset, "Id", assetmap_ns).split(":")[2]
-            for chunklist in get_element_iterator(asset, "ChunkList", assetmap_ns):
-                """
-                The code below assumes that there will only ever be one chunk in a chunklist. Chunking is
-                used to split files up into smaller parts, usually in order to provide compatability with older
-                filesystems, which is not applicable for our uses.
-                """
-                for chunk in chunklist.getchildren():
-                    v = get_element_text(chunk, "VolumeIndex", assetmap_ns)
-                    o = get_element_text(chunk, "Offset", assetmap_ns)
-                    l = get_element_text(chunk, "Length", assetmap_ns)
-
-                    a = {
-                        "path": get_element_text(chunk, "Path", assetmap_ns),
-                        "volume_index": int(v) if v is not None else v,
-                        "offset": int(o) if o is not None else o,
-                        "length": int(l) if l is not None else l
-                    }
-
-                    self.assets[asset_id] = AssetData(**a)
+        with profiling.span("assetmap.build"):
+            try:
+                values = self.fields.extract(root, assetmap_ns)
+                self.id = values["id"]
+                self.annotation_text = values["annotation_text"]
+                self.volume_count = values["volume_count"]
+                self.issue_date = values["issue_date"]
+                self.issuer = values["issuer"]
+                self.creator = values["creator"]
+
+                # Get the data from the ASSETMAP file
+                for asset in values["asset_list"]:
+                    asset_fields = self.asset_fields.extract(asset, assetmap_ns)
+                    chunks = []
+                    for chunklist in asset_fields["chunk_lists"]:
+                        for chunk in chunklist:
+                            chunks.append(AssetData(**self.chunk_fields.extract(chunk, assetmap_ns)))
+                    if chunks:
+                        # Chunking splits an asset into several files, usually to fit the file size
+                        # limit of older filesystems. Most assets have just the one.
+                        chunks.sort(key=lambda chunk: chunk.offset or 0)
+                        self.chunks[asset_fields["id"]] = chunks
+                        self.assets[asset_fields["id"]] = chunks[0]
+            except FieldError as e:
+                raise AssetmapError(e)
+        profiling.count("assetmap.assets", len(self.assets))
+
+    def is_chunked(self, asset_id):
+        return len(self.chunks[asset_id]) > 1
+
+    def open(self, asset_id, dcp_path, volumes=None):
+        """
+        Opens an asset for reading as one seekable binary stream, however many chunks it's split
+        into. See smpteparsers.assetmap.chunks.ChunkedAssetReader.
+
+        :param dcp_path: directory the chunk paths are relative to
+        :param volumes: dict of volume index to directory, for assets split across volumes
+        """
+        from smpteparsers.assetmap.chunks import ChunkedAssetReader
+        return ChunkedAssetReader(self.chunks[asset_id], dcp_path, volumes)
 
     def validate(self, schema=os.path.join(os.path.dirname(__file__), 'am.xsd')):
         """
         Call the validate_xml function in util to validate the xml file against the schema.
+        Returns the root element of the parsed document.
         """
-        return validate_xml(schema, self.path, from_path=True)
+        return validate_xml(schema, self.path)
 
     def validate_files(self, dcp_path):
         """
         Check the paths of the downloaded files against the paths specified in the ASSETMAP file.
+        Each directory is listed once rather than checking every file separately.
         """
-        for asset_data in self.assets.itervalues():
+        listing = DirectoryListing()
+        for asset_data in self.assets.values():
             full_path = os.path.join(dcp_path, asset_data.path)
-            if not os.path.isfile(full_path):
+            if not listing.exists(full_path):
                 raise AssetmapValidationError("File not found: {0}".format(full_path))
 
 
 class AssetData(object):
+    """
+    A chunk of an asset: the file it's in and where it is in the asset. Offset, length and volume
+    index are None when the ASSETMAP leaves them out.
+    """
     def __init__(self, path, volume_index, offset, length):
         self.path = path
         self.volume_index = volume_index
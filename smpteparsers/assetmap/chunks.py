@@ -0,0 +1,124 @@
+"""
+Reads assets which are split into chunks as a single stream.
+
+Some deliveries split assets into several files, usually to fit the file size limit of FAT
+formatted drives, and may spread them over several volumes. ChunkedAssetReader presents the
+chunks of an asset as one seekable file object, so it can be hashed or copied without joining
+the chunks on disk first:
+
+    with assetmap.open(asset_id, dcp_path) as f:
+        file_hash = generate_hash(f)
+    with assetmap.open(asset_id, dcp_path) as f, open(path, 'wb') as out:
+        shutil.copyfileobj(f, out, 1048576)
+"""
+import bisect, io, os
+
+from smpteparsers.assetmap import AssetmapError
+
+class ChunkedAssetReader(io.RawIOBase):
+    """
+    A read-only, seekable binary file object over the chunks of an asset.
+
+    Reads go straight from the chunk files into the caller's buffer with readinto, and a read
+    which spans the end of a chunk carries on into the next. Only one chunk file is open at a time.
+
+    :param chunks: AssetData of each chunk of the asset, e.g. Assetmap.chunks[asset_id]
+    :param dcp_path: directory the chunk paths are relative to
+    :param volumes: dict of volume index to directory, for assets split across volumes. Chunks on
+        volumes which aren't in it are read from dcp_path.
+    :ivar size: length of the whole asset in bytes
+    """
+    def __init__(self, chunks, dcp_path, volumes=None):
+        super(ChunkedAssetReader, self).__init__()
+        self.paths = []
+        self.starts = []
+        self.size = 0
+
+        volumes = volumes or {}
+        for chunk in sorted(chunks, key=lambda chunk: chunk.offset or 0):
+            path = os.path.join(volumes.get(chunk.volume_index, dcp_path), chunk.path)
+            offset = self.size if chunk.offset is None else chunk.offset
+            if offset != self.size:
+                raise AssetmapError("Chunk {0} starts at {1}, expected {2}".format(path, offset, self.size))
+            length = chunk.length
+            if length is None:
+                try:
+                    length = os.path.getsize(path)
+                except OSError as e:
+                    raise AssetmapError(e)
+            if length:
+                self.paths.append(path)
+                self.starts.append(offset)
+            self.size += length
+
+        self._pos = 0
+        self._index = None
+        self._file = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError("Invalid whence: {0}".format(whence))
+        if pos < 0:
+            raise ValueError("Negative seek position {0}".format(pos))
+
+        if self._file is not None:
+            start = self.starts[self._index]
+            if start <= pos < self._end(self._index):
+                self._file.seek(pos - start)
+            else:
+                self._close_chunk()
+        self._pos = pos
+        return pos
+
+    def _end(self, index):
+        return self.starts[index + 1] if index + 1 < len(self.starts) else self.size
+
+    def _close_chunk(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._index = None
+
+    def _open_chunk(self):
+        index = bisect.bisect_right(self.starts, self._pos) - 1
+        try:
+            self._file = io.open(self.paths[index], 'rb', buffering=0)
+        except (IOError, OSError) as e:
+            raise AssetmapError(e)
+        self._index = index
+        self._file.seek(self._pos - self.starts[index])
+
+    def readinto(self, b):
+        view = memoryview(b)
+        total = 0
+        while total < len(view) and self._pos < self.size:
+            if self._file is None:
+                self._open_chunk()
+            end = self._end(self._index)
+            n = self._file.readinto(view[total:total + min(len(view) - total, end - self._pos)])
+            if not n:
+                raise AssetmapError("Chunk {0} is shorter than the ASSETMAP says".format(self.paths[self._index]))
+            total += n
+            self._pos += n
+            if self._pos >= end:
+                self._close_chunk()
+        return total
+
+    def close(self):
+        self._close_chunk()
+        super(ChunkedAssetReader, self).close()
@@ -0,0 +1,93 @@
+"""
+Writes ASSETMAPs an asset at a time, so an ASSETMAP for any number of assets is written in
+constant memory.
+
+    with open(path, 'wb') as f:
+        writer = AssetmapWriter(f, assetmap_id, issue_date=datetime.utcnow())
+        for asset_id, asset_data in assets:
+            writer.add(asset_id, asset_data)
+        writer.close()
+"""
+import datetime, uuid
+
+from smpteparsers.util.date_utils import format_date
+from smpteparsers.util.xmlwriter import XMLWriter
+
+SMPTE_NS = "http://www.smpte-ra.org/schemas/429-9/2007/AM"
+INTEROP_NS = "http://www.digicine.com/PROTO-ASDCP-AM-20040311#"
+
+class AssetmapWriter(object):
+    """
+    Streams an ASSETMAP to a binary file object.
+
+    :param out: binary file object
+    :param assetmap_id: UUID of the ASSETMAP, a new one by default
+    :param issue_date: datetime, now by default. Naive datetimes are taken to be UTC.
+    :param namespace: SMPTE_NS or INTEROP_NS, which also sets the order of the header elements
+    """
+    def __init__(self, out, assetmap_id=None, issue_date=None, issuer="smpteparsers", creator="smpteparsers",
+                 annotation_text=None, volume_count=1, namespace=SMPTE_NS):
+        self.id = assetmap_id or str(uuid.uuid4())
+        self.count = 0
+        self.xml = XMLWriter(out)
+        xml = self.xml
+
+        header = [("Id", "urn:uuid:" + self.id)]
+        if annotation_text is not None:
+            header.append(("AnnotationText", annotation_text))
+        volume_count = ("VolumeCount", str(volume_count))
+        issue_date = ("IssueDate", format_date(issue_date or datetime.datetime.utcnow()))
+        if namespace == INTEROP_NS:
+            header += [volume_count, issue_date, ("Issuer", issuer), ("Creator", creator)]
+        else:
+            header += [("Creator", creator), volume_count, issue_date, ("Issuer", issuer)]
+
+        xml.start("AssetMap", {"xmlns": namespace})
+        for tag, text in header:
+            xml.element(tag, text)
+        xml.start("AssetList")
+
+    def add(self, asset_id, asset_data, packing_list=False, annotation_text=None):
+        """
+        Writes an asset.
+
+        :param asset_data: AssetData. Offset, length and volume index are written when they're set.
+        :param packing_list: whether the asset is a PKL
+        """
+        xml = self.xml
+        xml.start("Asset")
+        xml.element("Id", "urn:uuid:" + asset_id)
+        if annotation_text is not None:
+            xml.element("AnnotationText", annotation_text)
+        if packing_list:
+            xml.element("PackingList", "true")
+        xml.start("ChunkList")
+        xml.start("Chunk")
+        xml.element("Path", asset_data.path)
+        for tag, value in (("VolumeIndex", asset_data.volume_index), ("Offset", asset_data.offset),
+                           ("Length", asset_data.length)):
+            if value is not None:
+                xml.element(tag, str(value))
+        xml.end("Chunk")
+        xml.end("ChunkList")
+        xml.end("Asset")
+        self.count += 1
+
+    def close(self):
+        """
+        Ends the document. The file is left open.
+        """
+        self.xml.end("AssetList")
+        self.xml.end("AssetMap")
+        self.xml.close()
+
+def write_assetmap(out, assets, **kwargs):
+    """
+    Writes an ASSETMAP of (asset_id, AssetData) pairs, e.g. Assetmap.assets.items(), to a
+    binary file object. The other arguments are those of AssetmapWriter. Returns the ASSETMAP id.
+    """
+    writer = AssetmapWriter(out, **kwargs)
+    for asset_id, asset_data in assets:
+        writer.add(asset_id, asset_data)
+    writer.close()
+    return writer.id
@@ -1,12 +1,10 @@
 from abc import ABCMeta
 import os, sys
-try:
-    import xml.etree.cElementTree as ET
-except ImportError:
-    import xml.etree.ElementTree as ET
 
 from smpteparsers.util.date_utils import parse_date
-from smpteparsers.util import get_element, get_element_text, get_element_iterator, get_namespace, validate_xml
+from smpteparsers.util import get_namespace, get_schema, parse_xml, profiling
+from smpteparsers.util.fields import Field, FieldMap, FieldError, urn_uuid, int_tuple, float_tuple
+from smpteparsers.cpl.timeline import Timeline
 
 if sys.version_info > (3, ):
     long = int
@@ -16,27 +14,77 @@ class CPLError(Exception):
 class CPLValidationError(CPLError):
     pass
 
+_schema_dir = os.path.dirname(os.path.abspath(__file__))
+
+SCHEMAS = {
+    # Not 100% sure which namespace is for Interop or SMPTE but this seems like the most sensible..
+    "http://www.smpte-ra.org/schemas/429-7/2006/CPL": os.path.join(_schema_dir, 'smpte.xsd'),
+    "http://www.digicine.com/PROTO-ASDCP-CPL-20040511#": os.path.join(_schema_dir, 'interop.xsd')
+}
+
+# The schemas don't import the signature schema themselves, see the comment in smpte.xsd
+_schema_imports = [
+    {"namespace": "http://www.w3.org/2000/09/xmldsig#", "schemaLocation": u"/".join(os.path.join(_schema_dir, 'sig.xsd').split(os.sep))}
+]
+
+def get_cpl_schema(cpl_ns):
+    """
+    Returns the compiled schema for a CPL namespace. Schemas are compiled once per process.
+    """
+    try:
+        schema_file = SCHEMAS[cpl_ns]
+    except KeyError:
+        raise CPLValidationError("Unknown CPL namespace: {0}".format(cpl_ns))
+    return get_schema(schema_file, _schema_imports)
+
 class CPL(object):
-    def __init__(self, path=None, assetmap=None, parse=True):
+    fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("ContentTitleText", "content_title_text", required=True),
+        Field("AnnotationText", "annotation_text"),
+        Field("IssueDate", "issue_date", convert=parse_date, required=True),
+        Field("Issuer", "issuer"),
+        Field("Creator", "creator"),
+        Field("ContentKind", "content_kind"),
+        Field("ReelList", "reel_lists", element=True, many=True),
+    )
+
+    def __init__(self, path=None, assetmap=None, parse=True, asset_index=None):
+        """
+        :param assetmap: Assetmap of the CPL's package, to set the path of each asset.
+        :param asset_index: smpteparsers.library.index.AssetIndex to resolve assets which aren't in
+            the assetmap through, e.g. the OV assets of a VF package. Those assets' paths are the
+            absolute paths in the other packages, so os.path.join(dcp_path, asset.path) gives the
+            file of any asset.
+        """
         self.path = path
         self.assetmap = assetmap
+        self.asset_index = asset_index
 
         self.reels = []
         self.assets = {}
+        self._timeline = None
 
         if parse and path is not None:
             self.parse()
 
+    @property
+    def timeline(self):
+        """
+        Timeline of the reels, for finding the reel and frame at a position in the CPL.
+        Built the first time it's used.
+        """
+        if self._timeline is None:
+            self._timeline = Timeline(self.reels)
+        return self._timeline
+
     @property
     def duration_in_frames(self):
-        duration = 0
-        for reel in self.reels:
-            duration += self.assets[reel.picture.id].duration
-        return duration
+        return self.timeline.duration_in_frames
 
     @property
     def edit_rate(self):
-        return self.assets[self.reels[0].picture.id].edit_rate
+        return self.reels[0].picture.edit_rate
 
     @property
     def duration_in_seconds(self):
@@ -46,43 +94,66 @@ class CPL(object):
             float(self.edit_rate[1])
         )
 
-    def fromstring(self, xml):
-        try:
-            tree = ET.ElementTree(ET.fromstring(xml))
-            root = tree.getroot()
-            self.cpl_ns = get_namespace(root.tag)
-            # self.validate(xml=xml)
-        except Exception as e:
-            raise CPLError(e)
-        self._parse(tree)
+    def fromstring(self, xml, validate=False):
+        """
+        Parses a CPL from the XML document itself, as bytes or text.
+        """
+        self._load(xml, validate)
 
-    def parse(self):
+    def parse(self, validate=False):
         """
         Opens a given CPL asset, parses the XML to extract the playlist info and create a CPL object
         which is added to the DCP's CPL list.
+
+        The path can also be any other source accepted by smpteparsers.util.parse_xml,
+        e.g. bytes, a memoryview or mmap, or a binary file object.
+
+        If validate is True the parsed document is also checked against the CPL schema, without
+        reading it again, and CPLValidationError is raised if it isn't valid.
         """
+        self._load(self.path, validate)
+
+    def _load(self, source, validate=False):
         try:
-            tree = ET.parse(self.path)
-            root = tree.getroot()
+            with profiling.span("cpl.parse"):
+                root = parse_xml(source)
             self.cpl_ns = get_namespace(root.tag)
-            # self.validate()
         except Exception as e:
             raise CPLError(e)
-        self._parse(root)
+
+        if validate:
+            with profiling.span("cpl.validate"):
+                schema = get_cpl_schema(self.cpl_ns)
+                if not schema.validate(root):
+                    raise CPLValidationError(schema.error_log.last_error)
+        with profiling.span("cpl.build"):
+            self._parse(root)
+        self._timeline = None
+        profiling.count("cpl.reels", len(self.reels))
+        profiling.count("cpl.assets", len(self.assets))
 
     def _parse(self, root):
-        self.id = get_element_text(root, "Id", self.cpl_ns).split(":")[2]
-        self.content_title_text = get_element_text(root, "ContentTitleText", self.cpl_ns)
-        self.annotation_text = get_element_text(root, "AnnotationText", self.cpl_ns)
-        self.issue_date = parse_date(get_element_text(root, "IssueDate", self.cpl_ns))
-        self.issuer = get_element_text(root, "Issuer", self.cpl_ns)
-        self.creator = get_element_text(root, "Creator", self.cpl_ns)
-        self.content_kind = get_element_text(root, "ContentKind", self.cpl_ns)
+        try:
+            values = self.fields.extract(root, self.cpl_ns)
+        except FieldError as e:
+            raise CPLError(e)
+
+        self.id = values["id"]
+        self.content_title_text = values["content_title_text"]
+        self.annotation_text = values["annotation_text"]
+        self.issue_date = values["issue_date"]
+        self.issuer = values["issuer"]
+        self.creator = values["creator"]
+        self.content_kind = values["content_kind"]
+
+        # Parsing again replaces the reels rather than adding to them
+        self.reels = []
+        self.assets = {}
 
         # Get each of the parts of the CPL, i.e. the Reels :)
-        for reel_list_elem in get_element_iterator(root, "ReelList", self.cpl_ns):
-            for reel_elem in reel_list_elem.getchildren():
-                reel = Reel(reel_elem, self.cpl_ns, assetmap=self.assetmap)
+        for reel_list_elem in values["reel_lists"]:
+            for reel_elem in reel_list_elem:
+                reel = Reel(reel_elem, self.cpl_ns, assetmap=self.assetmap, asset_index=self.asset_index)
 
                 # Add this in as a convenience for working with assets.
                 for asset_id, asset in reel.assets.items():
@@ -92,40 +163,36 @@ class CPL(object):
 
     def validate(self, xml=None, from_path=True):
         """
-        Call the validate_xml function in util to valide the xml file against the schema.
+        Validates the CPL against the schema for its namespace, reading it again from its path
+        (or from xml if that's given). Returns the root element.
         """
-
-        schemas = {
-            # Not 100% sure which namespace is for Interop or SMPTE but this seems like the most sensible..
-            "http://www.smpte-ra.org/schemas/429-7/2006/CPL": os.path.join(os.path.dirname(__file__), 'smpte.xsd'),
-            "http://www.digicine.com/PROTO-ASDCP-CPL-20040511#": os.path.join(os.path.dirname(__file__), 'interop.xsd')
-        }
-
-        try:
-            schema = schemas[self.cpl_ns]
-        except KeyError:
-            raise CPLValidationError("Unknown CPL namespace: {0}".format(self.cpl_ns))
-
-        current_dir = u"/".join(os.path.dirname(__file__).split(os.sep))
-        schema_imports = [
-            {"namespace": "http://www.w3.org/2000/09/xmldsig#", "schemaLocation": u'{0}/sig.xsd'.format(current_dir)}
-        ]
-        if xml is not None:
-            return validate_xml(schema, xml, schema_imports=schema_imports)
-        return validate_xml(schema, self.path, schema_imports=schema_imports, from_path=True)
+        with profiling.span("cpl.validate"):
+            return parse_xml(xml if xml is not None else self.path, schema=get_cpl_schema(self.cpl_ns))
 
 class Reel(object):
-    def __init__(self, element, cpl_ns, assetmap=None):
+    fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("AssetList", "asset_list", element=True, required=True),
+    )
+
+    def __init__(self, element, cpl_ns, assetmap=None, asset_index=None):
         """
         Takes a "Reel" element and parses out the information contained inside.
 
+        Asset paths are looked up in the assetmap and then in the asset_index, if one is given.
+        Assets found in neither have a path of None when there's an index, and raise KeyError otherwise.
+
         @todo: Check this against 3D content, in theory it should work but needs tests!
         """
 
         self.assets = {}
-        self.id = get_element_text(element, "Id", cpl_ns).split(":")[2]
+        try:
+            values = self.fields.extract(element, cpl_ns)
+        except FieldError as e:
+            raise CPLError(e)
+        self.id = values["id"]
 
-        for asset in get_element(element, "AssetList", cpl_ns).getchildren():
+        for asset in values["asset_list"]:
             asset_tag = asset.tag.split('}')[1] # Remove the namespace, hack but it works for now!
             if asset_tag in ("MainPicture", "MainStereoscopicPicture"):
                 asset_instance = Picture(asset, cpl_ns)
@@ -140,7 +207,15 @@ class Reel(object):
                 raise CPLError("Unknown asset type found: {0}".format(asset_tag))
 
             # Finally set the path to this particular asset.
-            if assetmap is not None:
+            if asset_index is not None:
+                asset_instance.path = None
+                if assetmap is not None and asset_instance.id in assetmap.assets:
+                    asset_instance.path = assetmap[asset_instance.id].path
+                else:
+                    indexed = asset_index.get(asset_instance.id)
+                    if indexed is not None:
+                        asset_instance.path = indexed.path
+            elif assetmap is not None:
                 asset_instance.path = assetmap[asset_instance.id].path
 
             # Assets can be accessed in two ways now.
@@ -149,28 +224,31 @@ class Reel(object):
 class Asset(object):
     __metaclass__ = ABCMeta # Don't want Assets being defined on their own!
 
+    fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("EditRate", "edit_rate", convert=int_tuple, required=True),
+        Field("IntrinsicDuration", "intrinsic_duration", convert=long, required=True),
+        Field("EntryPoint", "entry_point", convert=long),
+        Field("Duration", "duration", convert=long),
+    )
+
     def __init__(self, element, cpl_ns):
-        self.id = get_element_text(element, "Id", cpl_ns).split(":")[2]
-        self.edit_rate = tuple([int(x) for x in get_element_text(element, "EditRate", cpl_ns).split()])
-        self.intrinsic_duration = long(get_element_text(element, "IntrinsicDuration", cpl_ns))
-        e = get_element_text(element, "EntryPoint", cpl_ns)
-        self.entry_point = long(e) if e is not None else e
-        d = get_element_text(element, "Duration", cpl_ns)
-        self.duration = long(d) if d is not None else d
+        try:
+            self.fields.extract(element, cpl_ns, target=self)
+        except FieldError as e:
+            raise CPLError(e)
 
     def ext(self):
         return "mxf"
 
 class Picture(Asset):
-    def __init__(self, element, cpl_ns):
-        super(Picture, self).__init__(element, cpl_ns)
-
-        self.frame_rate = tuple([int(x) for x in get_element_text(element, "FrameRate", cpl_ns).split()])
-        self.screen_aspect_ratio = tuple([float(x) for x in get_element_text(element, "ScreenAspectRatio", cpl_ns).split()])
+    fields = Asset.fields.extend(
+        Field("FrameRate", "frame_rate", convert=int_tuple, required=True),
+        Field("ScreenAspectRatio", "screen_aspect_ratio", convert=float_tuple, required=True),
+    )
 
 class Sound(Asset):
-    def __init__(self, element, cpl_ns):
-        super(Sound, self).__init__(element, cpl_ns)
+    pass
 
 class Subtitle(Asset):
     def ext(self):
@@ -0,0 +1,117 @@
+"""
+Parses and validates many CPLs at once, across a pool of worker processes.
+
+    from smpteparsers.cpl.batch import parse_cpls
+
+    for result in parse_cpls(cpl_paths, validate=True):
+        if result.error:
+            print(result.path, result.error)
+"""
+import multiprocessing
+
+from smpteparsers.util import is_xml_content, text_type
+from smpteparsers.cpl import CPL, CPLError, SCHEMAS, get_cpl_schema
+
+class CPLResult(object):
+    """
+    Compact summary of one CPL in a batch, returned instead of the full CPL object so
+    only a few fields are sent back from the worker processes.
+
+    :ivar index: position of the CPL in the sources passed to parse_cpls
+    :ivar path: path of the CPL, or None if it was passed as a document
+    :ivar id: CPL UUID
+    :ivar content_title_text:
+    :ivar content_kind:
+    :ivar issue_date: datetime in UTC
+    :ivar reels: number of reels
+    :ivar duration_in_frames: total picture duration, or None if a reel has no picture
+    :ivar edit_rate: edit rate of the first reel as a tuple, e.g. (24, 1)
+    :ivar valid: whether the CPL passed schema validation, or None if it wasn't validated
+    :ivar error: message of the error which stopped the CPL parsing or validating, else None
+    """
+    __slots__ = ('index', 'path', 'id', 'content_title_text', 'content_kind', 'issue_date', 'reels',
+                 'duration_in_frames', 'edit_rate', 'valid', 'error')
+
+    def __init__(self, index, path):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.index = index
+        self.path = path
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+def _init_worker(validate):
+    # Compile the schemas once per worker rather than once per CPL
+    if validate:
+        for cpl_ns in SCHEMAS:
+            get_cpl_schema(cpl_ns)
+
+def _parse_one(args):
+    index, source, validate = args
+    is_path = isinstance(source, (bytes, text_type)) and not is_xml_content(source)
+    result = CPLResult(index, source if is_path else None)
+
+    cpl = CPL(source, parse=False)
+    try:
+        cpl.parse(validate=validate)
+    except CPLError as e:
+        result.error = str(e)
+        result.valid = False if validate else None
+        return result
+
+    result.valid = True if validate else None
+    result.id = cpl.id
+    result.content_title_text = cpl.content_title_text
+    result.content_kind = cpl.content_kind
+    result.issue_date = cpl.issue_date
+    result.reels = len(cpl.reels)
+    try:
+        result.duration_in_frames = cpl.duration_in_frames
+        result.edit_rate = cpl.edit_rate
+    except (AttributeError, IndexError):
+        # No picture in a reel
+        pass
+    return result
+
+def parse_cpls(sources, processes=None, validate=True, chunksize=4):
+    """
+    Parses, and optionally validates, CPLs in worker processes.
+
+    Yields a CPLResult for each source, in the same order as the sources. Errors in a CPL are
+    recorded in its result rather than raised.
+
+    :param sources: iterable of CPL paths, or of CPL documents as bytes (or bytearrays or
+        memoryviews, which are copied to send them to the workers).
+    :param processes: number of worker processes, defaults to the number of CPUs.
+        With 1 the CPLs are parsed in this process.
+    :param validate: whether to validate each CPL against its schema.
+    :param chunksize: number of CPLs sent to a worker at a time.
+    """
+    tasks = (
+        (index, memoryview(source).tobytes() if isinstance(source, (bytearray, memoryview)) else source, validate)
+        for index, source in enumerate(sources)
+    )
+
+    if processes == 1:
+        _init_worker(validate)
+        for task in tasks:
+            yield _parse_one(task)
+        return
+
+    pool = multiprocessing.Pool(processes, _init_worker, (validate,))
+    try:
+        for result in pool.imap(_parse_one, tasks, chunksize):
+            yield result
+        pool.close()
+    finally:
+        # Also stops the workers if the caller stops iterating early
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,131 @@
+"""
+Maps positions in a CPL's playback to reels and frames within them.
+
+The start frame of every reel is computed once, so finding the reel for a frame or a
+timecode is a bisect over the reel starts rather than a walk over the reels.
+
+    timeline = cpl.timeline
+    position = timeline.locate(frame)
+    position.reel, position.offset, position.asset_frame
+    timeline.timecode(frame)   # '00:01:02:12'
+"""
+from array import array
+from bisect import bisect_right
+
+class Position(object):
+    """
+    Where a frame of the CPL is played from.
+
+    :ivar frame: frame from the start of the CPL
+    :ivar index: index of the reel in the CPL
+    :ivar reel: the Reel object
+    :ivar asset: the reel's picture asset
+    :ivar offset: frame from the start of the reel
+    :ivar asset_frame: frame in the asset's essence, i.e. the offset plus the asset's entry point
+    """
+    __slots__ = ('frame', 'index', 'reel', 'asset', 'offset', 'asset_frame')
+
+    def __init__(self, frame, index, reel, asset, offset, asset_frame):
+        self.frame = frame
+        self.index = index
+        self.reel = reel
+        self.asset = asset
+        self.offset = offset
+        self.asset_frame = asset_frame
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+def _reel_duration(asset):
+    if asset.duration is not None:
+        return asset.duration
+    # Duration is optional, without it the asset plays to the end from its entry point
+    return asset.intrinsic_duration - (asset.entry_point or 0)
+
+class Timeline(object):
+    """
+    Reel start frames of a CPL, timed by the picture asset of each reel.
+
+    Built from the reels as they are when it's created. CPL.timeline builds one when it's
+    first used after the CPL is parsed.
+
+    :ivar starts: array of the start frame of each reel
+    :ivar duration_in_frames: total duration of the CPL
+    :ivar edit_rate: edit rate of the first reel as a tuple, e.g. (24, 1)
+    """
+    def __init__(self, reels):
+        self.reels = list(reels)
+        self.pictures = [reel.picture for reel in self.reels]
+        self.entry_points = array('l', [picture.entry_point or 0 for picture in self.pictures])
+        self.starts = array('l')
+
+        frame = 0
+        for picture in self.pictures:
+            self.starts.append(frame)
+            frame += _reel_duration(picture)
+        self.duration_in_frames = frame
+        self.edit_rate = self.pictures[0].edit_rate if self.pictures else None
+
+    def __len__(self):
+        return self.duration_in_frames
+
+    @property
+    def frames_per_second(self):
+        """
+        Whole number of frames in a second of timecode, e.g. 24 for (24, 1) or 30 for (30000, 1001).
+        Timecodes are non drop-frame.
+        """
+        return int(round(float(self.edit_rate[0]) / self.edit_rate[1]))
+
+    def reel_index(self, frame):
+        """
+        Returns the index of the reel playing a frame, raising IndexError if the frame is
+        outside the CPL.
+        """
+        if frame < 0 or frame >= self.duration_in_frames:
+            raise IndexError("Frame {0} is outside the CPL (0 to {1})".format(frame, self.duration_in_frames - 1))
+        return bisect_right(self.starts, frame) - 1
+
+    def locate(self, frame):
+        """
+        Returns the Position of a frame, raising IndexError if the frame is outside the CPL.
+        """
+        index = self.reel_index(frame)
+        offset = frame - self.starts[index]
+        return Position(frame, index, self.reels[index], self.pictures[index], offset,
+                        self.entry_points[index] + offset)
+
+    def locate_timecode(self, timecode):
+        """
+        Returns the Position of a 'HH:MM:SS:FF' timecode from the start of the CPL.
+        """
+        return self.locate(self.frame(timecode))
+
+    def seconds(self, frame):
+        return float(frame) * self.edit_rate[1] / self.edit_rate[0]
+
+    def timecode(self, frame):
+        """
+        Converts a frame count, e.g. a frame from the start of the CPL or an offset within a
+        reel, to a 'HH:MM:SS:FF' timecode.
+        """
+        if frame < 0:
+            raise ValueError("Negative frame: {0}".format(frame))
+        fps = self.frames_per_second
+        seconds, frames = divmod(frame, fps)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return "{0:02d}:{1:02d}:{2:02d}:{3:02d}".format(hours, minutes, seconds, frames)
+
+    def frame(self, timecode):
+        """
+        Converts a 'HH:MM:SS:FF' timecode to a frame count, raising ValueError if it isn't one.
+        """
+        parts = timecode.replace(';', ':').split(':')
+        if len(parts) != 4:
+            raise ValueError("Invalid timecode: {0!r}".format(timecode))
+        hours, minutes, seconds, frames = [int(part) for part in parts]
+        fps = self.frames_per_second
+        if minutes >= 60 or seconds >= 60 or frames >= fps or min(hours, minutes, seconds, frames) < 0:
+            raise ValueError("Invalid timecode: {0!r}".format(timecode))
+        return ((hours * 60 + minutes) * 60 + seconds) * fps + frames
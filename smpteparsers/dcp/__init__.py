@@ -1,11 +1,18 @@
 import os
-from smpteparsers.assetmap import Assetmap
-from smpteparsers.pkl import PKL
+from smpteparsers.assetmap import Assetmap, AssetmapValidationError
+from smpteparsers.pkl import PKL, PKLValidationError
 from smpteparsers.cpl import CPL
+from smpteparsers.dcp.verify import verify_dcp, MISSING
+from smpteparsers.mxf import check_assets, track_file_assets
 
 class DCP(object):
-    def __init__(self, path):
+    def __init__(self, path, asset_index=None):
+        """
+        :param asset_index: smpteparsers.library.index.AssetIndex of the library, to resolve the assets
+            of a VF package's CPLs which are in other packages.
+        """
         self.path = path
+        self.asset_index = asset_index
         self.cpls = {}
 
         self.parse()
@@ -43,13 +50,44 @@ class DCP(object):
         for uuid, pkl_data in self.pkl.assets.iteritems():
             if "asdcpKind=CPL" in pkl_data.file_type:
                 cpl_path = os.path.join(self.path, self.assetmap[uuid].path)
-                self.cpls[uuid] = CPL(cpl_path, assetmap=self.assetmap)
+                self.cpls[uuid] = CPL(cpl_path, assetmap=self.assetmap, asset_index=self.asset_index)
+
+    def dependencies(self):
+        """
+        Returns the paths of the other packages whose assets the CPLs of this one play, i.e. the OV
+        packages of a VF. Raises ValueError if the DCP was created without an asset_index.
+        """
+        if self.asset_index is None:
+            raise ValueError("dependencies() needs an asset_index")
+        found = set()
+        for cpl in self.cpls.values():
+            found.update(self.asset_index.dependencies(cpl, self.path))
+        return sorted(found)
 
-    def validate(self):
-        raise NotImplementedError
+    def validate(self, hashes=True, fail_fast=True):
         """
-        Do file and hash validation here just for testing. Can/should be removed in future
+        Checks the files of the DCP against the ASSETMAP and PKL: that they exist and are the size
+        given in the PKL and then, if they all are, their hashes. Chunked assets are checked as a
+        whole.
+
+        Raises AssetmapValidationError for a missing file and PKLValidationError for a size or hash
+        mismatch. Returns the smpteparsers.dcp.verify.VerifyReport.
         """
-        # assetmap.validate_files(self.path)
-        # pkl.validate_hashes(self.path, assetmap.assets)
+        report = verify_dcp(self.path, self.assetmap.chunks, self.pkl.assets, hashes=hashes, fail_fast=fail_fast)
+        for issue in report.issues:
+            if issue.kind == MISSING:
+                raise AssetmapValidationError(str(issue))
+            raise PKLValidationError(str(issue))
+        return report
 
+    def check_essence(self):
+        """
+        Checks the picture and sound track files of every CPL against their MXF headers: the
+        asset id, edit rate and intrinsic duration. Only the headers are read, so this is quick
+        enough to run on every package at ingest. Returns a list of smpteparsers.mxf.HeaderIssue.
+        """
+        assets = {}
+        for cpl in self.cpls.values():
+            for asset in track_file_assets(cpl):
+                assets[asset.id] = asset
+        return check_assets(assets.values(), self.path)
@@ -0,0 +1,222 @@
+"""
+Staged verification of the files of a DCP against its ASSETMAP and PKL.
+
+The cheap checks run first, for every asset: that the file exists, then that its size
+matches the PKL, reading each directory once. Only if they all pass are the files hashed,
+smallest first, so a missing or truncated copy is reported without hashing anything.
+
+Assets split into chunks are checked as a whole when the chunks are passed, i.e. Assetmap.chunks:
+the size is the total of the chunk files and the hash is of the chunks read as one stream.
+
+    report = verify_dcp(dcp_path, assetmap.chunks, pkl.assets)
+    if not report.ok:
+        for issue in report.issues:
+            print(issue)
+"""
+import os
+
+from smpteparsers.pkl import generate_hash
+from smpteparsers.util import profiling
+from smpteparsers.util.files import DirectoryListing
+
+MISSING = "missing"
+SIZE = "size"
+HASH = "hash"
+SAMPLE = "sample"
+
+class AssetIssue(object):
+    """
+    A file of the DCP which failed a check.
+
+    :ivar asset_id:
+    :ivar path: full path of the file, or None if the asset isn't in the ASSETMAP
+    :ivar kind: MISSING, SIZE, HASH, or SAMPLE for a block sampled by smpteparsers.pkl.quickcheck
+    :ivar expected: size or hash from the PKL
+    :ivar actual: size or hash of the file
+    """
+    __slots__ = ('asset_id', 'path', 'kind', 'expected', 'actual')
+
+    def __init__(self, asset_id, path, kind, expected=None, actual=None):
+        self.asset_id = asset_id
+        self.path = path
+        self.kind = kind
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self):
+        if self.kind == MISSING:
+            if self.path is None:
+                return "Asset not in ASSETMAP: {0}".format(self.asset_id)
+            return "File not found: {0}".format(self.path)
+        if self.kind == SIZE:
+            return "Size doesn't match: {0} is {1} bytes, expected {2}".format(self.path, self.actual, self.expected)
+        if self.kind == SAMPLE:
+            return "Sampled block doesn't match: {0}".format(self.path)
+        return "Hash doesn't match: {0}".format(self.path)
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+class VerifyReport(object):
+    """
+    Results of verify_dcp.
+
+    :ivar issues: list of AssetIssue objects, in the order they were found
+    :ivar checked: number of files checked for existence and size
+    :ivar hashed: number of files hashed
+    :ivar bytes_hashed:
+    :ivar hashes_skipped: whether hashing was skipped because a cheaper check failed
+    """
+    def __init__(self):
+        self.issues = []
+        self.checked = 0
+        self.hashed = 0
+        self.bytes_hashed = 0
+        self.hashes_skipped = False
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+def _pkl_size(pkl_data):
+    try:
+        return int(pkl_data.size)
+    except (TypeError, ValueError):
+        # No size in the PKL
+        return None
+
+def _hash_text(digest):
+    return digest.decode("ascii") if isinstance(digest, bytes) else digest
+
+def asset_chunks(asset_data):
+    """
+    Returns the list of chunks of an asset from either its AssetData, i.e. a value of
+    Assetmap.assets, or the list of its chunks, i.e. a value of Assetmap.chunks.
+    """
+    if isinstance(asset_data, (list, tuple)):
+        return list(asset_data)
+    return [asset_data]
+
+def open_asset(dcp_path, asset_data):
+    """
+    Opens an asset as one seekable binary file object however many chunks it has, see
+    smpteparsers.assetmap.chunks.ChunkedAssetReader.
+    """
+    from smpteparsers.assetmap.chunks import ChunkedAssetReader
+    return ChunkedAssetReader(asset_chunks(asset_data), dcp_path)
+
+def _chunks_size(asset_id, chunks, dcp_path, listing):
+    """
+    Returns the total size of the chunk files of an asset and None, or None and the AssetIssue of
+    the first chunk which is missing or isn't the length the ASSETMAP gives it.
+    """
+    size = 0
+    for chunk in chunks:
+        chunk_path = os.path.join(dcp_path, chunk.path)
+        chunk_size = listing.size(chunk_path)
+        if chunk_size is None:
+            return None, AssetIssue(asset_id, chunk_path, MISSING)
+        if len(chunks) > 1 and chunk.length is not None and chunk.length != chunk_size:
+            return None, AssetIssue(asset_id, chunk_path, SIZE, chunk.length, chunk_size)
+        size += chunk_size
+    return size, None
+
+def check_files(dcp_path, assets, pkl_assets=None, listing=None):
+    """
+    Checks the files of a DCP exist and, where the PKL has their size, are the right size.
+
+    :param dcp_path: directory of the DCP
+    :param assets: dict of asset id to the list of its chunks, i.e. Assetmap.chunks, or to its
+        AssetData, i.e. Assetmap.assets, where no asset is chunked. Each chunk file must be the
+        length the ASSETMAP gives it, and the PKL size is checked against their total.
+    :param pkl_assets: dict of asset id to PKLData, i.e. PKL.assets. Assets in the PKL but not in
+        the ASSETMAP are reported as missing.
+    :param listing: DirectoryListing to reuse, e.g. across DCPs sharing directories
+    :returns: tuple of (list of AssetIssue objects, dict of asset id to full path and size of each
+        asset which passed). The path of a chunked asset is its first chunk's.
+    """
+    listing = listing or DirectoryListing()
+    pkl_assets = pkl_assets or {}
+
+    issues = []
+    found = {}
+    with profiling.span("dcp.verify.files"):
+        for asset_id, asset_data in assets.items():
+            chunks = asset_chunks(asset_data)
+            full_path = os.path.join(dcp_path, chunks[0].path)
+            size, issue = _chunks_size(asset_id, chunks, dcp_path, listing)
+            if issue is not None:
+                issues.append(issue)
+                continue
+
+            pkl_data = pkl_assets.get(asset_id)
+            expected = _pkl_size(pkl_data) if pkl_data is not None else None
+            if expected is not None and expected != size:
+                issues.append(AssetIssue(asset_id, full_path, SIZE, expected, size))
+                continue
+            found[asset_id] = (full_path, size)
+
+        for asset_id in pkl_assets:
+            if asset_id not in assets:
+                issues.append(AssetIssue(asset_id, None, MISSING))
+    return issues, found
+
+def verify_dcp(dcp_path, assets, pkl_assets, hashes=True, fail_fast=True, skip_mxf=False, hash_func=generate_hash):
+    """
+    Verifies the files of a DCP in stages: existence and size of every file, then hashes.
+
+    :param dcp_path: directory of the DCP
+    :param assets: dict of asset id to the list of its chunks, i.e. Assetmap.chunks, or to its
+        AssetData, see check_files
+    :param pkl_assets: dict of asset id to PKLData, i.e. PKL.assets
+    :param hashes: whether to hash the files once the other checks pass
+    :param fail_fast: skip hashing if any file is missing or the wrong size, and stop hashing
+        at the first mismatch. Otherwise every file which can be is hashed.
+    :param skip_mxf: don't hash .mxf files
+    :param hash_func: returns the base64 SHA-1 of a file, as in the PKL. It's passed the path of
+        the file, or a file object of the chunks of a chunked asset, as generate_hash takes.
+    :returns: VerifyReport
+    """
+    report = VerifyReport()
+
+    issues, found = check_files(dcp_path, assets, pkl_assets)
+    report.issues.extend(issues)
+    report.checked = len(found) + len([issue for issue in issues if issue.path is not None])
+    profiling.count("dcp.verify.files", report.checked)
+
+    if not hashes:
+        return report
+    if fail_fast and report.issues:
+        report.hashes_skipped = True
+        return report
+
+    to_hash = []
+    for asset_id, (full_path, size) in found.items():
+        pkl_data = pkl_assets.get(asset_id)
+        if pkl_data is None or not pkl_data.file_hash:
+            continue
+        if skip_mxf and full_path.lower().endswith('.mxf'):
+            continue
+        to_hash.append((size, full_path, asset_id, pkl_data.file_hash))
+
+    # Smallest first, so the quick files are checked before the long hashes
+    to_hash.sort()
+    with profiling.span("dcp.verify.hashes"):
+        for size, full_path, asset_id, expected in to_hash:
+            chunks = asset_chunks(assets[asset_id])
+            if len(chunks) > 1:
+                with open_asset(dcp_path, chunks) as f:
+                    actual = _hash_text(hash_func(f))
+            else:
+                actual = _hash_text(hash_func(full_path))
+            report.hashed += 1
+            report.bytes_hashed += size
+            if actual != expected:
+                report.issues.append(AssetIssue(asset_id, full_path, HASH, expected, actual))
+                if fail_fast:
+                    break
+    profiling.count("dcp.verify.bytes_hashed", report.bytes_hashed)
+    return report
@@ -0,0 +1,61 @@
+"""
+Writes the PKL and ASSETMAP of a package from its files.
+"""
+import os
+
+from smpteparsers.assetmap import AssetData
+from smpteparsers.assetmap import writer as assetmap_writer
+from smpteparsers.pkl import generate_hash
+from smpteparsers.pkl import writer as pkl_writer
+
+def write_package(dcp_path, files, smpte=True, workers=4, hash_func=generate_hash, issue_date=None,
+                  issuer="smpteparsers", creator="smpteparsers", annotation_text=None):
+    """
+    Hashes the files of a package and writes its PKL and ASSETMAP, e.g. after moving DCPs onto a
+    new volume. Both documents are streamed as the files are hashed, so packages of any size are
+    written in constant memory.
+
+    The PKL is written as PKL_<id>.xml and the ASSETMAP as ASSETMAP.xml (ASSETMAP for Interop),
+    replacing any existing ASSETMAP.
+
+    :param dcp_path: directory of the package
+    :param files: iterable of (asset_id, path relative to dcp_path, PKL type) tuples, for every
+        file of the package except the PKL and ASSETMAP
+    :param smpte: write SMPTE documents, otherwise Interop
+    :param workers: number of files hashed at the same time
+    :param hash_func: returns the base64 SHA-1 of a file, e.g. HashScheduler.hash_file
+    :returns: tuple of (PKL id, ASSETMAP id)
+    """
+    pkl_ns = pkl_writer.SMPTE_NS if smpte else pkl_writer.INTEROP_NS
+    assetmap_ns = assetmap_writer.SMPTE_NS if smpte else assetmap_writer.INTEROP_NS
+    metadata = dict(issue_date=issue_date, issuer=issuer, creator=creator, annotation_text=annotation_text)
+
+    assetmap_path = os.path.join(dcp_path, "ASSETMAP.xml" if smpte else "ASSETMAP")
+    # Both documents are written under temporary names, so a failure leaves the package as it was
+    partial_assetmap = assetmap_path + ".partial"
+    partial_pkl = os.path.join(dcp_path, "PKL.xml.partial")
+    try:
+        with open(partial_assetmap, 'wb') as assetmap_out:
+            with open(partial_pkl, 'wb') as pkl_out:
+                assetmap = assetmap_writer.AssetmapWriter(assetmap_out, namespace=assetmap_ns, **metadata)
+                pkl = pkl_writer.PKLWriter(pkl_out, namespace=pkl_ns, **metadata)
+                for asset_id, asset_data, pkl_data in pkl_writer.describe_files(dcp_path, files, workers, hash_func):
+                    pkl.add(asset_id, pkl_data)
+                    assetmap.add(asset_id, asset_data)
+                pkl.close()
+
+            pkl_name = "PKL_{0}.xml".format(pkl.id)
+            assetmap.add(pkl.id, AssetData(pkl_name, 1, 0, os.path.getsize(partial_pkl)), packing_list=True)
+            assetmap.close()
+
+        os.rename(partial_pkl, os.path.join(dcp_path, pkl_name))
+        if os.path.exists(assetmap_path):
+            # os.rename doesn't replace files on Windows
+            os.remove(assetmap_path)
+        os.rename(partial_assetmap, assetmap_path)
+    finally:
+        # Only left if something failed, once they're renamed they're gone
+        for path in (partial_pkl, partial_assetmap):
+            if os.path.exists(path):
+                os.remove(path)
+    return pkl.id, assetmap.id
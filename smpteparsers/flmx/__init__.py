@@ -1,13 +1,22 @@
 from smpteparsers.flmx.parse import ParserMap
 
+import sys
 from datetime import datetime
 from optparse import OptionParser
 
+# The asyncio entry points need Python 3.7+. asyncio and ssl are slow to import, so they're only
+# imported when the entry points are first used.
+def __getattr__(name):
+    if name in ('parse_async', 'add_failure_async') and sys.version_info >= (3, 7):
+        from smpteparsers.flmx import aio
+        return getattr(aio, name)
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
 # The parser registry - attaches the parser(s) to the module state
 # so we can reuse the same parser instances
 parsers = ParserMap()
 
-def parse(sitelist_url, username='', password='', last_ran=datetime.min, failures_file='failures.json'):
+def parse(sitelist_url, username='', password='', last_ran=datetime.min, failures_file='failures.db'):
     u"""Parse the FLM site list at the URL provided, and return a dict of FacilityParser objects.
 
     :param string sitelist_url: The URL of the FLM site list.
@@ -15,7 +24,8 @@ def parse(sitelist_url, username='', password='', last_ran=datetime.min, failure
     :param string password: Password (if required) for authentication.
     :param datetime last_ran: Only FLMs which have been updated since the time specified
         will be returned.  By default all FLMs will be returned.
-    :param string failures_file: The path of a JSON file to write the failures to.
+    :param string failures_file: The path of the SQLite database to record failures in, relative to the
+        current directory.  A JSON failures file from an earlier version is converted to a database.
 
     :return: *{string,FacilityParser}* -- The FacilityParser objects are indexed by site id.
         Each object corresponds to a single FLM in the site list.
@@ -26,26 +36,27 @@ def parse(sitelist_url, username='', password='', last_ran=datetime.min, failure
     have been updated since `last_ran` will be returned.  If the URL endpoint requires
     authentication then a `username` and `password` can be given.
 
-    Any failures will be recorded in a JSON file so that the next time the parser runs
-    it will retry any failed attempts.  By default this file will be called *failures.json*.
-    Be aware that if the `failures_file` provided is corrupt or cannot be parsed as valid JSON
-    then it will be overwritten by a valid failures file on the parser's completion,
-    and any data in the original file will be lost.
+    Any failures will be recorded in a SQLite database so that later runs of the parser
+    will retry any failed attempts.  By default this file will be called *failures.db*.
+    Each failure keeps a retry count, and an FLM that keeps failing is retried with an
+    exponentially increasing delay rather than on every run.  The store is keyed by site list
+    so several parsers, even in different processes, can safely share the same file.
 
     """
     parser = parsers.get_parser(sitelist_url)
 
     return parser.parse(username=username, password=password, last_ran=last_ran, failures_file=failures_file)
 
-def add_failure(sitelist_url, facility, failures_file='failures.json'):
+def add_failure(sitelist_url, facility, failures_file='failures.db'):
     u"""Signal to the parser that there was a problem processing a facility.
 
     :param string sitelist_url: The URL of the site list.
     :param FacilityParser facility: The facility object that could not be processed.
-    :param string failures_file: The path of a JSON file to write the failures to.
+    :param string failures_file: The path of the SQLite database to record failures in, relative to the
+        current directory.  A JSON failures file from an earlier version is converted to a database.
 
-    This will cause the parser to register the failure to the failures file.
-    It will then be retried the next time the parser runs on that site list.
+    This will cause the parser to register the failure in the failures store.
+    It will then be retried on a later run of the parser on that site list.
     """
     parser = parsers.get_parser(sitelist_url)
 
@@ -59,7 +70,7 @@ def main():
     parser = OptionParser(usage=u"%prog [options] url")
     parser.add_option(u"-u", u"--username", dest=u"username", default=u"", help=u"username for authentication")
     parser.add_option(u"-p", u"--password", dest=u"password", default=u"", help=u"password for authentication")
-    parser.add_option(u"-f", u"--failures", dest=u"failures", default=u"failures.json", help=u"failures file")
+    parser.add_option(u"-f", u"--failures", dest=u"failures", default=u"failures.db", help=u"failures file")
 
     options, args = parser.parse_args()
     if len(args) != 1:
@@ -0,0 +1,203 @@
+u"""Asynchronous (asyncio) version of the FLM-x parser.
+
+This module requires Python 3.7 or later.  Site lists and FLMs are fetched with
+non-blocking sockets, and the parsing itself is run in an executor so the event loop
+is never blocked on schema validation or tree building.
+"""
+import asyncio, base64, logging, ssl, time
+from datetime import datetime
+from io import BytesIO
+from urllib.parse import urljoin, urlsplit
+
+from lxml.etree import XMLSyntaxError
+
+from smpteparsers.flmx.facility import FacilityParser
+from smpteparsers.flmx.sitelist import SiteListParser
+from smpteparsers.flmx.error import FlmxParseError, FlmxPartialError, FlmxRequestError
+from smpteparsers.flmx.parse import Parser
+
+_logger = logging.getLogger(__name__)
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+
+# The largest response body that will be read into memory, in bytes
+MAX_BODY_SIZE = 64 * 1024 * 1024
+_CHUNK_SIZE = 64 * 1024
+
+async def fetch(url, username=u'', password=u'', timeout=60, max_redirects=5, max_size=MAX_BODY_SIZE):
+    u"""Fetch a URL over HTTP(S) without blocking the event loop and return the body as bytes.
+
+    Raises :class:`FlmxRequestError` for any response other than *200 OK*, or
+    if the body is larger than `max_size` bytes.
+    """
+    for _ in range(max_redirects + 1):
+        status, headers, body = await asyncio.wait_for(_request(url, username, password, max_size), timeout)
+
+        if status in _REDIRECTS and u'location' in headers:
+            url = urljoin(url, headers[u'location'])
+            continue
+        if status != 200:
+            _logger.warning(u'Could not access {0}: HTTP Response code {1}'.format(url, status))
+            raise FlmxRequestError(u'Could not access {0}: HTTP Response code {1}'.format(url, status))
+        return body
+
+    raise FlmxRequestError(u'Too many redirects fetching ' + url)
+
+async def _request(url, username, password, max_size):
+    parts = urlsplit(url)
+    if parts.scheme not in (u'http', u'https'):
+        raise FlmxRequestError(u'Unsupported URL scheme: ' + url)
+
+    secure = parts.scheme == u'https'
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+    )
+
+    try:
+        path = parts.path or u'/'
+        if parts.query:
+            path += u'?' + parts.query
+
+        # HTTP/1.0 so the body is never chunked and ends when the connection closes
+        lines = [u'GET {0} HTTP/1.0'.format(path), u'Host: ' + parts.netloc.rpartition(u'@')[2]]
+        if username and password:
+            credentials = u'{0}:{1}'.format(username, password).encode(u'utf-8')
+            lines.append(u'Authorization: Basic ' + base64.b64encode(credentials).decode(u'ascii'))
+        writer.write((u'\r\n'.join(lines) + u'\r\n\r\n').encode(u'latin-1'))
+
+        status_line = await reader.readline()
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise FlmxRequestError(u'Invalid HTTP response from ' + url)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode(u'latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(u':')
+            headers[name.strip().lower()] = value.strip()
+
+        # Read in chunks so an oversized response is refused before it is all in memory
+        chunks, size = [], 0
+        while True:
+            chunk = await reader.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise FlmxRequestError(u'Response from {0} is larger than {1} bytes'.format(url, max_size))
+            chunks.append(chunk)
+        body = b''.join(chunks)
+    finally:
+        writer.close()
+
+    return status, headers, body
+
+class AsyncParser(object):
+    u"""Asynchronous parser for an FLM-x feed.
+
+    :param string sitelist_url: The URL of the FLM site list.
+    :param executor: A :mod:`concurrent.futures` executor to parse documents in.
+        By default the event loop's default executor is used.
+
+    Failures are recorded in the same store, and retried in the same way, as the
+    synchronous :class:`~smpteparsers.flmx.parse.Parser`.
+    """
+
+    def __init__(self, sitelist_url, executor=None):
+        self.sitelist_url = sitelist_url
+        self.executor = executor
+        # Only used for its failure store handling, which is shared with the synchronous parser
+        self._parser = Parser(sitelist_url)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def parse(self, username=u'', password=u'', last_ran=datetime.min, failures_file=u'failures.db',
+                    concurrency=4, timeout=60):
+        u"""Async generator that yields a :class:`FacilityParser` for each FLM in the site list.
+
+        Up to `concurrency` FLMs are fetched and parsed at the same time, and facilities are
+        yielded in the order they finish.  The other arguments are the same as for
+        :func:`smpteparsers.flmx.parse`.
+        """
+        sp = await self.get_sitelist(username=username, password=password, timeout=timeout)
+        sites = sp.get_sites(last_ran)
+
+        store = await self._run(self._parser.get_failure_store, failures_file)
+        prev_failures = await self._run(store.get_due, self.sitelist_url)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get(site):
+            async with semaphore:
+                try:
+                    return site, await self.get_facility(site, username=username, password=password, timeout=timeout)
+                except (FlmxRequestError, FlmxParseError, FlmxPartialError, XMLSyntaxError,
+                        OSError, asyncio.TimeoutError) as e:
+                    _logger.warning(str(e))
+                    return site, None
+
+        # Ensure we don't check the failures twice
+        tasks = [asyncio.ensure_future(get(site)) for site in set(prev_failures) | set(sites.keys())]
+        try:
+            for future in asyncio.as_completed(tasks):
+                site, fp = await future
+                if fp is None:
+                    await self._run(store.add_failure, self.sitelist_url, site)
+                else:
+                    _logger.info(u'returning facility ' + fp.id + u' from ' + self.sitelist_url)
+                    yielded = time.time()
+                    yield fp
+                    # The caller has finished with the facility, any failure it added since is kept
+                    await self._run(store.clear_failure, self.sitelist_url, site, yielded)
+        finally:
+            # The caller may stop iterating early, don't leave fetches running
+            for task in tasks:
+                task.cancel()
+
+    async def add_failure(self, site, failures_file=u'failures.db'):
+        u"""Record a failure for a site in the failures store."""
+        await self._run(self._parser.add_failure, site, failures_file)
+
+    async def get_sitelist(self, username=u'', password=u'', timeout=60):
+        body = await fetch(self.sitelist_url, username=username, password=password, timeout=timeout)
+        return await self._run(SiteListParser, BytesIO(body))
+
+    async def get_facility(self, url, username=u'', password=u'', timeout=60):
+        if u'://' not in url:
+            # Assume URL is relative
+            url = urljoin(self.sitelist_url, url)
+
+        body = await fetch(url, username=username, password=password, timeout=timeout)
+
+        try:
+            _logger.info(u'Parsing FLM at ' + url)
+            return await self._run(FacilityParser, BytesIO(body))
+        except FlmxParseError as e:
+            raise FlmxParseError(u"Problem parsing FLM at " + url + u". Error message: " + e.msg)
+
+def parse_async(sitelist_url, username=u'', password=u'', last_ran=datetime.min, failures_file=u'failures.db',
+                concurrency=4, executor=None):
+    u"""Asynchronous version of :func:`smpteparsers.flmx.parse`.
+
+    Returns an async iterator of :class:`FacilityParser` objects:
+
+    >>> async for facility in flmx.parse_async(u'http://example.com/FLMX.xml'):
+    ...     screen_keys = facility.get_certificates()
+
+    :param int concurrency: The maximum number of FLMs to fetch and parse at the same time.
+    :param executor: A :mod:`concurrent.futures` executor to parse documents in.
+
+    The other arguments are the same as for :func:`smpteparsers.flmx.parse`.
+    """
+    parser = AsyncParser(sitelist_url, executor=executor)
+    return parser.parse(username=username, password=password, last_ran=last_ran,
+                        failures_file=failures_file, concurrency=concurrency)
+
+async def add_failure_async(sitelist_url, facility, failures_file=u'failures.db'):
+    u"""Asynchronous version of :func:`smpteparsers.flmx.add_failure`."""
+    await AsyncParser(sitelist_url).add_failure(facility.id, failures_file)
@@ -31,3 +31,12 @@ class FlmxPartialError(FlmxError):
 
     """
     pass
+
+class FlmxRequestError(FlmxError):
+    u"""Raised by the asynchronous parser when a site list or FLM cannot be fetched.
+
+    For example, when the server responds with anything other than *200 OK*.
+    The synchronous parser raises the equivalent ``requests`` exceptions instead.
+
+    """
+    pass
@@ -1,12 +1,11 @@
 import os, logging
 
-from bs4 import BeautifulSoup
-
 from smpteparsers.flmx import error
 from smpteparsers.flmx.helper import (
     get_boolean, get_string, get_date, get_uint, get_datetime,
-    deliveries, validate_XML
+    deliveries, iterparse_XML
 )
+from smpteparsers.util import profiling
 
 
 
@@ -16,6 +15,7 @@ class FacilityParser(object):
     u"""Represents the top-level facility which the FLM refers to.
 
     :param xml: an XML string or an open, readable XML file containing an FLM feed.
+        A file is read incrementally, so a streamed HTTP response can be given directly.
 
     Any of the values in the FLM feed can be accessed through the objects given in the next section.
     For example, the screen colour of the 3D system installed in screen #1 can be accessed using
@@ -44,26 +44,23 @@ class FacilityParser(object):
     """
 
     def __init__(self, xml):
+        self.auditoriums = {}
 
-        #If it's a file, we call .read() on it so that it can be consumed twice - once by XMLValidator, and once by
-        #beautiful soup
-        if not (isinstance(xml, str) or isinstance(xml, unicode)):
-            try:
-                xml = xml.read()
-            except AttributeError as e:
-                _logger.critical(repr(e))
-                raise error.FlmxCriticalError(repr(e))
-
-        validate_XML(xml, os.path.join(os.path.dirname(__file__), u'schema', u'schema_facility.xsd'))
-
-        flm = BeautifulSoup(xml, u'xml')
-
-        if flm.FLMPartial and get_boolean(flm.FLMPartial):
-            msg = u"Partial FLMs not supported"
-            _logger.error(msg)
-            raise error.FlmxPartialError(u"Partial FLMs are not supported by this parser.")
+        # The FLM is validated and parsed in a single pass, each auditorium is built as soon as
+        # it has been read and then discarded so only one is held in memory at a time
+        xsd = os.path.join(os.path.dirname(__file__), u'schema', u'schema_facility.xsd')
+        for node in iterparse_XML(xml, xsd, (u'FacilityInfo', u'Auditorium')):
+            if node.name == u'FacilityInfo':
+                if node.FLMPartial and get_boolean(node.FLMPartial):
+                    msg = u"Partial FLMs not supported"
+                    _logger.error(msg)
+                    raise error.FlmxPartialError(u"Partial FLMs are not supported by this parser.")
+
+                self.setup_facility(node)
+            else:
+                self.add_auditorium(Auditorium(node))
 
-        self.setup_facility(flm)
+        profiling.count(u'flmx.auditoriums', len(self.auditoriums))
 
     def setup_facility(self, flm):
         # Strip the 'urn:x-facilityID' tag from the front of the ID
@@ -97,14 +94,12 @@ class FacilityParser(object):
             contact_list = flm.ContactList
             self.contacts = [Contact(contact) for contact in contact_list(u"Contact")]
 
-        self.auditoriums = {}
-        for auditorium in flm(u"Auditorium"):
-            # The auditorium numbers and names are unique for a given facility
-            new_auditorium = Auditorium(auditorium)
-            if new_auditorium.number:
-                self.auditoriums[new_auditorium.number] = new_auditorium
-            else:
-                self.auditoriums[new_auditorium.name] = new_auditorium
+    def add_auditorium(self, auditorium):
+        # The auditorium numbers and names are unique for a given facility
+        if auditorium.number:
+            self.auditoriums[auditorium.number] = auditorium
+        else:
+            self.auditoriums[auditorium.name] = auditorium
 
     # Add some more consuming methods, these are just ideas of what data you'd need to get back.
     def get_screens(self):
@@ -124,7 +119,7 @@ class FacilityParser(object):
         """
         screens = {}
 
-        for identifier, auditorium in self.auditoriums.iteritems():
+        for identifier, auditorium in self.auditoriums.items():
             # Flatten certificates for all devices in same auditorium into one list
             certs = [cert for device in auditorium.devices for cert in device.certificates]
 
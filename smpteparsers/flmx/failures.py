@@ -0,0 +1,183 @@
+import json, os, time, logging
+
+from smpteparsers.flmx.error import FlmxError
+from smpteparsers.util.sqlite import connection, transaction
+
+_logger = logging.getLogger(__name__)
+
+_SQLITE_HEADER = b'SQLite format 3\x00'
+
+def _read_legacy(path):
+    u"""Returns the failures from a JSON failures file, as a dict of lists of FLM URLs keyed by site list URL.
+
+    Returns ``None`` if the file is missing, empty or already a SQLite database.
+
+    """
+    try:
+        with open(path, u'rb') as f:
+            contents = f.read()
+    except IOError:
+        return None
+    if not contents or contents.startswith(_SQLITE_HEADER):
+        return None
+
+    try:
+        failures = json.loads(contents.decode(u'utf-8'))
+        if not isinstance(failures, dict) or not all(isinstance(sites, list) for sites in failures.values()):
+            raise ValueError(u'Expected a JSON object of lists')
+    except ValueError as e:
+        raise FlmxError(u'{0} is neither a failures database nor a JSON failures file: {1}'.format(path, e))
+    return failures
+
+class Failure(object):
+    u"""A single failed FLM fetch recorded against a site list.
+
+    :ivar string sitelist_url: The URL of the site list the FLM belongs to.
+    :ivar string site: The FLM URL (as given in the site list) which failed.
+    :ivar integer retries: How many times in a row the FLM has failed.
+    :ivar float first_failed: POSIX timestamp of the first failure in this run of failures.
+    :ivar float last_failed: POSIX timestamp of the most recent failure.
+    :ivar float next_retry: POSIX timestamp before which the FLM should not be retried.
+
+    """
+    def __init__(self, sitelist_url, site, retries, first_failed, last_failed, next_retry):
+        self.sitelist_url = sitelist_url
+        self.site = site
+        self.retries = retries
+        self.first_failed = first_failed
+        self.last_failed = last_failed
+        self.next_retry = next_retry
+
+    def is_due(self, now=None):
+        u"""Whether the backoff period for this failure has elapsed."""
+        return self.next_retry <= (time.time() if now is None else now)
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+class FailureStore(object):
+    u"""Persistent, concurrency-safe record of FLMs which could not be processed.
+
+    :param string path: Path of the SQLite database file to store the failures in.
+        It will be created if it does not exist.
+    :param float backoff: Seconds to wait before retrying an FLM after its first failure.
+        The wait doubles with every further consecutive failure.
+    :param float max_backoff: Upper bound on the wait between retries, in seconds.
+    :param float timeout: Seconds to wait for a lock held by another parser.
+
+    Failures are keyed by site list URL and FLM URL, so parsers for different site lists
+    (in the same or in different processes) can share a single store without overwriting
+    each other's entries.  Every change is made in its own transaction, so only the
+    affected rows are written rather than the whole store.
+
+    A JSON failures file, as written by earlier versions of the parser, is converted to a
+    database in place, with its failures due to be retried straight away.  Any other file
+    which isn't a SQLite database raises an `FlmxError`.
+
+    """
+    def __init__(self, path, backoff=60.0, max_backoff=86400.0, timeout=30.0):
+        self.path = path
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        legacy = _read_legacy(self.path)
+        if legacy is None:
+            self._create(self.path)
+        else:
+            self._migrate(legacy)
+
+    def _create(self, path):
+        with connection(path, self.timeout) as conn:
+            conn.execute(
+                u"CREATE TABLE IF NOT EXISTS failures ("
+                u"sitelist_url TEXT NOT NULL, "
+                u"site TEXT NOT NULL, "
+                u"retries INTEGER NOT NULL, "
+                u"first_failed REAL NOT NULL, "
+                u"last_failed REAL NOT NULL, "
+                u"next_retry REAL NOT NULL, "
+                u"PRIMARY KEY (sitelist_url, site))"
+            )
+
+    def _migrate(self, legacy):
+        # Build the database alongside the JSON file and swap it in, so the file is never half converted
+        now = time.time()
+        tmp_path = u'{0}.{1}.tmp'.format(self.path, os.getpid())
+        self._create(tmp_path)
+        with transaction(tmp_path, self.timeout) as conn:
+            conn.executemany(
+                u"INSERT OR REPLACE INTO failures VALUES (?, ?, 1, ?, ?, ?)",
+                [(sitelist_url, site, now, now, now) for sitelist_url, sites in legacy.items() for site in sites]
+            )
+
+        if os.name == u'nt' and os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp_path, self.path)
+        _logger.info(u'Converted the JSON failures file {0} to a database'.format(self.path))
+
+    def get_backoff(self, retries):
+        u"""Returns the number of seconds to wait after the given number of consecutive failures."""
+        return min(self.backoff * 2 ** max(retries - 1, 0), self.max_backoff)
+
+    def add_failure(self, sitelist_url, site, now=None):
+        u"""Record a failure for an FLM and return the updated :class:`Failure`.
+
+        If the FLM has already failed, its retry count is incremented and the backoff
+        extended, otherwise a new entry is created.
+
+        """
+        now = time.time() if now is None else now
+
+        # The write lock is taken up front so the read-modify-write below is atomic
+        with transaction(self.path, self.timeout) as conn:
+            row = conn.execute(
+                u"SELECT retries, first_failed FROM failures WHERE sitelist_url = ? AND site = ?",
+                (sitelist_url, site)
+            ).fetchone()
+
+            retries, first_failed = (row[0] + 1, row[1]) if row else (1, now)
+            failure = Failure(sitelist_url, site, retries, first_failed, now, now + self.get_backoff(retries))
+
+            conn.execute(
+                u"INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?, ?, ?)",
+                (sitelist_url, site, failure.retries, failure.first_failed,
+                 failure.last_failed, failure.next_retry)
+            )
+
+        _logger.info(u'Recorded failure #{0} for {1}'.format(failure.retries, site))
+        return failure
+
+    def clear_failure(self, sitelist_url, site, before=None):
+        u"""Remove an FLM from the failures, for example once it has been fetched successfully.
+
+        :param float before: Only remove the failure if it was last recorded before this time, so
+            a failure added again since then is kept along with its retry count.
+
+        """
+        with connection(self.path, self.timeout) as conn:
+            if before is None:
+                conn.execute(u"DELETE FROM failures WHERE sitelist_url = ? AND site = ?", (sitelist_url, site))
+            else:
+                conn.execute(u"DELETE FROM failures WHERE sitelist_url = ? AND site = ? AND last_failed < ?",
+                             (sitelist_url, site, before))
+
+    def clear(self, sitelist_url):
+        u"""Remove all failures for a site list."""
+        with connection(self.path, self.timeout) as conn:
+            conn.execute(u"DELETE FROM failures WHERE sitelist_url = ?", (sitelist_url,))
+
+    def get_failures(self, sitelist_url):
+        u"""Returns all failures for a site list as a dict of :class:`Failure` objects keyed by FLM URL."""
+        with connection(self.path, self.timeout) as conn:
+            rows = conn.execute(
+                u"SELECT site, retries, first_failed, last_failed, next_retry FROM failures WHERE sitelist_url = ?",
+                (sitelist_url,)
+            ).fetchall()
+
+        return dict((row[0], Failure(sitelist_url, *row)) for row in rows)
+
+    def get_due(self, sitelist_url, now=None):
+        u"""Returns the FLM URLs for a site list whose backoff period has elapsed."""
+        now = time.time() if now is None else now
+        return [site for site, failure in self.get_failures(sitelist_url).items() if failure.is_due(now)]
@@ -1,26 +1,36 @@
 
 import os
+import sys
 import logging
 
 from datetime import datetime as dt
 from datetime import timedelta
 
-from bs4 import Tag
+from lxml import etree
+
+from io import BytesIO, StringIO
 
 try:
-    from StringIO import StringIO
-except ImportError:
-    from io import StringIO
+    text_type = unicode
+except NameError:
+    text_type = str
 
 from smpteparsers.flmx import error
 from smpteparsers.flmx import xmlvalidation
+from smpteparsers.util import PARSER_OPTIONS
 
 _logger = logging.getLogger(__name__)
 
 # These helper methods take XML, strip the tags and
 # convert the contents to the required type
 def strip_tags(s):
-    return s.get_text() if isinstance(s, Tag) else s
+    if isinstance(s, XMLNode):
+        return s.get_text()
+    # BeautifulSoup is only loaded by callers which pass its Tags, so if it isn't loaded s isn't one
+    bs4 = sys.modules.get('bs4')
+    if bs4 is not None and isinstance(s, bs4.Tag):
+        return s.get_text()
+    return s
 
 def get_boolean(s):
     s = strip_tags(s)
@@ -31,7 +41,7 @@ def get_boolean(s):
 def get_string(s):
     # XML contents are already a string so we need to strip the tags
     # and convert to unicode
-    return unicode(strip_tags(s)) if s is not None else None
+    return text_type(strip_tags(s)) if s is not None else None
 
 def get_date(s):
     s = strip_tags(s)
@@ -123,9 +133,11 @@ def validate_XML(xml, xsd):
     # It is the calling method's responsibility to ensure the pathname works
     # across platforms and OSes
     with open(xsd, u'r') as xsd:
-        # If xml is a string, we wrap it in a StringIO object so validate and lxml
+        # If xml is a string, we wrap it in a file object so validate and lxml
         # will work nicely with it
-        if isinstance(xml, str) or isinstance(xml, unicode):
+        if isinstance(xml, bytes):
+            xml = BytesIO(xml)
+        elif isinstance(xml, text_type):
             xml = StringIO(xml)
 
         if not v.validate(xml, xsd):
@@ -135,3 +147,129 @@ def validate_XML(xml, xsd):
                 _logger.error('XML Validation failed: ' + repr(entry))
                 error_msg += repr(entry) + u"\n"
             raise error.FlmxParseError(error_msg)
+
+class XMLNode(object):
+    u"""A light wrapper giving an lxml element the parts of the BeautifulSoup ``Tag`` interface used by the parsers.
+
+    Child elements are found by their local name regardless of namespace, so ``node.FacilityID``
+    returns the first descendant called *FacilityID* (or ``None``), and ``node(u"Device")``
+    returns all descendants called *Device*.  This lets the FLM-x objects be built straight
+    from a streamed lxml tree as well as from BeautifulSoup.
+
+    """
+    __slots__ = (u'element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def __getattr__(self, name):
+        if name.startswith(u'__'):
+            raise AttributeError(name)
+        for element in self.element.iterdescendants(u'{*}' + name):
+            return XMLNode(element)
+        return None
+
+    def __call__(self, name):
+        return [XMLNode(element) for element in self.element.iterdescendants(u'{*}' + name)]
+
+    def find_all(self, name):
+        return self(name)
+
+    def __getitem__(self, key):
+        # Attributes may be given with a prefix, eg. 'xlink:href'
+        prefix, _, name = key.rpartition(u':')
+        if prefix:
+            key = u'{{{0}}}{1}'.format(self.element.nsmap.get(prefix, prefix), name)
+        return self.element.attrib[key]
+
+    @property
+    def name(self):
+        return etree.QName(self.element).localname
+
+    @property
+    def string(self):
+        return self.element.text
+
+    def get_text(self):
+        return u''.join(self.element.itertext())
+
+# A validating iterparse doesn't report a truncated document when entities aren't resolved at all,
+# so only internal entities are where lxml supports it. External entities are never loaded.
+_ITERPARSE_OPTIONS = dict(PARSER_OPTIONS, resolve_entities=u'internal' if etree.LXML_VERSION >= (5,) else False)
+
+class _EncodedReader(object):
+    u"""Reads a text stream as UTF-8 bytes, so it is still parsed as it is read."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def read(self, size=-1):
+        return self.stream.read(size).encode(u'utf-8')
+
+_schemas = {}
+def get_schema(xsd):
+    u"""Returns the compiled ``lxml.etree.XMLSchema`` for an .xsd file, compiling it only once per process.
+
+    Raises an `FlmxCriticalError` if the schema cannot be loaded.
+
+    """
+    if xsd not in _schemas:
+        try:
+            _schemas[xsd] = etree.XMLSchema(etree.parse(xsd))
+        except (etree.XMLSyntaxError, etree.XMLSchemaParseError) as e:
+            msg = u"Schema could not be parsed: " + repr(e)
+            _logger.critical(msg)
+            raise error.FlmxCriticalError(msg)
+    return _schemas[xsd]
+
+def iterparse_XML(xml, xsd, tags):
+    u"""Parses and validates an XML document in a single streaming pass.
+
+    Yields each element whose local name is in `tags` once it has been completely read,
+    as an :class:`XMLNode`.  Once the caller has finished with an element it is cleared,
+    along with any earlier siblings, so the whole document is never held in memory.
+
+    Will raise an `FlmxParseError` if the document is malformed or fails validation.
+    As validation happens while the document is read, this can be raised after some
+    elements have already been yielded.
+
+    :param xml: A string containing the XML document or a readable file-like object.
+        A text stream is read as UTF-8, in the same way as a text string.
+    :param string xsd: A filename of a .xsd schema file to validate against.
+    :param tags: The local names of the elements to yield.
+
+    """
+    if isinstance(xml, text_type):
+        xml = xml.encode(u'utf-8')
+    if isinstance(xml, bytes):
+        xml = BytesIO(xml)
+    elif hasattr(xml, u'read'):
+        if isinstance(xml.read(0), text_type):
+            xml = _EncodedReader(xml)
+    else:
+        msg = u"Expected an XML string or file object, got " + repr(xml)
+        _logger.critical(msg)
+        raise error.FlmxCriticalError(msg)
+
+    try:
+        schema = get_schema(xsd)
+    except error.FlmxCriticalError:
+        # A malformed document is still reported as a parse error when the schema is unusable
+        try:
+            for _ in etree.iterparse(xml, events=(u'end',), **PARSER_OPTIONS):
+                pass
+        except etree.XMLSyntaxError as e:
+            raise error.FlmxParseError(repr(e))
+        raise
+
+    tags = [u'{*}' + tag for tag in tags]
+    try:
+        for _, element in etree.iterparse(xml, events=(u'end',), tag=tags, schema=schema, **_ITERPARSE_OPTIONS):
+            yield XMLNode(element)
+
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        _logger.error(u'XML Validation failed: ' + repr(e))
+        raise error.FlmxParseError(repr(e))
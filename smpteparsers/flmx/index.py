@@ -0,0 +1,111 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+class ScreenRef(object):
+    u"""Where a certificate or device lives.
+
+    :ivar FacilityParser facility: The facility containing the device.
+    :ivar int/string screen: The key of the auditorium in ``facility.auditoriums``.
+    :ivar Auditorium auditorium: The auditorium containing the device.
+    :ivar Device device: The device.
+    :ivar Certificate certificate: The certificate, or ``None`` for device lookups.
+
+    """
+    __slots__ = (u'facility', u'screen', u'auditorium', u'device', u'certificate')
+
+    def __init__(self, facility, screen, auditorium, device, certificate=None):
+        self.facility = facility
+        self.screen = screen
+        self.auditorium = auditorium
+        self.device = device
+        self.certificate = certificate
+
+    def __repr__(self):
+        return u'ScreenRef({0}, {1}, {2})'.format(self.facility.id, self.screen, self.device.id)
+
+class CertificateIndex(object):
+    u"""Index of certificates, devices and screens across many facilities.
+
+    Lookups by certificate thumbprint, device ID or ``(facility id, screen)`` are
+    single dictionary lookups.  Re-adding a facility after it has been parsed again
+    replaces only that facility's entries.
+
+    Example usage:
+
+    >>> index = CertificateIndex()
+    >>> for facility in flmx.parse(u'http://example.com/FLMX.xml'):
+    ...     index.add_facility(facility)
+    >>> ref = index.get_certificate(u'OthN+QPcj6n9v5dhCtTDsnN2v6A=')
+    >>> ref.facility.id, ref.screen, ref.device.id
+
+    Thumbprints and device IDs should be unique, but if the same one appears in two
+    facilities (for example while a device is being moved) the most recently added
+    facility wins.
+
+    """
+    def __init__(self, facilities=()):
+        self.facilities = {}
+        self.certificates = {}
+        self.devices = {}
+        self.screens = {}
+
+        for facility in facilities:
+            self.add_facility(facility)
+
+    def __len__(self):
+        return len(self.certificates)
+
+    def __contains__(self, thumbprint):
+        return thumbprint in self.certificates
+
+    def add_facility(self, facility):
+        u"""Add a facility to the index, replacing any entries from a previous parse of it."""
+        self.remove_facility(facility.id)
+        self.facilities[facility.id] = facility
+
+        for screen, auditorium in facility.auditoriums.items():
+            self.screens[(facility.id, screen)] = auditorium
+
+            for device in auditorium.devices:
+                ref = ScreenRef(facility, screen, auditorium, device)
+                if device.id in self.devices:
+                    _logger.warning(u'Device {0} is in both {1} and {2}'.format(
+                        device.id, self.devices[device.id].facility.id, facility.id))
+                self.devices[device.id] = ref
+
+                for certificate in device.certificates:
+                    if certificate.thumbprint:
+                        self.certificates[certificate.thumbprint] = ScreenRef(
+                            facility, screen, auditorium, device, certificate)
+
+    def remove_facility(self, facility_id):
+        u"""Remove all entries for a facility from the index."""
+        facility = self.facilities.pop(facility_id, None)
+        if facility is None:
+            return
+
+        for screen, auditorium in facility.auditoriums.items():
+            self.screens.pop((facility_id, screen), None)
+
+            for device in auditorium.devices:
+                # Only remove entries which still point at this facility
+                if device.id in self.devices and self.devices[device.id].facility is facility:
+                    del self.devices[device.id]
+
+                for certificate in device.certificates:
+                    ref = self.certificates.get(certificate.thumbprint)
+                    if ref is not None and ref.facility is facility:
+                        del self.certificates[certificate.thumbprint]
+
+    def get_certificate(self, thumbprint):
+        u"""Returns the :class:`ScreenRef` for a certificate thumbprint, or ``None`` if it is not indexed."""
+        return self.certificates.get(thumbprint)
+
+    def get_device(self, device_id):
+        u"""Returns the :class:`ScreenRef` for a device ID, or ``None`` if it is not indexed."""
+        return self.devices.get(device_id)
+
+    def get_screen(self, facility_id, screen):
+        u"""Returns the :class:`Auditorium` for a facility and screen number or name, or ``None``."""
+        return self.screens.get((facility_id, screen))
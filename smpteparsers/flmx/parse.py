@@ -1,6 +1,6 @@
 from datetime import datetime
 from lxml.etree import XMLSyntaxError
-import logging, requests, json, os
+import logging, os, time
 
 try:
     from urlparse import urljoin
@@ -10,6 +10,8 @@ except ImportError:
 from smpteparsers.flmx.facility import FacilityParser
 from smpteparsers.flmx.sitelist import SiteListParser
 from smpteparsers.flmx.error import FlmxParseError, FlmxPartialError
+from smpteparsers.flmx.failures import FailureStore
+from smpteparsers.util import profiling
 
 # setup logger - __ to ensure it's not accessible from outside
 _logger = logging.getLogger(__name__)
@@ -22,34 +24,32 @@ class Parser(object):
 
     def __init__(self, sitelist_url):
         self.sitelist_url = sitelist_url
-        self.current_failures = []
-        self.is_parsing = False
 
-    def parse(self, username=u'', password=u'', last_ran=datetime.min, failures_file=u'failures.json'):
+    def parse(self, username=u'', password=u'', last_ran=datetime.min, failures_file=u'failures.db'):
         """Generator to parse a site list and return the facilities.
 
-        The generator will read the failures from the failures file the first time it is used.
-        Then it will yield each facility object in turn when requested, and write any failures
-        back at the end.  Using a generator here prevents a large number of subsequent requests
-        to the FLM-x endpoint, as processing on the current facility can be done before the next
-        is requested.  When the generator is yielded, the parser is considered to be in
-        'parsing mode' (the is_parsing flag is set to True).  While in this mode, other methods
-        should not change anything which the parser relies on for correct operation.
-        Since the failures file is written when the generator exits, any changes
-        to the file while the parser is in parsing mode will be overwritten.
+        The generator will retry any FLMs recorded in the failures store whose backoff has
+        elapsed, along with every FLM modified since `last_ran`.  It will yield each facility
+        object in turn when requested.  Using a generator here prevents a large number of
+        subsequent requests to the FLM-x endpoint, as processing on the current facility can
+        be done before the next is requested.
+
+        An FLM which can't be fetched is recorded in the failures store straight away.  One which
+        is fetched is cleared from it once the caller asks for the next facility, unless the
+        caller marked it as failed again with `add_failure` in the meantime, which keeps its
+        retry count.  Failures added by parsers for other site lists while the generator is
+        running are never overwritten.
 
         More documentation on the arguments can be found in __init__.py, which provides the public
         interface to this method.
         """
+        # requests is imported on first use, so importing the package doesn't load the HTTP stack
+        import requests
         sp = self.get_sitelist(username=username, password=password)
         sites = sp.get_sites(last_ran)
 
-        all_failures = self.read_failures(failures_file)
-        prev_failures = all_failures.get(self.sitelist_url, [])
-
-        # Set parser to 'parsing' mode before wiping current failures
-        self.is_parsing = True
-        self.current_failures = []
+        store = self.get_failure_store(failures_file)
+        prev_failures = store.get_due(self.sitelist_url)
 
         # Ensure we don't check the failures twice
         for site in set(prev_failures) | set(sites.keys()):
@@ -57,47 +57,28 @@ class Parser(object):
                 fp = self.get_facility(site, username=username, password=password)
             except (requests.exceptions.RequestException, FlmxParseError, FlmxPartialError, XMLSyntaxError) as e:
                 _logger.warning(str(e))
-                self.current_failures.append(site)
+                store.add_failure(self.sitelist_url, site)
             else:
                 _logger.info('returning facility ' + fp.id + ' from ' + self.sitelist_url)
+                yielded = time.time()
                 yield fp
+                # The caller has finished with the facility, any failure it added since is kept
+                store.clear_failure(self.sitelist_url, site, before=yielded)
 
-        all_failures[self.sitelist_url] = self.current_failures
-        self.write_failures(all_failures, failures_file)
-        self.is_parsing = False
-
-    def add_failure(self, site, failures_file=u'failures.json'):
-        """Add a failure to the current failures list.
+    def add_failure(self, site, failures_file=u'failures.db'):
+        """Record a failure for a site in the failures store.
 
-        If the parser is not currently parsing (the parse method is yielded),
-        then the failure will be written immediately, otherwise the failure will be written
-        by the parse method when it exits.  This is to prevent write conflicts.
+        The site will be retried on a later run once its backoff period has elapsed.
+        This is safe to call while the parse generator is running.
         """
-        self.current_failures.append(site)
+        self.get_failure_store(failures_file).add_failure(self.sitelist_url, site)
 
-        # If parser is not in parsing mode then write the failure
-        # Otherwise it will be written when the parser exits parsing mode
-        if not self.is_parsing:
-            failures = self.read_failures(failures_file)
-            failures[self.sitelist_url] = self.current_failures
-            self.write_failures(failures, failures_file)
-
-    def read_failures(self, failures_file):
-        """Read the failures file from JSON into a python dict."""
-        try:
-            with open(os.path.join(os.path.dirname(__file__), failures_file), u'r') as f:
-                return json.load(f)
-        # IOError if file does not exist, ValueError if file cannot be read or is not valid JSON
-        except (IOError, ValueError):
-            _logger.warning(failures_file + ' could not be opened, the file will be cleared')
-            return {}
-
-    def write_failures(self, failures, failures_file):
-        """Write the failures back to the failures file as JSON."""
-        with open(os.path.join(os.path.dirname(__file__), failures_file), u'w') as f:
-            json.dump(failures, f)
+    def get_failure_store(self, failures_file):
+        """Returns the FailureStore for the given file, relative paths are taken from the current directory."""
+        return FailureStore(os.path.abspath(failures_file))
 
     def request(self, url, username=u'', password=u''):
+        import requests
         res = None
         if username and password:
             res = requests.get(url, auth=(username, password), stream=True)
@@ -107,8 +88,10 @@ class Parser(object):
         return res
 
     def get_sitelist(self, username=u'', password=u''):
+        import requests
         # Get sitelist from URL using authentication if necessary
-        res = self.request(self.sitelist_url, username=username, password=password)
+        with profiling.span(u'flmx.fetch'):
+            res = self.request(self.sitelist_url, username=username, password=password)
 
         # Raise the HTTPError from requests if there was a problem
         if res.status_code != requests.codes.ok:
@@ -117,17 +100,20 @@ class Parser(object):
             res.raise_for_status()
 
         # response.text auto-converts the response body to a unicode string.
-        # This is not compatible with lxml validation so we have to get the raw HTTPResponse,
-        # read it, and then wrap it in StringIO so the validator can read it again.
-        # If efficiency becomes a problem this is an obvious bottleneck.
-        return SiteListParser(res.raw)
+        # This is not compatible with lxml validation so we give the parser the raw HTTPResponse,
+        # which it reads incrementally.  Any gzip/deflate content encoding is still decoded.
+        res.raw.decode_content = True
+        # The body is read as it's parsed, so this includes the time spent downloading it
+        with profiling.span(u'flmx.sitelist'):
+            return SiteListParser(res.raw)
 
     def get_facility(self, url, username=u'', password=u''):
         if u'://' not in url:
             # Assume URL is relative
             url = urljoin(self.sitelist_url, url)
 
-        res = self.request(url, username=username, password=password)
+        with profiling.span(u'flmx.fetch'):
+            res = self.request(url, username=username, password=password)
 
         # If there's a problem with obtaining an FLM
         if res.status_code != 200:
@@ -137,7 +123,9 @@ class Parser(object):
 
         try:
             _logger.info('Parsing FLM at ' + url)
-            return FacilityParser(res.raw)
+            res.raw.decode_content = True
+            with profiling.span(u'flmx.facility'):
+                return FacilityParser(res.raw)
         except FlmxParseError as e:
             raise FlmxParseError(u"Problem parsing FLM at " + url + u". Error message: " + e.msg)
         except XMLSyntaxError as e:
@@ -1,11 +1,9 @@
 import os
 import logging
 from datetime import datetime as dt
-from bs4 import BeautifulSoup
 from operator import attrgetter
 
-from smpteparsers.flmx.helper import get_datetime, validate_XML
-from smpteparsers.flmx.error import FlmxParseError
+from smpteparsers.flmx.helper import get_datetime, iterparse_XML
 
 _logger = logging.getLogger(__name__)
 
@@ -47,37 +45,30 @@ class SiteListParser(object):
         """Parses an XML sitelist, and constructs a container holding the the XML document's data.
 
         :param string xml: Either the contents of an XML file, or a file handle.
-            This will parse the contents and construct ``sites``.
+            This will parse the contents and construct ``sites``.  A file handle is
+            read incrementally.
         :param boolean validate: Defaults to true. If set, will validate the given
             XML file against the Sitelist XML Schema xsd file, as found on the `FLM-x Homepage`.
 
         """
 
-        #If it's a file, we call .read() on it so that it can be consumed twice - once by XMLValidator, and once by
-        #beautiful soup
-        if not (isinstance(xml, str) or isinstance(xml, unicode)):
-            try:
-                xml = xml.read()
-            except AttributeError as e:
-                _logger.critical(repr(e))
-                raise FlmxCriticalError(repr(e))
-
-        validate_XML(xml, os.path.join(os.path.dirname(__file__), u'schema', u'schema_sitelist.xsd'))
-
-        soup = BeautifulSoup(xml, u"xml")
-
-        self.originator = soup.SiteList.Originator.string
-        self.system_name = soup.SiteList.SystemName.string
         facilities = []
-        for facility in soup.find_all(u'Facility'):
-            facLink = FacilityLink()
-            facLink.id_code = facility[u'id']
-            # strip the timezone from the ISO timecode
-            facLink.last_modified = get_datetime(facility[u'modified'])
-            facLink.xlink_href = facility[u'xlink:href']
-            facLink.xlink_type = facility[u'xlink:type']
-
-            facilities.append(facLink)
+        xsd = os.path.join(os.path.dirname(__file__), u'schema', u'schema_sitelist.xsd')
+        # Validate and parse in a single pass, without holding the whole document in memory
+        for node in iterparse_XML(xml, xsd, (u'Originator', u'SystemName', u'Facility')):
+            if node.name == u'Originator':
+                self.originator = node.string
+            elif node.name == u'SystemName':
+                self.system_name = node.string
+            else:
+                facLink = FacilityLink()
+                facLink.id_code = node[u'id']
+                # strip the timezone from the ISO timecode
+                facLink.last_modified = get_datetime(node[u'modified'])
+                facLink.xlink_href = node[u'xlink:href']
+                facLink.xlink_type = node[u'xlink:type']
+
+                facilities.append(facLink)
         self.facilities = sorted(facilities, key=attrgetter(u'last_modified'))
 
     def get_sites(self, last_ran=dt.min):
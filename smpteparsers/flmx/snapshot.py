@@ -0,0 +1,217 @@
+import json, hashlib, time, logging
+from datetime import datetime
+
+from smpteparsers.util.sqlite import connection, transaction
+
+_logger = logging.getLogger(__name__)
+
+_AUDITORIUM_FIELDS = (u'number', u'name', u'supports_35mm', u'screen_aspect_ratio',
+                      u'adjustable_screen_mask', u'audio_format', u'large_format_type')
+_DEVICE_FIELDS = (u'type', u'serial', u'manufacturer_id', u'manufacturer_name', u'model_number',
+                  u'resolution', u'active')
+
+def _fields(obj, names):
+    out = {}
+    for name in names:
+        value = getattr(obj, name)
+        out[name] = value.isoformat() if isinstance(value, datetime) else value
+    return out
+
+def serialise_facility(facility):
+    u"""Returns a compact, JSON serialisable form of a :class:`FacilityParser`.
+
+    Only the parts of the facility needed to track structural changes are kept:
+    the auditoriums, their devices and the certificates of each device.
+    Auditoriums are keyed by their number or name as a string, devices by their ID and
+    certificates by their thumbprint.  Certificates are reduced to a SHA-1 digest of
+    the X.509 body, so a re-issued certificate with the same thumbprint is still detected.
+
+    """
+    auditoriums = {}
+    for key, auditorium in facility.auditoriums.items():
+        devices = {}
+        for device in auditorium.devices:
+            d = _fields(device, _DEVICE_FIELDS)
+            d[u'certificates'] = dict(
+                (cert.thumbprint or cert.subject_name or u'',
+                 hashlib.sha1((cert.certificate or u'').encode(u'utf-8')).hexdigest())
+                for cert in device.certificates
+            )
+            devices[device.id] = d
+
+        a = _fields(auditorium, _AUDITORIUM_FIELDS)
+        a[u'devices'] = devices
+        auditoriums[u'{0}'.format(key)] = a
+
+    return {
+        u'id': facility.id,
+        u'name': facility.name,
+        u'circuit': facility.circuit,
+        u'timezone': facility.timezone,
+        u'auditoriums': auditoriums
+    }
+
+class FacilityDiff(object):
+    u"""The structural differences between two snapshots of the same facility.
+
+    Screens are identified by their number or name as a string, devices by ``(screen, device id)``
+    and certificates by ``(screen, device id, thumbprint)``.
+
+    :ivar string facility_id: The ID of the facility.
+    :ivar [string] added_screens: Screens which are new in this snapshot.
+    :ivar [string] removed_screens: Screens which are no longer present.
+    :ivar [string] changed_screens: Screens present in both snapshots whose own fields changed.
+    :ivar [tuple] added_devices: Devices which are new, including devices in new screens.
+    :ivar [tuple] removed_devices: Devices which are no longer present.
+    :ivar [tuple] changed_devices: Devices present in both snapshots whose own fields changed.
+    :ivar [tuple] added_certificates: Certificates which are new or whose body changed.
+    :ivar [tuple] removed_certificates: Certificates which are no longer present or whose body changed.
+
+    A device swap shows up as a removed and an added device in the same screen.  A diff is
+    ``False`` in a boolean context when nothing changed.
+
+    """
+    def __init__(self, facility_id):
+        self.facility_id = facility_id
+        self.added_screens = []
+        self.removed_screens = []
+        self.changed_screens = []
+        self.added_devices = []
+        self.removed_devices = []
+        self.changed_devices = []
+        self.added_certificates = []
+        self.removed_certificates = []
+
+    @property
+    def certificates_changed(self):
+        u"""Whether any certificate was added, removed or re-issued."""
+        return bool(self.added_certificates or self.removed_certificates)
+
+    def __nonzero__(self):
+        return bool(self.added_screens or self.removed_screens or self.changed_screens or
+                    self.added_devices or self.removed_devices or self.changed_devices or
+                    self.certificates_changed)
+    __bool__ = __nonzero__
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+def diff_facilities(old, new):
+    u"""Compare two serialised facilities and return a :class:`FacilityDiff`.
+
+    :param dict old: The previous snapshot as returned by :func:`serialise_facility`,
+        or ``None`` if the facility has not been seen before.
+    :param dict new: The new snapshot.
+
+    """
+    diff = FacilityDiff(new[u'id'])
+    old_screens = old[u'auditoriums'] if old else {}
+    new_screens = new[u'auditoriums']
+
+    for screen in sorted(set(old_screens) | set(new_screens)):
+        old_screen = old_screens.get(screen)
+        new_screen = new_screens.get(screen)
+        old_devices = old_screen[u'devices'] if old_screen else {}
+        new_devices = new_screen[u'devices'] if new_screen else {}
+
+        if old_screen is None:
+            diff.added_screens.append(screen)
+        elif new_screen is None:
+            diff.removed_screens.append(screen)
+        elif _strip(old_screen, u'devices') != _strip(new_screen, u'devices'):
+            diff.changed_screens.append(screen)
+
+        for device_id in sorted(set(old_devices) | set(new_devices)):
+            old_device = old_devices.get(device_id)
+            new_device = new_devices.get(device_id)
+            old_certs = old_device[u'certificates'] if old_device else {}
+            new_certs = new_device[u'certificates'] if new_device else {}
+
+            if old_device is None:
+                diff.added_devices.append((screen, device_id))
+            elif new_device is None:
+                diff.removed_devices.append((screen, device_id))
+            elif _strip(old_device, u'certificates') != _strip(new_device, u'certificates'):
+                diff.changed_devices.append((screen, device_id))
+
+            for thumbprint in sorted(set(old_certs) | set(new_certs)):
+                if old_certs.get(thumbprint) == new_certs.get(thumbprint):
+                    continue
+                if thumbprint in old_certs:
+                    diff.removed_certificates.append((screen, device_id, thumbprint))
+                if thumbprint in new_certs:
+                    diff.added_certificates.append((screen, device_id, thumbprint))
+
+    return diff
+
+def _strip(d, key):
+    return dict((k, v) for k, v in d.items() if k != key)
+
+class SnapshotStore(object):
+    u"""Local store of facility snapshots, used to find what changed between FLM-x syncs.
+
+    :param string path: Path of the SQLite database file to store the snapshots in.
+        It will be created if it does not exist.
+    :param float timeout: Seconds to wait for a lock held by another process.
+
+    Example usage:
+
+    >>> store = SnapshotStore(u'snapshots.db')
+    >>> for facility in flmx.parse(u'http://example.com/FLMX.xml'):
+    ...     diff = store.update(facility)
+    ...     if diff.certificates_changed:
+    ...         regenerate_kdms(facility, diff.added_certificates)
+
+    """
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+
+        with connection(self.path, self.timeout) as conn:
+            conn.execute(
+                u"CREATE TABLE IF NOT EXISTS snapshots ("
+                u"facility_id TEXT PRIMARY KEY, "
+                u"digest TEXT NOT NULL, "
+                u"data TEXT NOT NULL, "
+                u"updated REAL NOT NULL)"
+            )
+
+    def get(self, facility_id):
+        u"""Returns the stored snapshot for a facility, or ``None`` if there isn't one."""
+        with connection(self.path, self.timeout) as conn:
+            row = conn.execute(u"SELECT data FROM snapshots WHERE facility_id = ?", (facility_id,)).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def update(self, facility):
+        u"""Store a new snapshot of a facility and return the :class:`FacilityDiff` from the previous one.
+
+        If the facility has not been stored before, everything in it is reported as added.
+        Facilities whose snapshot is unchanged are detected from a digest without
+        comparing their contents.
+
+        """
+        data = json.dumps(serialise_facility(facility), sort_keys=True, separators=(u',', u':'))
+        digest = hashlib.sha1(data.encode(u'utf-8')).hexdigest()
+
+        with transaction(self.path, self.timeout) as conn:
+            row = conn.execute(
+                u"SELECT digest, data FROM snapshots WHERE facility_id = ?", (facility.id,)
+            ).fetchone()
+
+            unchanged = row is not None and row[0] == digest
+            if not unchanged:
+                conn.execute(u"INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                             (facility.id, digest, data, time.time()))
+        if unchanged:
+            return FacilityDiff(facility.id)
+
+        # Compare the decoded forms of both so the types on each side match
+        diff = diff_facilities(json.loads(row[1]) if row else None, json.loads(data))
+        _logger.debug(u'Facility {0} changed: {1}'.format(facility.id, diff))
+        return diff
+
+    def remove(self, facility_id):
+        u"""Remove the snapshot for a facility."""
+        with connection(self.path, self.timeout) as conn:
+            conn.execute(u"DELETE FROM snapshots WHERE facility_id = ?", (facility_id,))
@@ -1,6 +1,7 @@
 from lxml import etree
 from lxml.etree import XMLSyntaxError
 from smpteparsers.flmx.error import FlmxCriticalError, FlmxParseError
+from smpteparsers.util import PARSER_OPTIONS
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -53,7 +54,7 @@ class XMLValidator(object):
 
         # Not mission critical if the xml file does not parse - just return false as does not validate.
         try:
-            xml_doc = etree.parse(xml)
+            xml_doc = etree.parse(xml, etree.XMLParser(**PARSER_OPTIONS))
         except XMLSyntaxError as e:
             msg = u"XML document could not be parsed: " + repr(e)
             self.messages = [msg]
@@ -26,13 +26,12 @@ class KDMBundle(object):
         tar = tarfile.open(filepath, 'r')
         # get the CATALOG xml doc
         cat_member = tar.getmember('CATALOG')
-        catalog = KDMBundle._parse_catalog(tar.extractfile(cat_member).read())
+        catalog = KDMBundle._parse_catalog(tar.extractfile(cat_member))
         # get each of the referenced KDM files
         kdms = []
         for kdm_path in catalog.kdm_paths:
             # append the CONTENT root dir
-            xml = tar.extractfile(os.path.join('CONTENT', kdm_path)).read()
-            kdms.append(KDM(xml))
+            kdms.append(KDM(tar.extractfile(os.path.join('CONTENT', kdm_path))))
         tar.close()
         return cls(catalog, kdms)
 
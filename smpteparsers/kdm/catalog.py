@@ -1,17 +1,24 @@
-try:
-    import xml.etree.cElementTree as ET
-except ImportError:
-    import xml.etree.ElementTree as ET
-
-from smpteparsers.util import get_element_text
-from smpteparsers.util import get_element_iterator
 from smpteparsers.util import get_namespace
+from smpteparsers.util import parse_xml
 from smpteparsers.util import strip_urn
+from smpteparsers.util.fields import Field, FieldMap
 
 class KDMBundleCatalog(object):
     """
     KDM bundle catalog XML document
     """
+    fields = FieldMap(
+        Field('Id', 'id', convert=strip_urn, required=True),
+        Field('AnnotationText', 'annotation_text'),
+        Field('Creator', 'creator'),
+        Field('KDMFileList', 'kdm_file_lists', element=True, many=True),
+    )
+    kdm_fields = FieldMap(
+        Field('CPLId', 'cpl_id', convert=strip_urn, required=True),
+        Field('FilePath', 'kdm_path'),
+        Field('ContentKeysNotValidBefore', 'start_date'),
+        Field('ContentKeysNotValidAfter', 'end_date'),
+    )
 
     @classmethod
     def from_string(cls, catalog_str):
@@ -19,7 +26,7 @@ class KDMBundleCatalog(object):
         Creates a new KDM instance from a string
 
         :param kdm_str: KDM XML document
-        "type kdm_str: string
+        "type kdm_str: string, or any other source accepted by smpteparsers.util.parse_xml
         """
         catalog = cls()
         catalog._parse(catalog_str)
@@ -29,18 +36,20 @@ class KDMBundleCatalog(object):
         """
         Parses a KDM bundle catalog XML string
         """
-        root = ET.fromstring(catalog_str)
+        root = parse_xml(catalog_str)
         cat_ns = get_namespace(root.tag)
-        self.id = strip_urn(get_element_text(root, 'Id', cat_ns))
-        self.annotation_text = get_element_text(root, 'AnnotationText', cat_ns)
-        self.creator = get_element_text(root, 'Creator', cat_ns)
+        values = self.fields.extract(root, cat_ns)
+        self.id = values['id']
+        self.annotation_text = values['annotation_text']
+        self.creator = values['creator']
         self.cpl_ids = []
         self.kdm_paths = []
         self.start_dates = []
         self.end_dates = []
-        for kdm_list_el in get_element_iterator(root, 'KDMFileList', cat_ns):
-            for kdm_el in kdm_list_el.getchildren():
-                self.cpl_ids.append(strip_urn(get_element_text(kdm_el, 'CPLId', cat_ns)))
-                self.kdm_paths.append(get_element_text(kdm_el, 'FilePath', cat_ns))
-                self.start_dates.append(get_element_text(kdm_el, 'ContentKeysNotValidBefore', cat_ns))
-                self.end_dates.append(get_element_text(kdm_el, 'ContentKeysNotValidAfter', cat_ns))
\ No newline at end of file
+        for kdm_list_el in values['kdm_file_lists']:
+            for kdm_el in kdm_list_el:
+                kdm = self.kdm_fields.extract(kdm_el, cat_ns)
+                self.cpl_ids.append(kdm['cpl_id'])
+                self.kdm_paths.append(kdm['kdm_path'])
+                self.start_dates.append(kdm['start_date'])
+                self.end_dates.append(kdm['end_date'])
@@ -1,18 +1,35 @@
 """
 KDM XML parser
 """
-try:
-    from lxml import etree as ET
-except ImportError:
-    try:
-        import xml.etree.cElementTree as ET
-    except ImportError:
-        import xml.etree.ElementTree as ET
-
-from smpteparsers.util import get_element_text
-from smpteparsers.util import get_element
 from smpteparsers.util import get_namespace
+from smpteparsers.util import get_schema
+from smpteparsers.util import parse_xml
+from smpteparsers.util import profiling
 from smpteparsers.util import strip_urn
+from smpteparsers.util import text_type
+from smpteparsers.util.fields import Field, FieldMap
+
+SMPTE_KDM_NS = 'http://www.smpte-ra.org/schemas/430-1/2006/KDM'
+
+_message_fields = FieldMap(
+    Field('AuthenticatedPublic', 'authenticated_public', element=True, required=True),
+)
+_public_fields = FieldMap(
+    Field('MessageId', 'id', convert=strip_urn, required=True),
+    Field('AnnotationText', 'annotation_text'),
+    Field('IssueDate', 'issue_date'),
+    Field('RequiredExtensions', 'required_extensions', element=True, required=True),
+)
+_smpte_extension_fields = FieldMap(
+    Field('KDMRequiredExtensions', 'kdm_required_extensions', element=True, required=True,
+          namespace=SMPTE_KDM_NS),
+)
+_extension_fields = FieldMap(
+    Field('CompositionPlaylistId', 'cpl_id', convert=strip_urn, required=True),
+    Field('ContentTitleText', 'content_title_text'),
+    Field('ContentKeysNotValidBefore', 'start_date'),
+    Field('ContentKeysNotValidAfter', 'end_date'),
+)
 
 class KDM(object):
     """
@@ -27,10 +44,28 @@ class KDM(object):
         Creates a new KDM instance from a KDM XML document
 
         :params kdm_xml: KDM XML document in either interop of SMPTE format
-        :type kdm_xml: string:
+        :type kdm_xml: string, bytes, memoryview, mmap or file object
         """
+        if hasattr(kdm_xml, 'read'):
+            # Files and mmaps are parsed from where they are, and again from there for validation.
+            # Only a text stream, or a stream which can't seek back, has to be read in
+            try:
+                self._start = kdm_xml.tell()
+                if isinstance(kdm_xml.read(0), text_type):
+                    raise ValueError("Text stream")
+            except (AttributeError, IOError, OSError, ValueError):
+                kdm_xml = kdm_xml.read()
+        # The document is kept for validation, buffers are parsed in place rather than copied
         self.raw = kdm_xml
-        self._parse(kdm_xml)
+        self._parse(self._source())
+
+    def _source(self):
+        """
+        Returns the document to parse, with a file object rewound to where it started
+        """
+        if hasattr(self.raw, 'read'):
+            self.raw.seek(self._start)
+        return self.raw
 
     @classmethod
     def from_file(cls, file_obj):
@@ -40,8 +75,7 @@ class KDM(object):
         :param file_obj: file object referencing a KDM
         :type file_obj: file object
         """
-        kdm = cls(file_obj.read())
-        return kdm
+        return cls(file_obj)
 
     @property
     def kind(self):
@@ -59,20 +93,14 @@ class KDM(object):
         import os
 
         if self.kind == KDM.INTEROP:
-            with open(os.path.join(os.path.dirname(__file__), 'xsd', 'interop.xsd'), 'r') as f:
-                schema = f.read()
+            schema_file = 'interop.xsd'
         elif self.kind == KDM.SMPTE:
-            with open(os.path.join(os.path.dirname(__file__), 'xsd', 'smpte.xsd'), 'r') as f:
-                schema = f.read()
-
-        base_dir = os.getcwd()
-        os.chdir(os.path.join(os.path.dirname(__file__), 'xsd'))
-        try:
-            schema = ET.XMLSchema(ET.XML(schema))
-            xmlparser = ET.XMLParser(schema=schema)
-            ET.fromstring(self.raw, xmlparser)
-        finally:
-            os.chdir(base_dir)
+            schema_file = 'smpte.xsd'
+
+        # Parsed from its path, so the schemas it imports are found next to it
+        schema = get_schema(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'xsd', schema_file))
+        with profiling.span('kdm.validate'):
+            parse_xml(self._source(), schema=schema)
 
     def _parse(self, kdm_xml):
         """
@@ -81,12 +109,14 @@ class KDM(object):
         :param kdm_xml: an interop or smpte KDM XML document
         :type kdm_xml: string
         """
-        root = ET.fromstring(kdm_xml)
+        with profiling.span('kdm.parse'):
+            root = parse_xml(kdm_xml)
         kdm_ns = get_namespace(root.tag)
-        if kdm_ns.startswith('http://www.smpte-ra.org'):
-            self._parse_smpte(root)
-        else:
-            self._parse_interop(root)
+        with profiling.span('kdm.build'):
+            if kdm_ns.startswith('http://www.smpte-ra.org'):
+                self._parse_smpte(root)
+            else:
+                self._parse_interop(root)
 
     def _parse_smpte(self, root):
         """
@@ -97,17 +127,9 @@ class KDM(object):
         """
         self._kind = KDM.SMPTE
         smpte_etm_ns = get_namespace(root.tag)
-        ap_el = get_element(root, 'AuthenticatedPublic', smpte_etm_ns)
-        self.id = strip_urn(get_element_text(ap_el, 'MessageId', smpte_etm_ns))
-        self.annotation_text = get_element_text(ap_el, 'AnnotationText', smpte_etm_ns)
-        self.issue_date = get_element_text(ap_el, 'IssueDate', smpte_etm_ns)
-        re_el = get_element(ap_el, 'RequiredExtensions', smpte_etm_ns)
-        smpte_kdm_ns ='http://www.smpte-ra.org/schemas/430-1/2006/KDM'
-        kdm_re_el = get_element(re_el, 'KDMRequiredExtensions', smpte_kdm_ns)
-        self.cpl_id = strip_urn(get_element_text(kdm_re_el, 'CompositionPlaylistId', smpte_kdm_ns))
-        self.content_title_text = get_element_text(kdm_re_el, 'ContentTitleText', smpte_kdm_ns)
-        self.start_date = get_element_text(kdm_re_el, 'ContentKeysNotValidBefore', smpte_kdm_ns)
-        self.end_date = get_element_text(kdm_re_el, 'ContentKeysNotValidAfter', smpte_kdm_ns)
+        re_el = self._parse_public(root, smpte_etm_ns)
+        kdm_re_el = _smpte_extension_fields.extract(re_el, smpte_etm_ns)['kdm_required_extensions']
+        _extension_fields.extract(kdm_re_el, SMPTE_KDM_NS, target=self)
 
     def _parse_interop(self, root):
         """
@@ -118,14 +140,18 @@ class KDM(object):
         """
         self._kind = KDM.INTEROP
         interop_kdm_ns = get_namespace(root.tag)
-        ap_el = get_element(root, 'AuthenticatedPublic', interop_kdm_ns)
-        self.id = strip_urn(get_element_text(ap_el, 'MessageId', interop_kdm_ns))
-        self.annotation_text = get_element_text(ap_el, 'AnnotationText', interop_kdm_ns)
-        self.issue_date = get_element_text(ap_el, 'IssueDate', interop_kdm_ns)
-        re_el = get_element(ap_el, 'RequiredExtensions', interop_kdm_ns)
-        self.cpl_id = strip_urn(get_element_text(re_el, 'CompositionPlaylistId', interop_kdm_ns))
-        self.content_title_text = get_element_text(re_el, 'ContentTitleText', interop_kdm_ns)
-        self.start_date = get_element_text(re_el, 'ContentKeysNotValidBefore', interop_kdm_ns)
-        self.end_date = get_element_text(re_el, 'ContentKeysNotValidAfter', interop_kdm_ns)
+        re_el = self._parse_public(root, interop_kdm_ns)
+        _extension_fields.extract(re_el, interop_kdm_ns, target=self)
 
+    def _parse_public(self, root, kdm_ns):
+        """
+        Parses the fields common to both formats from the AuthenticatedPublic element
 
+        :returns: the RequiredExtensions element
+        """
+        ap_el = _message_fields.extract(root, kdm_ns)['authenticated_public']
+        values = _public_fields.extract(ap_el, kdm_ns)
+        self.id = values['id']
+        self.annotation_text = values['annotation_text']
+        self.issue_date = values['issue_date']
+        return values['required_extensions']
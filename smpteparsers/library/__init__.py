@@ -0,0 +1,337 @@
+"""
+Registry of the assets across a library of DCPs.
+
+The same asset, e.g. a trailer's picture MXF, is often in many packages. The registry keys
+assets by their UUID and PKL hash and records every path they're found at, so each asset
+is hashed once for the whole library, and copies which could be hard links are found.
+
+    registry = AssetRegistry('library.db')
+    for dcp in dcps:
+        registry.add_dcp(dcp.path, dcp.assetmap.chunks, dcp.pkl.assets)
+    registry.verify()
+    for duplicate in registry.duplicates():
+        print(duplicate.asset_id, duplicate.reclaimable)
+"""
+import os, time
+
+from smpteparsers.dcp.verify import asset_chunks
+from smpteparsers.pkl import generate_hash
+from smpteparsers.util import profiling
+from smpteparsers.util.sqlite import connection, transaction
+
+HASHED = "hashed"
+LINKED = "linked"
+COPY = "copy"
+
+class Location(object):
+    """
+    A path an asset was found at.
+
+    :ivar path:
+    :ivar asset_id:
+    :ivar file_hash: hash of the asset in its PKL
+    :ivar dcp_path: directory of the DCP it's in
+    :ivar size: size in bytes when it was registered or verified, None if it was missing
+    :ivar device: device and inode of the file, None where the platform doesn't give them
+    :ivar inode:
+    :ivar mtime: modification time when it was registered or verified
+    :ivar verified: POSIX timestamp of its verification, or None
+    :ivar valid: whether its hash matched, or None if it hasn't been verified
+    :ivar method: how it was verified: HASHED, LINKED (a hard link to a hashed file) or COPY (a
+        copy trusted from its size, see AssetRegistry.verify)
+    """
+    __slots__ = ('path', 'asset_id', 'file_hash', 'dcp_path', 'size', 'device', 'inode', 'mtime',
+                 'verified', 'valid', 'method')
+
+    def __init__(self, path, asset_id, file_hash, dcp_path, size, device, inode, mtime, verified, valid, method):
+        self.path = path
+        self.asset_id = asset_id
+        self.file_hash = file_hash
+        self.dcp_path = dcp_path
+        self.size = size
+        self.device = device
+        self.inode = inode
+        self.mtime = mtime
+        self.verified = verified
+        self.valid = None if valid is None else bool(valid)
+        self.method = method
+
+    @property
+    def file_id(self):
+        """
+        (device, inode) identifying the file on disk, or None if it isn't known.
+        """
+        return (self.device, self.inode) if self.inode else None
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+class Duplicate(object):
+    """
+    Separate copies on disk of the same asset.
+
+    :ivar asset_id:
+    :ivar file_hash:
+    :ivar size:
+    :ivar files: list of lists of paths, one list for each separate file, holding the hard links to it
+    :ivar reclaimable: bytes freed if the copies were replaced with hard links to one of them
+    """
+    def __init__(self, asset_id, file_hash, size, files):
+        self.asset_id = asset_id
+        self.file_hash = file_hash
+        self.size = size
+        self.files = files
+        self.reclaimable = size * (len(files) - 1)
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+class VerifyResult(object):
+    """
+    Results of AssetRegistry.verify.
+
+    :ivar hashed: number of files hashed
+    :ivar linked: number of files verified as hard links to a hashed file
+    :ivar copies: number of copies trusted from their size
+    :ivar invalid: list of the Locations whose hash didn't match or which are missing
+    """
+    def __init__(self):
+        self.hashed = 0
+        self.linked = 0
+        self.copies = 0
+        self.invalid = []
+
+    @property
+    def ok(self):
+        return not self.invalid
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+def _hash_text(digest):
+    return digest.decode("ascii") if isinstance(digest, bytes) else digest
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None, None, None
+    # st_ino is 0 where the platform doesn't support it
+    return st.st_size, st.st_dev if st.st_ino else None, st.st_ino or None, st.st_mtime
+
+_COLUMNS = "path, asset_id, file_hash, dcp_path, size, device, inode, mtime, verified, valid, method"
+
+class AssetRegistry(object):
+    """
+    Persistent record of where each asset of a library is, and whether it has been verified.
+
+    :param path: path of the SQLite database to keep the registry in, created if it doesn't exist.
+    :param timeout: seconds to wait for a lock held by another process.
+    """
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+
+        with connection(self.path, self.timeout) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locations ("
+                "path TEXT PRIMARY KEY, "
+                "asset_id TEXT NOT NULL, "
+                "file_hash TEXT NOT NULL, "
+                "dcp_path TEXT NOT NULL, "
+                "size INTEGER, "
+                "device INTEGER, "
+                "inode INTEGER, "
+                "mtime REAL, "
+                "verified REAL, "
+                "valid INTEGER, "
+                "method TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS locations_asset ON locations (asset_id, file_hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS locations_dcp ON locations (dcp_path)")
+
+    def _query(self, where="", params=()):
+        with connection(self.path, self.timeout) as conn:
+            rows = conn.execute("SELECT " + _COLUMNS + " FROM locations " + where, params).fetchall()
+        return [Location(*row) for row in rows]
+
+    def _write(self, statement, rows):
+        with transaction(self.path, self.timeout) as conn:
+            conn.executemany(statement, rows)
+
+    def add_dcp(self, dcp_path, assets, pkl_assets):
+        """
+        Registers the assets of a DCP. Registering a DCP again updates its paths, and keeps the
+        verification of files which haven't changed.
+
+        A location is a single file, so assets split into chunks aren't registered. Verify those
+        with smpteparsers.dcp.verify.verify_dcp, which hashes the chunks as one stream.
+
+        :param dcp_path: directory of the DCP
+        :param assets: dict of asset id to the list of its chunks, i.e. Assetmap.chunks, or to its
+            AssetData, i.e. Assetmap.assets
+        :param pkl_assets: dict of asset id to PKLData, i.e. PKL.assets
+        :returns: number of assets registered
+        """
+        known = dict((location.path, location) for location in self.locations_in(dcp_path))
+
+        rows = []
+        for asset_id, pkl_data in pkl_assets.items():
+            if asset_id not in assets or not pkl_data.file_hash:
+                continue
+            chunks = asset_chunks(assets[asset_id])
+            if len(chunks) > 1:
+                continue
+            full_path = os.path.join(dcp_path, chunks[0].path)
+            size, device, inode, mtime = _stat(full_path)
+
+            verified = valid = method = None
+            previous = known.get(full_path)
+            if (previous is not None and previous.asset_id == asset_id and previous.file_hash == pkl_data.file_hash
+                    and (previous.size, previous.inode, previous.mtime) == (size, inode, mtime)):
+                verified, valid, method = previous.verified, previous.valid, previous.method
+            rows.append((full_path, asset_id, pkl_data.file_hash, dcp_path, size, device, inode, mtime,
+                         verified, valid, method))
+
+        with transaction(self.path, self.timeout) as conn:
+            # Drop paths the DCP no longer has
+            conn.execute("DELETE FROM locations WHERE dcp_path = ?", (dcp_path,))
+            conn.executemany("INSERT OR REPLACE INTO locations (" + _COLUMNS + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def remove_dcp(self, dcp_path):
+        self._write("DELETE FROM locations WHERE dcp_path = ?", [(dcp_path,)])
+
+    def locations(self, asset_id, file_hash=None):
+        """
+        Returns the Locations of an asset, optionally only those with a given PKL hash.
+        """
+        if file_hash is None:
+            return self._query("WHERE asset_id = ? ORDER BY path", (asset_id,))
+        return self._query("WHERE asset_id = ? AND file_hash = ? ORDER BY path", (asset_id, file_hash))
+
+    def locations_in(self, dcp_path):
+        return self._query("WHERE dcp_path = ? ORDER BY path", (dcp_path,))
+
+    def all_locations(self):
+        return self._query("ORDER BY dcp_path, path")
+
+    def _unchanged(self, location):
+        size, device, inode, mtime = _stat(location.path)
+        return size is not None and (size, inode, mtime) == (location.size, location.inode, location.mtime)
+
+    def verify(self, hash_func=generate_hash, trust_copies=False, reverify=False):
+        """
+        Verifies every registered asset, hashing each file on disk at most once.
+
+        For each asset, one of its files is hashed. The other paths which are hard links to that
+        file are then verified without reading them. Separate copies are hashed too, unless
+        trust_copies is set, in which case a copy whose size matches a valid file is trusted.
+
+        Files verified before are skipped unless they've changed since, or reverify is set.
+
+        :param hash_func: returns the base64 SHA-1 of a file, e.g. HashScheduler.hash_file
+        :returns: VerifyResult
+        """
+        result = VerifyResult()
+        groups = {}
+        for location in self._query("ORDER BY asset_id, file_hash, path"):
+            groups.setdefault((location.asset_id, location.file_hash), []).append(location)
+
+        with profiling.span("library.verify"):
+            for (asset_id, file_hash), locations in groups.items():
+                updates = self._verify_asset(file_hash, locations, hash_func, trust_copies, reverify, result)
+                if updates:
+                    self._write("UPDATE locations SET size = ?, device = ?, inode = ?, mtime = ?, verified = ?, "
+                                "valid = ?, method = ? WHERE path = ?", updates)
+        profiling.count("library.hashed", result.hashed)
+        return result
+
+    def _verify_asset(self, file_hash, locations, hash_func, trust_copies, reverify, result):
+        now = time.time()
+        updates = []
+        # Results for each file on disk, by (device, inode), and the sizes of the valid files
+        by_file = {}
+        valid_sizes = set()
+
+        pending = []
+        for location in locations:
+            if reverify or location.verified is None or not self._unchanged(location):
+                pending.append(location)
+                continue
+            if location.file_id is not None:
+                by_file[location.file_id] = location.valid
+            if location.valid:
+                valid_sizes.add(location.size)
+            else:
+                result.invalid.append(location)
+
+        for location in pending:
+            size, device, inode, mtime = _stat(location.path)
+            location.size, location.device, location.inode, location.mtime = size, device, inode, mtime
+            location.verified = now
+            if size is None:
+                location.valid, location.method = False, None
+            elif location.file_id is not None and location.file_id in by_file:
+                location.valid, location.method = by_file[location.file_id], LINKED
+                result.linked += 1
+            elif trust_copies and size in valid_sizes:
+                location.valid, location.method = True, COPY
+                result.copies += 1
+            else:
+                location.valid, location.method = _hash_text(hash_func(location.path)) == file_hash, HASHED
+                result.hashed += 1
+                if location.file_id is not None:
+                    by_file[location.file_id] = location.valid
+
+            if location.valid:
+                valid_sizes.add(size)
+            else:
+                result.invalid.append(location)
+            updates.append((size, device, inode, mtime, location.verified, location.valid, location.method, location.path))
+        return updates
+
+    def hash_file(self, path, hash_func=generate_hash):
+        """
+        Returns the hash of a file as generate_hash does, without reading it if the registry has
+        verified it, or a hard link to it, and it hasn't changed since. Can be passed as the
+        hash_func of smpteparsers.dcp.verify.verify_dcp to reuse the library's verification.
+        A file object, i.e. a chunked asset, isn't registered so it's always hashed.
+        """
+        if hasattr(path, 'read'):
+            return hash_func(path)
+        size, device, inode, mtime = _stat(path)
+        if size is not None:
+            if inode:
+                candidates = self._query("WHERE path = ? OR (device = ? AND inode = ?)", (path, device, inode))
+            else:
+                candidates = self._query("WHERE path = ?", (path,))
+            for location in candidates:
+                if location.valid and (location.size, location.inode, location.mtime) == (size, inode, mtime):
+                    return location.file_hash
+        return hash_func(path)
+
+    def is_verified(self, asset_id, file_hash):
+        """
+        Whether an asset has at least one valid file, as of its last verification.
+        """
+        return any(location.valid for location in self.locations(asset_id, file_hash))
+
+    def duplicates(self):
+        """
+        Returns a Duplicate for each asset with more than one separate file on disk. Files which are
+        known to be invalid aren't counted.
+        """
+        groups = {}
+        for location in self._query("WHERE size IS NOT NULL AND (valid IS NULL OR valid = 1) ORDER BY path"):
+            groups.setdefault((location.asset_id, location.file_hash, location.size), []).append(location)
+
+        found = []
+        for (asset_id, file_hash, size), locations in sorted(groups.items()):
+            files = {}
+            for location in locations:
+                # Without an inode every path counts as a separate file
+                files.setdefault(location.file_id or location.path, []).append(location.path)
+            if len(files) > 1:
+                found.append(Duplicate(asset_id, file_hash, size, sorted(files.values())))
+        return found
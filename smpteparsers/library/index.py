@@ -0,0 +1,171 @@
+"""
+Index of the assets of every package in a library, for resolving assets across packages.
+
+A version file (VF) package's CPLs play assets from the original version (OV) package
+they were made for, which aren't in the VF's own ASSETMAP. Passing an AssetIndex to CPL (or
+DCP) resolves those assets through the other packages, with a dict lookup per asset.
+
+    index = AssetIndex()
+    index.scan(library_path)
+    cpl = CPL(vf_cpl_path, assetmap=vf_assetmap, asset_index=index)
+    index.dependencies(cpl, vf_path)    # the OV packages the VF needs
+"""
+import logging, os
+
+from smpteparsers.assetmap import Assetmap, AssetmapError
+
+_logger = logging.getLogger(__name__)
+
+class IndexedAsset(object):
+    """
+    Where an asset is in the library.
+
+    :ivar asset_id:
+    :ivar path: absolute path of the asset's file
+    :ivar dcp_path: absolute path of the directory of the package it's in
+    """
+    __slots__ = ('asset_id', 'path', 'dcp_path')
+
+    def __init__(self, asset_id, path, dcp_path):
+        self.asset_id = asset_id
+        self.path = path
+        self.dcp_path = dcp_path
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+class AssetIndex(object):
+    """
+    Asset ids mapped to the packages which have them, built from the packages' ASSETMAPs.
+
+    :ivar errors: dict of the ASSETMAP paths scan() couldn't parse to their AssetmapError
+    """
+    def __init__(self):
+        self._assets = {}
+        self._packages = {}
+        self.errors = {}
+
+    def __len__(self):
+        return len(self._assets)
+
+    def __contains__(self, asset_id):
+        return asset_id in self._assets
+
+    def __getitem__(self, asset_id):
+        """
+        Returns the IndexedAsset of the first package added with the asset, or raises KeyError.
+        """
+        return self._assets[asset_id][0]
+
+    def get(self, asset_id, default=None):
+        locations = self._assets.get(asset_id)
+        return locations[0] if locations else default
+
+    def locations(self, asset_id):
+        """
+        Returns the IndexedAsset of every package with the asset, in the order they were added.
+        """
+        return list(self._assets.get(asset_id, ()))
+
+    @property
+    def packages(self):
+        return list(self._packages)
+
+    def add_dcp(self, dcp_path, assets):
+        """
+        Adds the assets of a package, replacing them if the package was added before.
+
+        :param dcp_path: directory of the package
+        :param assets: dict of asset id to AssetData, i.e. Assetmap.assets
+        """
+        # Stored absolute, so the same package given as another path is still matched, and an
+        # asset's path can be joined onto any package path, as a relative assetmap path is
+        dcp_path = os.path.abspath(dcp_path)
+        self.remove_dcp(dcp_path)
+        self._packages[dcp_path] = list(assets)
+        for asset_id, asset_data in assets.items():
+            asset = IndexedAsset(asset_id, os.path.join(dcp_path, asset_data.path), dcp_path)
+            self._assets.setdefault(asset_id, []).append(asset)
+
+    def remove_dcp(self, dcp_path):
+        dcp_path = os.path.abspath(dcp_path)
+        for asset_id in self._packages.pop(dcp_path, ()):
+            remaining = [asset for asset in self._assets.get(asset_id, ()) if asset.dcp_path != dcp_path]
+            if remaining:
+                self._assets[asset_id] = remaining
+            else:
+                self._assets.pop(asset_id, None)
+
+    def scan(self, library_path):
+        """
+        Adds every package found under a directory, i.e. every directory with an ASSETMAP.
+        Returns the number of packages added. ASSETMAPs which can't be parsed are skipped and
+        recorded in errors.
+        """
+        added = 0
+        for root, dirs, files in os.walk(library_path):
+            for f in files:
+                if f.lower() in ("assetmap", "assetmap.xml"):
+                    assetmap_path = os.path.join(root, f)
+                    try:
+                        assetmap = Assetmap(assetmap_path)
+                    except AssetmapError as e:
+                        _logger.warning("Skipping {0}: {1}".format(assetmap_path, e))
+                        self.errors[assetmap_path] = e
+                        continue
+                    self.add_dcp(root, assetmap.assets)
+                    added += 1
+                    # A package's subdirectories hold its assets, not other packages
+                    del dirs[:]
+                    break
+        return added
+
+    @classmethod
+    def from_registry(cls, registry):
+        """
+        Builds an index from the paths in a smpteparsers.library.AssetRegistry.
+        """
+        index = cls()
+        packages = {}
+        for location in registry.all_locations():
+            packages.setdefault(os.path.abspath(location.dcp_path), []).append(location)
+        for dcp_path, locations in packages.items():
+            index._packages[dcp_path] = [location.asset_id for location in locations]
+            for location in locations:
+                index._assets.setdefault(location.asset_id, []).append(
+                    IndexedAsset(location.asset_id, os.path.abspath(location.path), dcp_path))
+        return index
+
+    def resolve(self, asset_id, prefer=None):
+        """
+        Returns the IndexedAsset of an asset, from the package prefer if it has it, or None.
+        """
+        locations = self._assets.get(asset_id)
+        if not locations:
+            return None
+        if prefer is not None:
+            prefer = os.path.abspath(prefer)
+            for asset in locations:
+                if asset.dcp_path == prefer:
+                    return asset
+        return locations[0]
+
+    def dependencies(self, cpl, dcp_path=None):
+        """
+        Returns the paths of the packages, other than dcp_path, holding assets a CPL plays,
+        i.e. the OV packages a VF package's CPL needs.
+        """
+        if dcp_path is not None:
+            dcp_path = os.path.abspath(dcp_path)
+        found = set()
+        for asset_id in cpl.assets:
+            asset = self.resolve(asset_id, prefer=dcp_path)
+            if asset is not None and asset.dcp_path != dcp_path:
+                found.add(asset.dcp_path)
+        return sorted(found)
+
+    def missing(self, cpl):
+        """
+        Returns the ids of the assets of a CPL which aren't in any package.
+        """
+        return sorted(asset_id for asset_id in cpl.assets if asset_id not in self._assets)
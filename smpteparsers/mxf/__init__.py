@@ -0,0 +1,311 @@
+"""
+Reads the header metadata of MXF track files, without reading any essence.
+
+Only the header partition pack and the header metadata after it are read, usually a few KB
+per file, which is enough to check the track files of a CPL against its assets:
+
+    header = read_header(path)
+    header.asset_id, header.edit_rate, header.duration
+
+    for issue in check_cpl(cpl, dcp_path):
+        print(issue)
+"""
+import os, struct, uuid
+
+from smpteparsers.util import profiling
+
+class MXFError(Exception):
+    pass
+
+UNREADABLE = "unreadable"
+ASSET_ID = "asset_id"
+EDIT_RATE = "edit_rate"
+DURATION = "duration"
+
+# SMPTE 377M keys. Only the bytes which identify the kind of KLV are compared.
+_UL_PREFIX = b"\x06\x0e\x2b\x34"
+_PARTITION_PREFIX = b"\x06\x0e\x2b\x34\x02\x05\x01\x01\x0d\x01\x02\x01\x01"
+_HEADER_PARTITION = b"\x02"
+# The fill key, without its version byte
+_FILL_PREFIX = b"\x06\x0e\x2b\x34\x01\x01\x01"
+_FILL_SUFFIX = b"\x03\x01\x02\x10\x01\x00\x00\x00"
+_LOCAL_SET = b"\x53"
+_SOURCE_PACKAGE = b"\x01\x37"
+
+# Local tags, which are the same in every file
+_INSTANCE_UID = 0x3c0a
+_PACKAGE_UID = 0x4401
+_DESCRIPTOR = 0x4701
+_SAMPLE_RATE = 0x3001
+_CONTAINER_DURATION = 0x3002
+
+# The run-in before the header partition can be up to 64KB
+_MAX_RUN_IN = 65536
+# Header metadata bigger than this isn't from a DCP track file
+MAX_HEADER_SIZE = 16 * 1048576
+
+# Partition pack, up to the operational pattern
+_PARTITION = struct.Struct(">HHIQQQQQIQI")
+
+class MXFHeader(object):
+    """
+    What a track file's header metadata says about it.
+
+    :ivar path:
+    :ivar asset_id: UUID of the track file, i.e. of its asset in the CPL, from the file package
+    :ivar edit_rate: tuple of (numerator, denominator), like the CPL's EditRate
+    :ivar duration: length of the essence in edit units, i.e. the CPL's IntrinsicDuration,
+        or None if the file doesn't say
+    :ivar header_size: bytes of header metadata read
+    """
+    __slots__ = ('path', 'asset_id', 'edit_rate', 'duration', 'header_size')
+
+    def __init__(self, path, asset_id, edit_rate, duration, header_size):
+        self.path = path
+        self.asset_id = asset_id
+        self.edit_rate = edit_rate
+        self.duration = duration
+        self.header_size = header_size
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+def _read_exactly(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise MXFError("Unexpected end of file")
+    return data
+
+def _ber_length(data, pos):
+    """
+    Decodes the BER length at pos, returning the length and the position after it.
+    """
+    if pos >= len(data):
+        raise MXFError("Invalid BER length")
+    first = ord(data[pos:pos + 1])
+    if first < 0x80:
+        return first, pos + 1
+    size = first & 0x7f
+    if size > 8 or pos + 1 + size > len(data):
+        raise MXFError("Invalid BER length")
+    length = 0
+    for byte in bytearray(data[pos + 1:pos + 1 + size]):
+        length = (length << 8) | byte
+    return length, pos + 1 + size
+
+def _read_partition(f):
+    """
+    Reads the header partition pack, skipping any run-in, and returns the header byte count.
+    """
+    data = f.read(16)
+    if data[:len(_PARTITION_PREFIX)] != _PARTITION_PREFIX:
+        data += f.read(_MAX_RUN_IN)
+        start = data.find(_PARTITION_PREFIX)
+        if start == -1 or start > _MAX_RUN_IN:
+            raise MXFError("No header partition pack")
+        data = data[start:]
+        f.seek(-len(data), os.SEEK_CUR)
+        data = _read_exactly(f, 16)
+    if data[13:14] != _HEADER_PARTITION:
+        raise MXFError("First partition isn't a header partition")
+
+    data = _read_exactly(f, 9)
+    length, pos = _ber_length(data, 0)
+    if length < _PARTITION.size:
+        raise MXFError("Partition pack too short")
+    # Rewind to the start of the value, the BER length was shorter than the 9 bytes read
+    f.seek(pos - len(data), os.SEEK_CUR)
+    value = _read_exactly(f, length)
+    return _PARTITION.unpack(value[:_PARTITION.size])[6]
+
+def _skip_fill(f):
+    """
+    Skips a fill item at the current position, as written after the partition pack to align the
+    header metadata to the KAG. The header byte count starts after it.
+    """
+    key = f.read(16)
+    if key[:7] != _FILL_PREFIX or key[8:] != _FILL_SUFFIX:
+        f.seek(-len(key), os.SEEK_CUR)
+        return
+
+    data = _read_exactly(f, 9)
+    length, pos = _ber_length(data, 0)
+    f.seek(pos - len(data) + length, os.SEEK_CUR)
+
+def _local_sets(data):
+    """
+    Yields (key, {tag: value}) for each local set in header metadata, skipping the primer pack,
+    fill and anything else which isn't a local set.
+    """
+    pos = 0
+    end = len(data)
+    while pos + 17 <= end:
+        key = data[pos:pos + 16]
+        if key[:4] != _UL_PREFIX:
+            raise MXFError("Invalid key at {0} in the header metadata".format(pos))
+        length, pos = _ber_length(data, pos + 16)
+        if pos + length > end:
+            raise MXFError("Truncated header metadata")
+
+        if key[5:6] == _LOCAL_SET:
+            items = {}
+            item = pos
+            while item + 4 <= pos + length:
+                tag, size = struct.unpack(">HH", data[item:item + 4])
+                items[tag] = data[item + 4:item + 4 + size]
+                item += 4 + size
+            yield key, items
+        pos += length
+
+def _parse_header(data):
+    """
+    Returns (asset_id, edit_rate, duration) from header metadata.
+    """
+    packages = []
+    instances = {}
+    for key, items in _local_sets(data):
+        if _INSTANCE_UID in items:
+            instances[items[_INSTANCE_UID]] = items
+        if key[13:15] == _SOURCE_PACKAGE and _PACKAGE_UID in items:
+            packages.append(items)
+    if not packages:
+        raise MXFError("No file package")
+
+    # The file package is the source package with an essence descriptor
+    package = packages[0]
+    for candidate in packages:
+        if _DESCRIPTOR in candidate:
+            package = candidate
+            break
+    umid = package[_PACKAGE_UID]
+    if len(umid) != 32:
+        raise MXFError("Invalid package UID")
+    asset_id = str(uuid.UUID(bytes=bytes(umid[16:])))
+
+    descriptor = instances.get(package.get(_DESCRIPTOR))
+    if descriptor is None or _SAMPLE_RATE not in descriptor:
+        raise MXFError("No essence descriptor")
+    edit_rate = struct.unpack(">ii", descriptor[_SAMPLE_RATE])
+    duration = None
+    if _CONTAINER_DURATION in descriptor:
+        duration = struct.unpack(">q", descriptor[_CONTAINER_DURATION])[0]
+    return asset_id, edit_rate, duration
+
+def read_header(path, max_header_size=MAX_HEADER_SIZE):
+    """
+    Reads the header metadata of an MXF track file.
+
+    :param path: path of the file, or a seekable binary file object positioned at its start
+    :returns: MXFHeader
+    """
+    if hasattr(path, 'read'):
+        f, name = path, getattr(path, 'name', None)
+    else:
+        try:
+            f, name = open(path, 'rb'), path
+        except (IOError, OSError) as e:
+            raise MXFError(e)
+
+    try:
+        with profiling.span("mxf.read_header"):
+            header_size = _read_partition(f)
+            _skip_fill(f)
+            if header_size > max_header_size:
+                raise MXFError("Header metadata is {0} bytes, more than {1}".format(header_size, max_header_size))
+            data = _read_exactly(f, header_size)
+            asset_id, edit_rate, duration = _parse_header(data)
+    except (IOError, OSError, struct.error) as e:
+        raise MXFError(e)
+    finally:
+        if f is not path:
+            f.close()
+    profiling.count("mxf.header_bytes", header_size)
+    return MXFHeader(name, asset_id, edit_rate, duration, header_size)
+
+class HeaderIssue(object):
+    """
+    A track file whose header doesn't match its asset in the CPL.
+
+    :ivar asset_id:
+    :ivar path: full path of the file, or None if the asset has no path
+    :ivar kind: UNREADABLE, ASSET_ID, EDIT_RATE or DURATION
+    :ivar expected: value from the CPL
+    :ivar actual: value from the file's header, or the MXFError for UNREADABLE
+    """
+    __slots__ = ('asset_id', 'path', 'kind', 'expected', 'actual')
+
+    def __init__(self, asset_id, path, kind, expected=None, actual=None):
+        self.asset_id = asset_id
+        self.path = path
+        self.kind = kind
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self):
+        if self.kind == UNREADABLE:
+            if self.path is None:
+                return "No file for asset: {0}".format(self.asset_id)
+            return "Can't read MXF header: {0}: {1}".format(self.path, self.actual)
+        return "{0} doesn't match: {1} has {2}, expected {3}".format(
+            self.kind.replace("_", " ").capitalize(), self.path, self.actual, self.expected)
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+def check_assets(assets, dcp_path="", read=read_header):
+    """
+    Checks the track files of CPL assets against their headers: the asset id, the edit rate and
+    the intrinsic duration. Each file is read once, however many assets share it.
+
+    :param assets: iterable of smpteparsers.cpl Picture and Sound assets, with their paths set
+    :param dcp_path: directory the asset paths are relative to
+    :param read: returns the MXFHeader of a path
+    :returns: list of HeaderIssue objects
+    """
+    issues = []
+    headers = {}
+    for asset in assets:
+        path = getattr(asset, 'path', None)
+        if path is None:
+            issues.append(HeaderIssue(asset.id, None, UNREADABLE))
+            continue
+        # Paths from an asset index are absolute, and are kept as they are
+        path = os.path.join(dcp_path, path)
+
+        if path not in headers:
+            try:
+                headers[path] = read(path)
+            except MXFError as e:
+                headers[path] = e
+        header = headers[path]
+        if isinstance(header, MXFError):
+            issues.append(HeaderIssue(asset.id, path, UNREADABLE, actual=header))
+            continue
+
+        # UUIDs are compared without case, CPLs may have them in upper case
+        if header.asset_id.lower() != asset.id.lower():
+            issues.append(HeaderIssue(asset.id, path, ASSET_ID, asset.id, header.asset_id))
+        if tuple(header.edit_rate) != tuple(asset.edit_rate):
+            issues.append(HeaderIssue(asset.id, path, EDIT_RATE, tuple(asset.edit_rate), tuple(header.edit_rate)))
+        if header.duration is not None and header.duration != asset.intrinsic_duration:
+            issues.append(HeaderIssue(asset.id, path, DURATION, asset.intrinsic_duration, header.duration))
+    profiling.count("mxf.files", len(headers))
+    return issues
+
+def track_file_assets(cpl):
+    """
+    Returns the picture and sound assets of a CPL's reels, the assets which are MXF track files.
+    """
+    assets = []
+    for reel in cpl.reels:
+        for name in ("picture", "sound"):
+            asset = getattr(reel, name, None)
+            if asset is not None:
+                assets.append(asset)
+    return assets
+
+def check_cpl(cpl, dcp_path="", read=read_header):
+    """
+    Checks the picture and sound track files of a CPL against their headers, see check_assets.
+    """
+    return check_assets(track_file_assets(cpl), dcp_path, read)
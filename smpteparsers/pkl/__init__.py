@@ -1,10 +1,7 @@
 import os, base64, hashlib
-try:
-    import xml.etree.cElementTree as ET
-except ImportError:
-    import xml.etree.ElementTree as ET
 
-from smpteparsers.util import get_element, get_element_text, get_element_iterator, get_namespace, validate_xml
+from smpteparsers.util import get_namespace, parse_xml, validate_xml, profiling
+from smpteparsers.util.fields import Field, FieldMap, FieldError, urn_uuid
 
 class PKLError(Exception):
     pass
@@ -12,6 +9,23 @@ class PKLValidationError(PKLError):
     pass
 
 class PKL(object):
+    """
+    Parses a packing list.
+
+    :param path: path of the PKL, or any other source accepted by smpteparsers.util.parse_xml
+        (bytes, a memoryview or mmap, or a binary file object).
+    """
+    fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("AssetList", "asset_list", element=True, required=True),
+    )
+    asset_fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("Hash", "file_hash"),
+        Field("Size", "size"),
+        Field("Type", "file_type"),
+    )
+
     def __init__(self, path):
         self.path = path
 
@@ -29,27 +43,30 @@ class PKL(object):
         except Exception as e:
             raise PKLError(e)
 
+        from lxml import etree
+
         # Get hashes from pkl.xml file
-        tree = ET.parse(self.path)
-        root = tree.getroot()
+        try:
+            with profiling.span("pkl.parse"):
+                root = parse_xml(self.path)
+        except etree.XMLSyntaxError as e:
+            raise PKLError(e)
 
         # Again, get the namespace so we can search elements
         pkl_ns = get_namespace(root.tag)
-        self.id = get_element_text(root, "Id", pkl_ns).split(":")[2]
-
-        asset_list = get_element(root, "AssetList", pkl_ns)
-
-        # Get the data from the pkl file
-        for asset in asset_list.getchildren():
-            asset_id = get_element_text(asset, "Id", pkl_ns).split(":")[2]
-
-            p = {
-                "file_hash": get_element_text(asset, "Hash", pkl_ns),
-                "size": get_element_text(asset, "Size", pkl_ns),
-                "file_type": get_element_text(asset, "Type", pkl_ns)
-            }
-
-            self.assets[asset_id] = PKLData(**p)
+        with profiling.span("pkl.build"):
+            try:
+                values = self.fields.extract(root, pkl_ns)
+                self.id = values["id"]
+
+                # Get the data from the pkl file
+                for asset in values["asset_list"]:
+                    p = self.asset_fields.extract(asset, pkl_ns)
+                    asset_id = p.pop("id")
+                    self.assets[asset_id] = PKLData(**p)
+            except FieldError as e:
+                raise PKLError(e)
+        profiling.count("pkl.assets", len(self.assets))
 
     def validate(self, schema=os.path.join(os.path.dirname(__file__), 'pkl.xsd')):
         """
@@ -61,18 +78,37 @@ class PKL(object):
     def validate_hashes(self, dcp_path, assets):
         """
         Generate hashes for local files, and validate them against the hashes in the pkl file.
-        
+        The sizes of all the files are checked first, so a truncated file is found without hashing.
+
+        assets is Assetmap.chunks, or Assetmap.assets if no asset is split into chunks.
+
         Note: Currently not checking hashes for binary (.mxf) files.
         """
-        for uuid, pkl_data in self.assets.iteritems():
-            full_path = os.path.join(dcp_path, assets[uuid].path)
-
-            # Skip MXF files for now, we will add in support for this later on.
-            if full_path.endswith('.mxf'):
-                continue
+        # Imported here as smpteparsers.dcp imports this module
+        from smpteparsers.dcp.verify import verify_dcp, MISSING
+
+        dcp_assets = dict((uuid, assets[uuid]) for uuid in self.assets if uuid in assets)
+        report = verify_dcp(dcp_path, dcp_assets, self.assets, skip_mxf=True)
+        for issue in report.issues:
+            if issue.kind == MISSING and issue.path is None:
+                # Not in the ASSETMAP
+                raise KeyError(issue.asset_id)
+            raise PKLValidationError(str(issue))
+
+    def quick_check(self, dcp_path, assets, quick_check, reads=None):
+        """
+        Quick version of validate_hashes, which checks the sizes of the files and a few blocks of
+        each against samples recorded after a full verification, see smpteparsers.pkl.quickcheck.
 
-            if pkl_data.file_hash != generate_hash(full_path):
-                raise PKLValidationError("Hash doesn't match: {0}".format(full_path))
+        Raises PKLValidationError for a missing or changed file. Returns the ids of any assets
+        without recorded samples, which still need their hashes validating. assets is as for
+        validate_hashes.
+        """
+        dcp_assets = dict((uuid, assets[uuid]) for uuid in self.assets if uuid in assets)
+        report = quick_check.check(dcp_path, dcp_assets, self.assets, reads=reads)
+        for issue in report.issues:
+            raise PKLValidationError(str(issue))
+        return report.unrecorded
 
 class PKLData(object):
     def __init__(self, file_hash, size, file_type):
@@ -80,17 +116,36 @@ class PKLData(object):
         self.size = size
         self.file_type = file_type
 
-def generate_hash(local_path):
+def generate_hash(local_path, chunk_size=1048576, throttle=None):
     """
     Work out the base64 encoded sha-1 hash of the file so we can compare integrity with hashes in pkl.xml file.
     Use 'chunking' in case we have to generate hashes for potentially very large .mxf files.
+
+    :param local_path: path of the file, or a binary file object to hash from its current
+        position, e.g. a chunked asset from Assetmap.open.
+    :param chunk_size: bytes read at a time, 1mb by default.
+    :param throttle: called with the size of each chunk and the seconds it took to read, before the
+        next is read. It can block to limit the rate of reading, see smpteparsers.pkl.scheduler.
     """
-    chunk_size = 1048576 # 1mb
+    if hasattr(local_path, 'read'):
+        return _hash_file(local_path, chunk_size, throttle)
+    with open(local_path, 'rb') as f:
+        return _hash_file(f, chunk_size, throttle)
+
+def _hash_file(f, chunk_size, throttle):
     file_sha1 = hashlib.sha1()
-    with open(local_path) as f:
+    if throttle is None:
         chunk = f.read(chunk_size)
         while chunk:
             file_sha1.update(chunk)
             chunk = f.read(chunk_size)
+    else:
+        while True:
+            start = profiling.clock()
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            throttle(len(chunk), profiling.clock() - start)
+            file_sha1.update(chunk)
 
     return base64.b64encode(file_sha1.digest())
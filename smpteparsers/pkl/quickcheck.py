@@ -0,0 +1,227 @@
+"""
+Quick integrity checks of a DCP from sampled blocks of its files.
+
+After a DCP has passed a full verification, the SHA-1 of a few blocks of each file is
+recorded: the first and last blocks and some evenly spaced between them (small files are
+recorded whole). Later checks read back a few of those blocks, chosen at random, and
+compare them, which takes a handful of reads per file instead of reading every byte.
+
+A quick check can miss damage outside the sampled blocks, so it is a health probe rather
+than a replacement for validating the hashes.
+
+    quick = QuickCheck('samples.db')
+    quick.record(dcp_path, assetmap.chunks, pkl.assets)       # full verification, then samples
+    ...
+    report = quick.check(dcp_path, assetmap.chunks, pkl.assets)
+"""
+import hashlib, random, time
+
+from smpteparsers.dcp.verify import (AssetIssue, VerifyReport, SAMPLE, asset_chunks, check_files, open_asset,
+    verify_dcp)
+from smpteparsers.util import profiling
+from smpteparsers.util.sqlite import connection, transaction
+
+def sample_offsets(size, samples=8, block_size=65536):
+    """
+    Returns the offsets of the blocks sampled from a file of the given size: the first and last
+    blocks and samples more evenly spaced between them, or every block if the file is small.
+    """
+    if size <= block_size * (samples + 2):
+        return list(range(0, size, block_size))
+    last = size - block_size
+    offsets = [0] + [last * i // (samples + 1) for i in range(1, samples + 1)] + [last]
+    return sorted(set(offsets))
+
+def block_digests(path, offsets, block_size=65536):
+    """
+    Returns the hex SHA-1 of the block at each offset of a file.
+
+    :param path: path of the file, or a seekable binary file object, e.g. from open_asset
+    """
+    if hasattr(path, 'read'):
+        return _block_digests(path, offsets, block_size)
+    with open(path, 'rb') as f:
+        return _block_digests(f, offsets, block_size)
+
+def _block_digests(f, offsets, block_size):
+    digests = []
+    for offset in offsets:
+        f.seek(offset)
+        digests.append(hashlib.sha1(f.read(block_size)).hexdigest())
+    return digests
+
+def _asset_digests(dcp_path, asset_data, full_path, offsets, block_size):
+    chunks = asset_chunks(asset_data)
+    if len(chunks) > 1:
+        with open_asset(dcp_path, chunks) as f:
+            return block_digests(f, offsets, block_size)
+    return block_digests(full_path, offsets, block_size)
+
+class SampleRecord(object):
+    """
+    The sampled blocks of an asset, recorded after it was verified.
+
+    :ivar asset_id:
+    :ivar file_hash: hash of the asset in the PKL it was verified against
+    :ivar size:
+    :ivar block_size:
+    :ivar offsets: list of the offsets of the sampled blocks
+    :ivar digests: list of the hex SHA-1 of each block
+    :ivar recorded: POSIX timestamp of when it was recorded
+    """
+    def __init__(self, asset_id, file_hash, size, block_size, offsets, digests, recorded):
+        self.asset_id = asset_id
+        self.file_hash = file_hash
+        self.size = size
+        self.block_size = block_size
+        self.offsets = offsets
+        self.digests = digests
+        self.recorded = recorded
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+class QuickCheckReport(VerifyReport):
+    """
+    Results of QuickCheck.check, as for verify_dcp plus:
+
+    :ivar sampled: number of blocks read
+    :ivar unrecorded: ids of assets without samples (or whose PKL hash has changed since they
+        were recorded), which need a full verification
+    """
+    def __init__(self):
+        VerifyReport.__init__(self)
+        self.sampled = 0
+        self.unrecorded = []
+
+class QuickCheck(object):
+    """
+    Records and checks sampled blocks of DCP files.
+
+    :param path: path of the SQLite database to keep the samples in, created if it doesn't exist.
+    :param samples: number of blocks sampled between the first and last of each file.
+    :param block_size: bytes in each block.
+    :param reads: number of blocks of each file read back by a check, or None for all of them.
+    :param timeout: seconds to wait for a lock held by another process.
+    """
+    def __init__(self, path, samples=8, block_size=65536, reads=3, timeout=30.0):
+        self.path = path
+        self.samples = samples
+        self.block_size = block_size
+        self.reads = reads
+        self.timeout = timeout
+
+        with connection(self.path, self.timeout) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                "asset_id TEXT PRIMARY KEY, "
+                "file_hash TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "block_size INTEGER NOT NULL, "
+                "offsets TEXT NOT NULL, "
+                "digests TEXT NOT NULL, "
+                "recorded REAL NOT NULL)"
+            )
+
+    def get_records(self, asset_ids):
+        """
+        Returns a dict of SampleRecord objects keyed by asset id, for the ids which have one.
+        """
+        asset_ids = list(asset_ids)
+        records = {}
+        with connection(self.path, self.timeout) as conn:
+            # Stay under SQLite's limit on the number of parameters
+            for i in range(0, len(asset_ids), 500):
+                batch = asset_ids[i:i + 500]
+                rows = conn.execute(
+                    "SELECT asset_id, file_hash, size, block_size, offsets, digests, recorded FROM samples "
+                    "WHERE asset_id IN ({0})".format(", ".join("?" * len(batch))),
+                    batch
+                ).fetchall()
+                for row in rows:
+                    records[row[0]] = SampleRecord(row[0], row[1], row[2], row[3],
+                                                   [int(o) for o in row[4].split()], row[5].split(), row[6])
+        return records
+
+    def forget(self, asset_ids):
+        """
+        Removes the samples of assets, e.g. when they're deleted.
+        """
+        with transaction(self.path, self.timeout) as conn:
+            conn.executemany("DELETE FROM samples WHERE asset_id = ?", [(asset_id,) for asset_id in asset_ids])
+
+    def record(self, dcp_path, assets, pkl_assets, verify=True, **kwargs):
+        """
+        Records samples of the files of a DCP, once they've been verified in full.
+
+        :param dcp_path: directory of the DCP
+        :param assets: dict of asset id to the list of its chunks, i.e. Assetmap.chunks, or to its
+            AssetData, see smpteparsers.dcp.verify.check_files
+        :param pkl_assets: dict of asset id to PKLData, i.e. PKL.assets
+        :param verify: run verify_dcp first, and only record samples if it passes. Pass False if
+            the DCP has just been verified another way, e.g. with a HashScheduler.
+        :param kwargs: passed on to verify_dcp, e.g. hash_func
+        :returns: the VerifyReport, or None if verify is False
+        """
+        report = None
+        if verify:
+            report = verify_dcp(dcp_path, assets, pkl_assets, **kwargs)
+            if not report.ok:
+                return report
+
+        issues, found = check_files(dcp_path, assets, pkl_assets)
+        now = time.time()
+        rows = []
+        with profiling.span("pkl.quickcheck.record"):
+            for asset_id, (full_path, size) in found.items():
+                pkl_data = pkl_assets.get(asset_id)
+                if pkl_data is None or not pkl_data.file_hash:
+                    continue
+                offsets = sample_offsets(size, self.samples, self.block_size)
+                digests = _asset_digests(dcp_path, assets[asset_id], full_path, offsets, self.block_size)
+                rows.append((asset_id, pkl_data.file_hash, size, self.block_size,
+                             " ".join(str(o) for o in offsets), " ".join(digests), now))
+
+        with transaction(self.path, self.timeout) as conn:
+            conn.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return report
+
+    def check(self, dcp_path, assets, pkl_assets, reads=None, rng=random):
+        """
+        Checks the files of a DCP exist, are the right size, and that a few of their recorded
+        blocks are unchanged.
+
+        :param reads: number of blocks to read from each file, defaults to the reads the QuickCheck
+            was created with. 0 or None reads them all.
+        :param rng: random.Random instance choosing the blocks, for repeatable checks
+        :returns: QuickCheckReport
+        """
+        reads = self.reads if reads is None else reads
+        report = QuickCheckReport()
+
+        issues, found = check_files(dcp_path, assets, pkl_assets)
+        report.issues.extend(issues)
+        report.checked = len(found) + len([issue for issue in issues if issue.path is not None])
+
+        records = self.get_records(found.keys())
+        with profiling.span("pkl.quickcheck.check"):
+            for asset_id, (full_path, size) in sorted(found.items()):
+                record = records.get(asset_id)
+                pkl_data = pkl_assets.get(asset_id)
+                if (record is None or pkl_data is None or record.file_hash != pkl_data.file_hash
+                        or record.size != size):
+                    report.unrecorded.append(asset_id)
+                    continue
+
+                indexes = list(range(len(record.offsets)))
+                if reads and reads < len(indexes):
+                    indexes = sorted(rng.sample(indexes, reads))
+                digests = _asset_digests(dcp_path, assets[asset_id], full_path, [record.offsets[i] for i in indexes],
+                                         record.block_size)
+                report.sampled += len(indexes)
+                for i, digest in zip(indexes, digests):
+                    if digest != record.digests[i]:
+                        report.issues.append(AssetIssue(asset_id, full_path, SAMPLE, record.digests[i], digest))
+                        break
+        profiling.count("pkl.quickcheck.blocks", report.sampled)
+        return report
@@ -0,0 +1,216 @@
+"""
+Background hashing limited to a share of the disk bandwidth.
+
+Hashing a content library while the server is playing a show can starve playback of disk
+reads. A HashScheduler hashes through generate_hash but holds reading to a budget of bytes
+per second and a number of files read at once, slows down further when reads get slow, and
+can be paused while something more important needs the disk.
+
+    scheduler = HashScheduler(bytes_per_second=20 * 1024 * 1024, max_readers=1, target_latency=0.05)
+    scheduler.start(((asset_id, path) for asset_id, path in files), callback=record)
+    ...
+    scheduler.pause()
+    scheduler.resume()
+    scheduler.join()
+"""
+import threading, time
+
+from smpteparsers.pkl import PKLError, generate_hash
+from smpteparsers.util.profiling import clock as monotonic_clock
+
+class HashCancelled(PKLError):
+    pass
+
+class TokenBucket(object):
+    """
+    Limits a flow to rate units per second, allowing bursts of up to burst units.
+
+    Taking more than is available puts the bucket into debt and the caller sleeps until it's
+    paid back, so amounts larger than the burst still work and concurrent callers queue up.
+
+    :param rate: units per second, or None for no limit
+    :param burst: most units which can be taken at once without waiting, defaults to a second's worth
+    """
+    def __init__(self, rate, burst=None, clock=monotonic_clock, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill()
+            self.rate = rate
+
+    def _refill(self):
+        now = self.clock()
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, amount):
+        """
+        Takes amount units, sleeping until they're available. Returns the seconds slept.
+        """
+        with self.lock:
+            if self.rate is None:
+                return 0
+            self._refill()
+            self.tokens -= amount
+            wait = -self.tokens / float(self.rate) if self.tokens < 0 else 0
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+class HashScheduler(object):
+    """
+    Hashes files in the same way as generate_hash, within a read budget.
+
+    :param bytes_per_second: most bytes read per second across all readers, or None for no limit
+    :param max_readers: most files read at the same time
+    :param chunk_size: bytes read at a time
+    :param target_latency: seconds a chunk read should take. While reads are slower than this the
+        rate is halved, down to min_rate, and while they're faster it's raised by a tenth of
+        bytes_per_second at a time back up to it. None to keep to bytes_per_second.
+    :param min_rate: lowest rate the latency adjustment goes to, a sixteenth of bytes_per_second
+        by default
+    :param clock: returns the time in seconds, a monotonic clock by default (see
+        smpteparsers.util.profiling.clock)
+    :param sleep: sleeps for a number of seconds, time.sleep by default
+
+    :ivar rate: the current budget in bytes per second
+    :ivar latency: moving average of the seconds each chunk took to read
+    :ivar bytes_hashed:
+    :ivar files_hashed:
+    """
+    def __init__(self, bytes_per_second=None, max_readers=1, chunk_size=1048576, target_latency=None, min_rate=None,
+                 clock=monotonic_clock, sleep=time.sleep):
+        self.max_rate = bytes_per_second
+        self.min_rate = min_rate if min_rate is not None else (bytes_per_second / 16.0 if bytes_per_second else None)
+        self.max_readers = max_readers
+        self.chunk_size = chunk_size
+        self.target_latency = target_latency
+
+        self.bucket = TokenBucket(bytes_per_second, burst=chunk_size if bytes_per_second else None, clock=clock, sleep=sleep)
+        self.readers = threading.BoundedSemaphore(max_readers)
+        self.lock = threading.Lock()
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = False
+        self._threads = []
+
+        self.latency = None
+        self.bytes_hashed = 0
+        self.files_hashed = 0
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def pause(self):
+        """
+        Stops reading once each reader finishes its current chunk, until resume() is called.
+        """
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        """
+        Stops hashing. Files being hashed raise HashCancelled and queued files are skipped.
+        """
+        self._cancelled = True
+        self._running.set()
+
+    def _wait(self):
+        self._running.wait()
+        if self._cancelled:
+            raise HashCancelled("Hashing cancelled")
+
+    def _adapt(self, seconds):
+        with self.lock:
+            self.latency = seconds if self.latency is None else self.latency * 0.8 + seconds * 0.2
+            if self.target_latency is None or self.max_rate is None:
+                return
+            if self.latency > self.target_latency:
+                rate = max(self.min_rate, self.bucket.rate / 2.0)
+            else:
+                rate = min(self.max_rate, self.bucket.rate + self.max_rate / 10.0)
+        if rate != self.bucket.rate:
+            self.bucket.set_rate(rate)
+
+    def _throttle(self, nbytes, seconds):
+        self._adapt(seconds)
+        with self.lock:
+            self.bytes_hashed += nbytes
+        self.bucket.consume(nbytes)
+        self._wait()
+
+    def hash_file(self, path):
+        """
+        Returns the base64 SHA-1 of a file, as generate_hash does, waiting for a free reader first.
+        Can be passed as the hash_func of smpteparsers.dcp.verify.verify_dcp.
+        """
+        with self.readers:
+            self._wait()
+            digest = generate_hash(path, self.chunk_size, throttle=self._throttle)
+        with self.lock:
+            self.files_hashed += 1
+        return digest
+
+    def verify(self, dcp_path, assets, pkl_assets, **kwargs):
+        """
+        Runs smpteparsers.dcp.verify.verify_dcp, hashing within the budget.
+        """
+        from smpteparsers.dcp.verify import verify_dcp
+        return verify_dcp(dcp_path, assets, pkl_assets, hash_func=self.hash_file, **kwargs)
+
+    def start(self, jobs, callback=None):
+        """
+        Hashes files in background threads, one for each reader.
+
+        :param jobs: iterable of (key, path) tuples, read as the threads need more work
+        :param callback: called from the hashing thread with (key, path, digest, error) for each
+            file, where error is the IOError or OSError raised reading it, else None
+        """
+        jobs = iter(jobs)
+        jobs_lock = threading.Lock()
+
+        def work():
+            while not self._cancelled:
+                with jobs_lock:
+                    try:
+                        key, path = next(jobs)
+                    except StopIteration:
+                        return
+                try:
+                    digest, error = self.hash_file(path), None
+                except HashCancelled:
+                    return
+                except (IOError, OSError) as e:
+                    digest, error = None, e
+                if callback is not None:
+                    callback(key, path, digest, error)
+
+        for _ in range(self.max_readers):
+            thread = threading.Thread(target=work)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self, timeout=None):
+        """
+        Waits for the background threads to finish. Returns whether they all have.
+        """
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        return not self._threads
@@ -0,0 +1,122 @@
+"""
+Writes PKLs an asset at a time, and works out the sizes and hashes of the files for them
+in parallel.
+
+    with open(path, 'wb') as f:
+        writer = PKLWriter(f, pkl_id)
+        for asset_id, asset_data, pkl_data in describe_files(dcp_path, files, workers=4):
+            writer.add(asset_id, pkl_data)
+        writer.close()
+"""
+import datetime, os, uuid
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+from smpteparsers.assetmap import AssetData
+from smpteparsers.pkl import PKLData, generate_hash
+from smpteparsers.util.date_utils import format_date
+from smpteparsers.util.xmlwriter import XMLWriter
+
+SMPTE_NS = "http://www.smpte-ra.org/schemas/429-8/2007/PKL"
+INTEROP_NS = "http://www.digicine.com/PROTO-ASDCP-PKL-20040311#"
+
+class PKLWriter(object):
+    """
+    Streams a PKL to a binary file object.
+
+    :param out: binary file object
+    :param pkl_id: UUID of the PKL, a new one by default
+    :param issue_date: datetime, now by default. Naive datetimes are taken to be UTC.
+    :param namespace: SMPTE_NS or INTEROP_NS
+    """
+    def __init__(self, out, pkl_id=None, issue_date=None, issuer="smpteparsers", creator="smpteparsers",
+                 annotation_text=None, namespace=SMPTE_NS):
+        self.id = pkl_id or str(uuid.uuid4())
+        self.count = 0
+        self.xml = XMLWriter(out)
+        xml = self.xml
+
+        xml.start("PackingList", {"xmlns": namespace})
+        xml.element("Id", "urn:uuid:" + self.id)
+        if annotation_text is not None:
+            xml.element("AnnotationText", annotation_text)
+        xml.element("IssueDate", format_date(issue_date or datetime.datetime.utcnow()))
+        xml.element("Issuer", issuer)
+        xml.element("Creator", creator)
+        xml.start("AssetList")
+
+    def add(self, asset_id, pkl_data, annotation_text=None, original_file_name=None):
+        """
+        Writes an asset.
+
+        :param pkl_data: PKLData with the base64 SHA-1 hash, size and type of the asset
+        """
+        xml = self.xml
+        xml.start("Asset")
+        xml.element("Id", "urn:uuid:" + asset_id)
+        if annotation_text is not None:
+            xml.element("AnnotationText", annotation_text)
+        xml.element("Hash", pkl_data.file_hash)
+        xml.element("Size", str(pkl_data.size))
+        xml.element("Type", pkl_data.file_type)
+        if original_file_name is not None:
+            xml.element("OriginalFileName", original_file_name)
+        xml.end("Asset")
+        self.count += 1
+
+    def close(self):
+        """
+        Ends the document. The file is left open.
+        """
+        self.xml.end("AssetList")
+        self.xml.end("PackingList")
+        self.xml.close()
+
+def _describe(dcp_path, asset_id, path, file_type, hash_func):
+    full_path = os.path.join(dcp_path, path)
+    size = os.path.getsize(full_path)
+    digest = hash_func(full_path)
+    if isinstance(digest, bytes):
+        digest = digest.decode("ascii")
+    return asset_id, AssetData(path, 1, 0, size), PKLData(digest, str(size), file_type)
+
+def describe_files(dcp_path, files, workers=4, hash_func=generate_hash):
+    """
+    Works out the size and hash of the files of a package, hashing up to workers files at a time.
+
+    Yields (asset_id, AssetData, PKLData) for each file, in the order of files. Only a few more files
+    than there are workers are read ahead, so any number of files can be described in constant memory.
+
+    :param dcp_path: directory of the package
+    :param files: iterable of (asset_id, path relative to dcp_path, PKL type) tuples
+    :param workers: number of files hashed at the same time, 1 to hash them in this thread
+    :param hash_func: returns the base64 SHA-1 of a file, e.g. HashScheduler.hash_file
+    """
+    if workers <= 1:
+        for asset_id, path, file_type in files:
+            yield _describe(dcp_path, asset_id, path, file_type, hash_func)
+        return
+
+    pool = ThreadPool(workers)
+    try:
+        pending = deque()
+        for asset_id, path, file_type in files:
+            pending.append(pool.apply_async(_describe, (dcp_path, asset_id, path, file_type, hash_func)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+def write_pkl(out, assets, **kwargs):
+    """
+    Writes a PKL of (asset_id, PKLData) pairs, e.g. PKL.assets.items(), to a binary file object.
+    The other arguments are those of PKLWriter. Returns the PKL id.
+    """
+    writer = PKLWriter(out, **kwargs)
+    for asset_id, pkl_data in assets:
+        writer.add(asset_id, pkl_data)
+    writer.close()
+    return writer.id
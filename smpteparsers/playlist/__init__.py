@@ -1,16 +1,74 @@
 import os, json
-from jsonschema import validate as validate_json
-from jsonschema import ValidationError
+
+from smpteparsers.util.cache import lru_cache
 
 """
 Not technically a SMPTE standard, just the format we use internally to represent a show playlist
 within the TMS. Thought this was the best place for the parse alongside the others for easy discovery :)
 """
 
-# Used to encapsulate the error so we don't expose we're using jsonschema.
-class PlaylistValidationError(ValidationError):
+class PlaylistError(Exception):
+    pass
+# Used to encapsulate the error so we don't expose we're using jsonschema, which is only
+# imported when a playlist is first validated.
+class PlaylistValidationError(PlaylistError):
     pass
 
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'schema.json')
+
+@lru_cache(maxsize=None)
+def get_validator(schema_path=SCHEMA_PATH):
+    """
+    Load a playlist schema and build its validator, once per process for each schema path.
+
+    Args:
+        schema_path (optional, default='./schema.json') - The path to the schema.
+
+    Returns:
+        A jsonschema validator object
+    """
+    from jsonschema import Draft4Validator
+    from jsonschema.validators import validator_for
+
+    with open(schema_path) as f:
+        schema = json.load(f)
+
+    cls = validator_for(schema, default=Draft4Validator)
+    cls.check_schema(schema)
+    return cls(schema)
+
+def _load_contents(playlist_contents):
+    if type(playlist_contents) in [str, unicode]:
+        try:
+            return json.loads(playlist_contents)
+        except ValueError:
+            # Triggers if we send through something that isn't valid json
+            return {}
+    return playlist_contents
+
+def validate_playlists(playlists, schema_path=SCHEMA_PATH):
+    """
+    Validate many playlists against the same schema, collecting every error rather than stopping
+    at the first.
+
+    Args:
+        playlists - Iterable of Playlist objects or of playlist contents, as dicts or JSON strings.
+        schema_path (optional, default='./schema.json') - The path to the schema to validate the playlists against.
+
+    Returns:
+        Dict of the position of each invalid playlist to the list of its PlaylistValidationErrors,
+        empty if all the playlists are valid.
+    """
+    validator = get_validator(schema_path)
+
+    errors = {}
+    for index, playlist in enumerate(playlists):
+        contents = playlist.playlist_contents if isinstance(playlist, Playlist) else _load_contents(playlist)
+        found = [PlaylistValidationError(e) for e in validator.iter_errors(contents)]
+        if found:
+            errors[index] = found
+    return errors
+
 class Playlist(object):
     def __init__(self, playlist_contents=None, parse=True, validate=True):
         """
@@ -64,12 +122,7 @@ class Playlist(object):
         if playlist_contents is not None:
             self.playlist_contents = playlist_contents
 
-        if type(self.playlist_contents) in [str, unicode]:
-            try:
-                self.playlist_contents = json.loads(self.playlist_contents)
-            except ValueError:
-                # Triggers if we send through something that isn't valid json
-                self.playlist_contents = {}
+        self.playlist_contents = _load_contents(self.playlist_contents)
 
         if validate:
             self.validate()
@@ -82,24 +135,24 @@ class Playlist(object):
         for event in self.playlist_contents['events']:
             self.events.append(PlaylistEvent(**event))
 
-    def validate(self, schema_path=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'schema.json')):
+    def validate(self, schema_path=SCHEMA_PATH):
         """
         Validate the playlist contents
 
         Args:
             schema_path (optional, default='./schema.json') - The path to the schema to validate the playlist against.
+                The schema is loaded once and its validator reused for every playlist.
 
         Returns:
             void
         """
-        with open(schema_path) as f:
-            schema = json.load(f)
-
-            try:
-                validate_json(self.playlist_contents, schema)
-            except ValidationError as e:
-                # Encapsulate the error so we can hide the implementation to the client.
-                raise PlaylistValidationError(e)
+        from jsonschema import ValidationError
+
+        try:
+            get_validator(schema_path).validate(self.playlist_contents)
+        except ValidationError as e:
+            # Encapsulate the error so we can hide the implementation to the client.
+            raise PlaylistValidationError(e)
 
 class PlaylistEvent(object):
     def __init__(self, cpl_id, type, text, duration_in_frames, duration_in_seconds, edit_rate):
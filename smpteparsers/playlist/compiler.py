@@ -0,0 +1,236 @@
+"""
+Compiles a show playlist against parsed CPLs into a flat timeline of its events.
+
+Each event's duration and edit rate are taken from its CPL, when the CPL is known, rather
+than from the values copied into the playlist, and every event is given its absolute start
+in the show. Compiled playlists are cached and recompiled only when the playlist or one of
+its CPLs has changed, so compiling a week of shows which share trailers and adverts only
+resolves each CPL once.
+
+    compiler = PlaylistCompiler(cpls_by_id)
+    show = compiler.compile(playlist)
+    for event in show.events:
+        print(event.start_seconds, event.text)
+"""
+from array import array
+from bisect import bisect_right
+from fractions import Fraction
+from weakref import WeakKeyDictionary
+
+from smpteparsers.playlist import PlaylistError
+
+class PlaylistCompileError(PlaylistError):
+    pass
+
+class CompiledEvent(object):
+    """
+    An event placed on the show timeline.
+
+    :ivar index: position of the event in the playlist
+    :ivar event: the PlaylistEvent
+    :ivar cpl: the CPL the event plays, or None if it wasn't in the index
+    :ivar edit_rate: edit rate of the CPL as a tuple, e.g. (24, 1)
+    :ivar duration_in_frames: duration at the event's own edit rate
+    :ivar duration_in_seconds:
+    :ivar start_frame: start in frames at the show's edit rate
+    :ivar start_seconds:
+    """
+    __slots__ = ('index', 'event', 'cpl', 'edit_rate', 'duration_in_frames', 'duration_in_seconds',
+                 'start_frame', 'start_seconds')
+
+    def __init__(self, index, event, cpl, edit_rate, duration_in_frames, duration_in_seconds, start_frame, start_seconds):
+        self.index = index
+        self.event = event
+        self.cpl = cpl
+        self.edit_rate = edit_rate
+        self.duration_in_frames = duration_in_frames
+        self.duration_in_seconds = duration_in_seconds
+        self.start_frame = start_frame
+        self.start_seconds = start_seconds
+
+    @property
+    def cpl_id(self):
+        return self.event.cpl_id
+
+    @property
+    def text(self):
+        return self.event.text
+
+    @property
+    def resolved(self):
+        """
+        Whether the timings came from the CPL rather than from the playlist.
+        """
+        return self.cpl is not None
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+class CompiledPlaylist(object):
+    """
+    The events of a playlist laid out end to end.
+
+    :ivar playlist: the Playlist it was compiled from
+    :ivar events: list of CompiledEvent objects in playlist order
+    :ivar edit_rate: edit rate of the show, that of its first event
+    :ivar duration_in_frames: total duration at the show's edit rate
+    :ivar duration_in_seconds: total duration
+    :ivar starts: array of the start frame of each event at the show's edit rate
+    """
+    def __init__(self, playlist, events, edit_rate, duration_in_frames, duration_in_seconds):
+        self.playlist = playlist
+        self.events = events
+        self.edit_rate = edit_rate
+        self.duration_in_frames = duration_in_frames
+        self.duration_in_seconds = duration_in_seconds
+        self.starts = array('l', [event.start_frame for event in events])
+
+    @property
+    def unresolved(self):
+        """
+        Events whose CPL wasn't in the index.
+        """
+        return [event for event in self.events if event.cpl is None]
+
+    def event_at(self, frame):
+        """
+        Returns the CompiledEvent playing at a frame of the show (at the show's edit rate),
+        raising IndexError if the frame is outside the show.
+        """
+        if frame < 0 or frame >= self.duration_in_frames:
+            raise IndexError("Frame {0} is outside the show (0 to {1})".format(frame, self.duration_in_frames - 1))
+        return self.events[bisect_right(self.starts, frame) - 1]
+
+    def event_at_seconds(self, seconds):
+        """
+        Returns the CompiledEvent playing a number of seconds into the show.
+        """
+        return self.event_at(int(seconds * self.edit_rate[0] // self.edit_rate[1]))
+
+class _Resolved(object):
+    __slots__ = ('cpl', 'timeline', 'edit_rate', 'duration_in_frames')
+
+    def __init__(self, cpl, timeline, edit_rate, duration_in_frames):
+        self.cpl = cpl
+        self.timeline = timeline
+        self.edit_rate = edit_rate
+        self.duration_in_frames = duration_in_frames
+
+class _Compiled(object):
+    __slots__ = ('events', 'key', 'resolved', 'result')
+
+    def __init__(self, events, key, resolved, result):
+        self.events = events
+        self.key = key
+        self.resolved = resolved
+        self.result = result
+
+class PlaylistCompiler(object):
+    def __init__(self, cpls, strict=False):
+        """
+        Init a new compiler
+
+        Args:
+            cpls - Mapping of CPL id to parsed CPL object, e.g. a dict. It is read on every
+                compile so CPLs can be added, replaced or re-parsed between compiles.
+            strict (optional, default=False) - Raise PlaylistCompileError for an event whose CPL isn't
+                in cpls, rather than using the duration and edit rate copied into the playlist.
+        """
+        self.cpls = cpls
+        self.strict = strict
+        self._resolved = {}
+        self._compiled = WeakKeyDictionary()
+
+    def invalidate(self, cpl_id=None):
+        """
+        Drop cached results, for one CPL or, by default, all of them. Only needed if a CPL
+        object is changed in place without being parsed again, replacing or re-parsing a CPL is
+        detected on the next compile.
+        """
+        if cpl_id is None:
+            self._resolved.clear()
+            self._compiled.clear()
+        else:
+            self._resolved.pop(cpl_id, None)
+            for playlist, compiled in list(self._compiled.items()):
+                if cpl_id in compiled.resolved:
+                    del self._compiled[playlist]
+
+    def _resolve(self, cpl_id):
+        cpl = self.cpls.get(cpl_id)
+        if cpl is None:
+            self._resolved.pop(cpl_id, None)
+            return None
+
+        # The timeline is rebuilt whenever the CPL is parsed, so it identifies the CPL's contents
+        timeline = cpl.timeline
+        if not timeline.reels:
+            raise PlaylistCompileError("CPL {0} has no reels".format(cpl_id))
+        resolved = self._resolved.get(cpl_id)
+        if resolved is None or resolved.cpl is not cpl or resolved.timeline is not timeline:
+            resolved = _Resolved(cpl, timeline, tuple(timeline.edit_rate), timeline.duration_in_frames)
+            self._resolved[cpl_id] = resolved
+        return resolved
+
+    def compile(self, playlist):
+        """
+        Compile a playlist, or return the cached result if neither it nor its CPLs have changed.
+
+        Args:
+            playlist - A parsed Playlist
+
+        Returns:
+            CompiledPlaylist
+
+        Raises PlaylistCompileError if one of the CPLs has no reels.
+        """
+        resolved = {}
+        for event in playlist.events:
+            if event.cpl_id not in resolved:
+                resolved[event.cpl_id] = self._resolve(event.cpl_id)
+
+        # The result refers to the events, and is built from these fields of them, so events
+        # added, removed or changed in place are picked up as well as the playlist being parsed again
+        key = tuple((event.cpl_id, event.duration_in_frames, tuple(event.edit_rate)) for event in playlist.events)
+        compiled = self._compiled.get(playlist)
+        if (compiled is not None and compiled.events is playlist.events and compiled.key == key
+                and len(compiled.resolved) == len(resolved)
+                and all(compiled.resolved.get(cpl_id) is r for cpl_id, r in resolved.items())):
+            return compiled.result
+
+        result = self._compile(playlist, resolved)
+        self._compiled[playlist] = _Compiled(playlist.events, key, resolved, result)
+        return result
+
+    def compile_all(self, playlists):
+        """
+        Compile many playlists, returning a list of CompiledPlaylist objects in the same order.
+        """
+        return [self.compile(playlist) for playlist in playlists]
+
+    def _compile(self, playlist, resolved):
+        events = []
+        show_rate = None
+        start = Fraction(0)
+
+        for index, event in enumerate(playlist.events):
+            r = resolved[event.cpl_id]
+            if r is not None:
+                cpl, edit_rate, frames = r.cpl, r.edit_rate, r.duration_in_frames
+            elif self.strict:
+                raise PlaylistCompileError("CPL {0} of event {1} not found".format(event.cpl_id, index))
+            else:
+                cpl, edit_rate, frames = None, tuple(event.edit_rate), event.duration_in_frames
+
+            if show_rate is None:
+                show_rate = edit_rate
+            duration = Fraction(frames * edit_rate[1], edit_rate[0])
+            events.append(CompiledEvent(
+                index, event, cpl, edit_rate, frames, float(duration),
+                int(start * show_rate[0] / show_rate[1]), float(start)
+            ))
+            start += duration
+
+        if show_rate is None:
+            raise PlaylistCompileError("Playlist has no events")
+        return CompiledPlaylist(playlist, events, show_rate, int(start * show_rate[0] / show_rate[1]), float(start))
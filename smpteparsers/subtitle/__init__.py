@@ -0,0 +1,297 @@
+"""
+Parses Interop (DCSubtitle) and SMPTE (428-7 SubtitleReel) subtitle XML into cues, for finding
+the subtitles on screen at a frame.
+
+The document is read with iterparse and each Subtitle element is dropped once its cue is built,
+so only the cues are kept in memory. Fonts and images are kept as the references in the document,
+never loaded.
+
+    reel = parse_subtitles(path, edit_rate=(24, 1))
+    for cue in reel.active(frame):
+        print(cue.texts)
+
+    track = SubtitleTrack.from_cpl(cpl, dcp_path)
+    track.active(frame)    # frame from the start of the CPL
+"""
+import os
+from array import array
+from bisect import bisect_right
+
+from smpteparsers.util import profiling, PARSER_OPTIONS
+
+class SubtitleError(Exception):
+    pass
+
+INTEROP = "interop"
+SMPTE = "smpte"
+
+# Interop times count ticks of 4ms
+INTEROP_TICK_RATE = 250
+
+class Cue(object):
+    """
+    A subtitle, shown from start up to but not including end.
+
+    :ivar start: first frame, at the reel's edit rate from the start of the track
+    :ivar end: frame after the last
+    :ivar spot_number:
+    :ivar texts: list of the text of each line
+    :ivar images: list of the image references, file names for Interop and urn:uuid for SMPTE
+    """
+    __slots__ = ('start', 'end', 'spot_number', 'texts', 'images')
+
+    def __init__(self, start, end, spot_number=None, texts=None, images=None):
+        self.start = start
+        self.end = end
+        self.spot_number = spot_number
+        self.texts = texts or []
+        self.images = images or []
+
+    def __repr__(self):
+        return str(dict((name, getattr(self, name)) for name in self.__slots__))
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _to_frames(units, units_per_second, edit_rate):
+    """
+    Converts a time in units_per_second to the nearest frame at edit_rate.
+    """
+    numerator, denominator = edit_rate
+    divisor = units_per_second * denominator
+    return (units * numerator * 2 + divisor) // (2 * divisor)
+
+def parse_time(value, tick_rate, edit_rate):
+    """
+    Converts a subtitle time to a frame at edit_rate.
+
+    Takes 'HH:MM:SS:TT', where TT counts ticks at tick_rate per second (4ms ticks for Interop,
+    the TimeCodeRate for SMPTE), or 'HH:MM:SS.sss'. Raises SubtitleError if it's neither.
+    """
+    try:
+        parts = value.strip().split(':')
+        if len(parts) == 4:
+            hours, minutes, seconds, ticks = [int(part) for part in parts]
+            per_second = tick_rate
+        elif len(parts) == 3:
+            hours, minutes = int(parts[0]), int(parts[1])
+            seconds, _, fraction = parts[2].partition('.')
+            seconds = int(seconds)
+            ticks = int((fraction + "000")[:3])
+            per_second = 1000
+        else:
+            raise ValueError(value)
+    except (ValueError, AttributeError):
+        raise SubtitleError("Invalid time: {0!r}".format(value))
+    units = ((hours * 60 + minutes) * 60 + seconds) * per_second + ticks
+    return _to_frames(units, per_second, edit_rate)
+
+class SubtitleReel(object):
+    """
+    The cues of a subtitle document, one reel's worth, sorted by start frame.
+
+    The start and end frames of the cues are kept in arrays, with the latest end of all the cues
+    up to each one, so active() is a bisect and a short walk back over the cues still on screen.
+
+    :ivar id: SubtitleID (Interop) or Id (SMPTE)
+    :ivar standard: INTEROP or SMPTE
+    :ivar title: MovieTitle or ContentTitleText
+    :ivar reel_number:
+    :ivar language:
+    :ivar edit_rate: tuple, the frame rate of the cue times
+    :ivar fonts: dict of font id to the font's file name (Interop) or urn:uuid (SMPTE)
+    :ivar cues: list of Cue objects
+    :ivar starts: array of the start frame of each cue
+    :ivar ends: array of the end frame of each cue
+    """
+    def __init__(self, cues=(), edit_rate=(24, 1)):
+        self.id = None
+        self.standard = None
+        self.title = None
+        self.reel_number = None
+        self.language = None
+        self.edit_rate = edit_rate
+        self.fonts = {}
+        self.set_cues(cues)
+
+    def __len__(self):
+        return len(self.cues)
+
+    def set_cues(self, cues):
+        self.cues = sorted(cues, key=lambda cue: (cue.start, cue.end))
+        self.starts = array('l', [cue.start for cue in self.cues])
+        self.ends = array('l', [cue.end for cue in self.cues])
+        self._latest_ends = array('l')
+        latest = 0
+        for end in self.ends:
+            latest = max(latest, end)
+            self._latest_ends.append(latest)
+
+    def active(self, frame):
+        """
+        Returns the cues on screen at a frame, in order of start.
+        """
+        index = bisect_right(self.starts, frame)
+        found = []
+        # No cue before one whose latest end is at or before the frame can still be on screen
+        while index > 0 and self._latest_ends[index - 1] > frame:
+            index -= 1
+            if self.ends[index] > frame:
+                found.append(self.cues[index])
+        found.reverse()
+        return found
+
+    def next_change(self, frame):
+        """
+        Returns the next frame after frame at which a cue starts or ends, or None if none do,
+        so callers polling for the active cues only need to look again from then.
+        """
+        change = None
+        index = bisect_right(self.starts, frame)
+        if index < len(self.starts):
+            change = self.starts[index]
+        for cue in self.active(frame):
+            if change is None or cue.end < change:
+                change = cue.end
+        return change
+
+def _cue(element, tick_rate, edit_rate, offset):
+    try:
+        start = parse_time(element.get("TimeIn"), tick_rate, edit_rate) - offset
+        end = parse_time(element.get("TimeOut"), tick_rate, edit_rate) - offset
+    except SubtitleError as e:
+        raise SubtitleError("Subtitle {0}: {1}".format(element.get("SpotNumber"), e))
+    texts = []
+    images = []
+    for child in element.iter():
+        if not isinstance(child.tag, str):
+            continue
+        name = _local_name(child.tag)
+        if name == "Text":
+            texts.append("".join(child.itertext()))
+        elif name == "Image":
+            images.append((child.text or "").strip())
+    spot_number = element.get("SpotNumber")
+    return Cue(start, end, int(spot_number) if spot_number and spot_number.isdigit() else spot_number,
+               texts, images)
+
+def parse_subtitles(source, edit_rate=None):
+    """
+    Parses an Interop or SMPTE subtitle document.
+
+    :param source: path or binary file object of the XML
+    :param edit_rate: frame rate to convert the cue times to, e.g. the CPL Subtitle asset's edit
+        rate. By default the document's EditRate for SMPTE, or (24, 1) for Interop.
+    :returns: SubtitleReel
+    """
+    from lxml import etree
+
+    reel = SubtitleReel()
+    cues = []
+    tick_rate = INTEROP_TICK_RATE
+    start_time = None
+    offset = 0
+    depth = 0
+
+    try:
+        with profiling.span("subtitle.parse"):
+            for event, element in etree.iterparse(source, events=("start", "end"), remove_comments=True,
+                                                  **PARSER_OPTIONS):
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        root_name = _local_name(element.tag)
+                        if root_name == "DCSubtitle":
+                            reel.standard = INTEROP
+                        elif root_name == "SubtitleReel":
+                            reel.standard = SMPTE
+                        else:
+                            raise SubtitleError("Not a subtitle document: {0}".format(root_name))
+                        reel.edit_rate = edit_rate or (24, 1)
+                    elif _local_name(element.tag) == "Subtitle" and start_time is not None:
+                        # SMPTE times are from the StartTime, which comes before the cues
+                        offset = parse_time(start_time, tick_rate, reel.edit_rate)
+                        start_time = None
+                    continue
+
+                depth -= 1
+                name = _local_name(element.tag)
+                if name == "Subtitle":
+                    cues.append(_cue(element, tick_rate, reel.edit_rate, offset))
+                    element.clear()
+                    # Drop the cues already built from the tree too
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+                elif name == "LoadFont":
+                    font_id = element.get("Id") or element.get("ID")
+                    reel.fonts[font_id] = element.get("URI") or (element.text or "").strip()
+                elif depth == 1:
+                    text = (element.text or "").strip()
+                    if name in ("SubtitleID", "Id"):
+                        reel.id = text[9:] if text.startswith("urn:uuid:") else text
+                    elif name in ("MovieTitle", "ContentTitleText"):
+                        reel.title = text
+                    elif name == "ReelNumber":
+                        reel.reel_number = int(text) if text.isdigit() else text
+                    elif name == "Language":
+                        reel.language = text
+                    elif name == "EditRate":
+                        if edit_rate is None:
+                            reel.edit_rate = tuple(int(part) for part in text.split())
+                    elif name == "TimeCodeRate":
+                        tick_rate = int(text)
+                    elif name == "StartTime":
+                        start_time = text
+    except etree.XMLSyntaxError as e:
+        raise SubtitleError(e)
+    except ValueError as e:
+        raise SubtitleError(e)
+
+    reel.set_cues(cues)
+    profiling.count("subtitle.cues", len(cues))
+    return reel
+
+class SubtitleTrack(object):
+    """
+    The subtitles of a CPL, for finding the cues on screen at a frame from the start of the CPL.
+
+    :param timeline: the CPL's smpteparsers.cpl.timeline.Timeline
+    :param reels: SubtitleReel for each reel of the CPL, or None for a reel without subtitles
+    """
+    def __init__(self, timeline, reels):
+        self.timeline = timeline
+        self.reels = list(reels)
+        if len(self.reels) != len(timeline.reels):
+            raise SubtitleError("{0} subtitle reels for {1} reels".format(len(self.reels), len(timeline.reels)))
+        self.entry_points = array('l', [
+            (getattr(reel, 'subtitle', None) and reel.subtitle.entry_point) or 0 for reel in timeline.reels])
+
+    @classmethod
+    def from_cpl(cls, cpl, dcp_path=""):
+        """
+        Parses the subtitle XML of each reel of a CPL, at the edit rate of its Subtitle asset.
+        The assets' paths must be set, i.e. the CPL parsed with its assetmap. Paths from an
+        asset index are absolute, so aren't taken from dcp_path.
+        """
+        reels = []
+        for reel in cpl.reels:
+            subtitle = getattr(reel, 'subtitle', None)
+            if subtitle is None:
+                reels.append(None)
+                continue
+            path = getattr(subtitle, 'path', None)
+            if path is None:
+                raise SubtitleError("No path for subtitle asset {0}".format(subtitle.id))
+            reels.append(parse_subtitles(os.path.join(dcp_path, path), subtitle.edit_rate))
+        return cls(cpl.timeline, reels)
+
+    def active(self, frame):
+        """
+        Returns the cues on screen at a frame from the start of the CPL. Raises IndexError if the
+        frame is outside the CPL.
+        """
+        index = self.timeline.reel_index(frame)
+        reel = self.reels[index]
+        if reel is None:
+            return []
+        return reel.active(frame - self.timeline.starts[index] + self.entry_points[index])
@@ -1,6 +1,7 @@
 """
 Utility functions
 """
+import os, sys
 from io import StringIO
 
 try:
@@ -8,7 +9,19 @@ try:
 except ImportError:
     import xml.etree.ElementTree as ET
 
-from lxml import etree
+from smpteparsers.util import profiling
+
+if sys.version_info > (3, ):
+    text_type = str
+else:
+    text_type = unicode
+
+# Read memoryviews and bytearrays into the parser in chunks of this size rather than copying them
+_FEED_CHUNK_SIZE = 65536
+
+# lxml parser options for documents from outside, e.g. a delivery or a feed: entities aren't
+# expanded, nothing is fetched over the network and libxml2's limits on document size stay on
+PARSER_OPTIONS = {'resolve_entities': False, 'no_network': True, 'huge_tree': False}
 
 
 def get_element(root, tag, namespace):
@@ -38,21 +51,103 @@ def get_namespace(tag):
     right_brace = tag.rfind("}")
     return tag[1:right_brace]
 
-def validate_xml(schema_file, xml_file, schema_imports=[], from_path=False):
-    with open(schema_file, 'r') as f:
-        schema_root = etree.XML(f.read().encode("utf-8"))
+def is_xml_content(source):
+    """
+    Whether a string is an XML document itself rather than a path to one, i.e. whether
+    it starts with '<' (after any whitespace or byte order mark).
+    """
+    if isinstance(source, text_type):
+        return source.lstrip(u'\ufeff \t\r\n').startswith(u'<')
+    return source.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<')
+
+def parse_xml(source, schema=None, from_path=False):
+    """
+    Parses an XML document and returns the lxml root element.
+
+    :param source: any of
+        a path,
+        the document as bytes (parsed in place) or text,
+        a bytearray or memoryview (read in chunks rather than copied),
+        or a file-like object such as an open file, an mmap, a tar member or an HTTP response body.
+        Strings are treated as the document if they start with '<', otherwise as a path.
+    :param schema: an lxml XMLSchema to validate the document against while it is parsed.
+    :param from_path: always treat a string source as a path.
+
+    Raises etree.XMLSyntaxError if the document is malformed or invalid.
+    """
+    root = _parse_xml(source, schema, from_path)
+    if profiling.enabled():
+        size = _source_size(source, from_path)
+        if size is not None:
+            profiling.count("xml.bytes", size)
+        profiling.count("xml.elements", sum(1 for _ in root.iter()))
+    return root
 
+def _source_size(source, from_path):
+    try:
+        if isinstance(source, (bytearray, memoryview)):
+            return memoryview(source).nbytes
+        if isinstance(source, (bytes, text_type)):
+            if from_path or not is_xml_content(source):
+                return os.path.getsize(source)
+            return len(source)
+        if hasattr(source, '__fspath__'):
+            return os.path.getsize(source.__fspath__())
+        return len(source) # e.g. an mmap
+    except (TypeError, OSError):
+        # Sizes of other file objects aren't known
+        return None
+
+def _parse_xml(source, schema, from_path):
+    # lxml is imported on first use, callers which only use ElementTree never load it
+    from lxml import etree
+    parser = etree.XMLParser(schema=schema, remove_comments=True, remove_pis=True, **PARSER_OPTIONS)
+
+    if hasattr(source, 'read'):
+        return etree.parse(source, parser).getroot()
+    if hasattr(source, '__fspath__'):
+        return etree.parse(source.__fspath__(), parser).getroot()
+    if isinstance(source, (bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), _FEED_CHUNK_SIZE):
+            parser.feed(view[start:start + _FEED_CHUNK_SIZE].tobytes())
+        return parser.close()
+    if not from_path and is_xml_content(source):
+        if isinstance(source, text_type):
+            # lxml won't parse text which has an encoding declaration
+            source = source.encode("utf-8")
+        return etree.fromstring(source, parser)
+    return etree.parse(source, parser).getroot()
+
+_schemas = {}
+
+def get_schema(schema_file, schema_imports=()):
+    """
+    Returns the compiled lxml XMLSchema for a schema file, compiling it on first use.
+
+    :param schema_imports: list of dicts of attributes for extra xs:import elements to add to the schema.
+    """
+    key = (schema_file, tuple(tuple(sorted(i.items())) for i in schema_imports))
+    try:
+        return _schemas[key]
+    except KeyError:
+        pass
+
+    from lxml import etree
+    schema_root = etree.parse(schema_file).getroot()
     for schema_import in schema_imports:
         new_import = etree.Element('{http://www.w3.org/2001/XMLSchema}import', **schema_import)
         schema_root.insert(0, new_import)
 
-    schema = etree.XMLSchema(schema_root)
-    xmlparser = etree.XMLParser(schema=schema)
+    schema = _schemas[key] = etree.XMLSchema(schema_root)
+    return schema
 
-    if from_path:
-        with open(xml_file, 'r') as f:
-            xml_file = f.read()
-    etree.fromstring(xml_file.encode("utf-8"), xmlparser)
+def validate_xml(schema_file, xml_file, schema_imports=[], from_path=False):
+    """
+    Validates an XML document against a schema while parsing it and returns the root element,
+    so it doesn't need to be parsed again. xml_file can be any source accepted by parse_xml().
+    """
+    return parse_xml(xml_file, schema=get_schema(schema_file, schema_imports), from_path=from_path)
 
 def create_child_element(parent, el_name, el_val):
     """ElementTree Helper method to create a new element with a supplied value
@@ -0,0 +1,66 @@
+"""
+Caching utilities
+"""
+try:
+    from functools import lru_cache
+except ImportError:
+    # Python 2 doesn't have functools.lru_cache, use a minimal version of it. Python 2.6 has no
+    # OrderedDict either, so the order of use is kept in a circular linked list of
+    # [previous, next, key, result] links, like the pure Python version of functools.lru_cache
+    from functools import wraps
+    from threading import RLock
+
+    PREV, NEXT, KEY, RESULT = 0, 1, 2, 3
+
+    def lru_cache(maxsize=128):
+        """
+        Decorator which memoises a function on its (hashable) arguments, keeping the
+        maxsize most recently used results. Supports cache_clear() and the __wrapped__
+        attribute like functools.lru_cache.
+        """
+        def decorator(func):
+            cache = {}
+            # The root's next link is the least recently used, its previous link the most
+            root = []
+            root[:] = [root, root, None, None]
+            lock = RLock()
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = args + tuple(sorted(kwargs.items())) if kwargs else args
+                with lock:
+                    link = cache.get(key)
+                    if link is not None:
+                        # Move to the most recently used end
+                        link[PREV][NEXT] = link[NEXT]
+                        link[NEXT][PREV] = link[PREV]
+                        last = root[PREV]
+                        last[NEXT] = root[PREV] = link
+                        link[PREV], link[NEXT] = last, root
+                        return link[RESULT]
+
+                result = func(*args, **kwargs)
+                with lock:
+                    if key in cache:
+                        # Added by another thread meanwhile
+                        return result
+                    last = root[PREV]
+                    link = [last, root, key, result]
+                    last[NEXT] = root[PREV] = cache[key] = link
+                    if maxsize is not None and len(cache) > maxsize:
+                        oldest = root[NEXT]
+                        root[NEXT] = oldest[NEXT]
+                        oldest[NEXT][PREV] = root
+                        del cache[oldest[KEY]]
+                return result
+
+            def cache_clear():
+                with lock:
+                    cache.clear()
+                    root[:] = [root, root, None, None]
+
+            wrapper.cache_clear = cache_clear
+            wrapper.__wrapped__ = func
+            return wrapper
+
+        return decorator
@@ -2,18 +2,71 @@
 Date utilities - Stolen from the tms :)
 """
 import calendar, datetime, re, time
+from bisect import bisect_right
 import pytz
 
+from smpteparsers.util.cache import lru_cache
 
-_date_date_re = re.compile(r'([\d-]+)T?')
-_date_time_re = re.compile(r'(?:T| )([\d:]+)')
+
+@lru_cache(maxsize=4096)
 def parse_date(datetime_str, default_to_local_time = True):
     """
     Parses a string for a date and time, assuming
     that the date is of the format 'YYYY-MM-DD' and the time is of the format 'HH:MM:SS'
     and handles +/-HH:MM offsets according to RFC3339.
-    Returns the datetime as a posix timestamp or None if it fails to parse
+    Returns the date and time in UTC as a naive datetime, raises ValueError if it fails to parse.
+
+    Results are memoised, as the same issue dates turn up many times when scanning a library.
+    Dates without an offset are converted from the local time zone, call parse_date.cache_clear()
+    if that is changed with time.tzset().
+    """
+    parsed = _parse_date_fast(datetime_str, default_to_local_time)
+    if parsed is None:
+        parsed = _parse_date_general(datetime_str, default_to_local_time)
+    return parsed
+
+def _parse_date_fast(datetime_str, default_to_local_time):
     """
+    Parses the fixed 'YYYY-MM-DDTHH:MM:SS' form, followed by 'Z', '+HH:MM', '-HH:MM' or nothing,
+    which is what DCP XML almost always uses. Returns None for anything else.
+    """
+    length = len(datetime_str)
+    if length < 19 or datetime_str[4] != '-' or datetime_str[7] != '-' or datetime_str[10] not in 'T ' \
+            or datetime_str[13] != ':' or datetime_str[16] != ':':
+        return None
+
+    if length == 19:
+        # Local times need the DST rules, leave those to the general parser
+        if default_to_local_time:
+            return None
+        offset = 0
+    elif length == 20 and datetime_str[19] == 'Z':
+        offset = 0
+    elif length == 25 and datetime_str[19] in '+-' and datetime_str[22] == ':':
+        if not (datetime_str[20:22] + datetime_str[23:25]).isdigit():
+            return None
+        offset = int(datetime_str[20:22]) * 60 + int(datetime_str[23:25])
+        if datetime_str[19] == '-':
+            offset = -offset
+    else:
+        return None
+
+    fields = (datetime_str[0:4], datetime_str[5:7], datetime_str[8:10],
+              datetime_str[11:13], datetime_str[14:16], datetime_str[17:19])
+    if not ''.join(fields).isdigit():
+        return None
+
+    try:
+        parsed = datetime.datetime(*[int(field) for field in fields])
+    except ValueError:
+        # Out of range fields (e.g. 24:00:00) are normalised by the general parser
+        return None
+
+    return parsed - datetime.timedelta(minutes=offset) if offset else parsed
+
+_date_date_re = re.compile(r'([\d-]+)T?')
+_date_time_re = re.compile(r'(?:T| )([\d:]+)')
+def _parse_date_general(datetime_str, default_to_local_time):
     date_search = _date_date_re.search(datetime_str)
     if date_search:
         if date_search.group(1).find('-') != -1:
@@ -53,7 +106,7 @@ def parse_date(datetime_str, default_to_local_time = True):
 
         return datetime.datetime.utcfromtimestamp(parsed_timestamp)
 
-    return ValueError
+    raise ValueError('Invalid date string: {0!r}'.format(datetime_str))
 
 _date_timezone_regex = re.compile(r'(\+|-)(\d\d):?(\d\d)')
 _zulu_time_regex     = re.compile(r'Z')
@@ -79,6 +132,18 @@ def _parse_time_zone(datetime_str, parsed_timestamp, default_to_local_time):
         else:
             return time.timezone
 
+def format_date(date):
+    """
+    Formats a datetime as an xs:dateTime with a UTC offset, the inverse of parse_date.
+    Naive datetimes are taken to be in UTC, as parse_date returns them.
+    """
+    offset = date.utcoffset()
+    if offset is None:
+        return date.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    minutes = (offset.days * 86400 + offset.seconds) // 60
+    sign = "-" if minutes < 0 else "+"
+    return date.strftime("%Y-%m-%dT%H:%M:%S") + "{0}{1:02d}:{2:02d}".format(sign, abs(minutes) // 60, abs(minutes) % 60)
+
 def parse_xs_duration(duration_str):
     """
     Parses a string representing a duration according to ISO 8601 and returns it's value in seconds
@@ -178,14 +243,21 @@ def local_datetime_to_utc(local_datetime):
     utc_timestamp = time.mktime(local_datetime.timetuple())
     return datetime.datetime.utcfromtimestamp(utc_timestamp)
 
+@lru_cache(maxsize=None)
+def _timezone(timezone_name):
+    """
+    Cached pytz.timezone, raises pytz.UnknownTimeZoneError for unknown names.
+    """
+    return pytz.timezone(timezone_name)
+
 def posix_to_local_datetime(posix_timestamp, timezone_name):
-    tz = pytz.timezone(timezone_name)
+    tz = _timezone(timezone_name)
     utc_datetime = datetime.datetime.utcfromtimestamp(posix_timestamp)
     utc_datetime = pytz.utc.localize(utc_datetime)
     return utc_datetime.astimezone(tz)
 
 def local_datetime_to_posix(local_datetime, timezone_name):
-    tz = pytz.timezone(timezone_name)
+    tz = _timezone(timezone_name)
     if local_datetime.tzinfo is None:
         local_datetime = tz.localize(local_datetime)
     utc_datetime = local_datetime.astimezone(pytz.utc)
@@ -197,11 +269,132 @@ def datetime_tz_offset(local_datetime, tz_name):
     :param local_datetime: Datetime object.
     :param timezone_name: tz name
     """
-    return pytz.timezone(tz_name).localize(local_datetime).strftime("%z")
+    return _timezone(tz_name).localize(local_datetime).strftime("%z")
+
+_epoch = datetime.datetime(1970, 1, 1)
+
+def _naive_to_posix(naive_datetime):
+    delta = naive_datetime - _epoch
+    return delta.days * 86400 + delta.seconds + delta.microseconds / 1000000.0
+
+class _TransitionTable(object):
+    """
+    A timezone's UTC offsets as sorted lists, so any number of conversions can be done
+    with a bisect each instead of going through pytz for every value.
+
+    The transitions are read from pytz's private attributes, raises AttributeError if a
+    version of pytz doesn't have them.
+    """
+    def __init__(self, tz):
+        self.tz = tz
+        if isinstance(tz, pytz.tzinfo.DstTzInfo):
+            self.times = [_naive_to_posix(t) for t in tz._utc_transition_times]
+            self.offsets = [info[0].days * 86400 + info[0].seconds for info in tz._transition_info]
+            self.tzinfos = [tz._tzinfos[info] for info in tz._transition_info]
+        else:
+            offset = tz.utcoffset(_epoch)
+            self.times = [float('-inf')]
+            self.offsets = [offset.days * 86400 + offset.seconds]
+            self.tzinfos = [tz]
+
+    def utc_index(self, posix_timestamp):
+        return max(bisect_right(self.times, posix_timestamp) - 1, 0)
+
+    def local_index(self, local_seconds):
+        """
+        Index of the transition a naive local time (as seconds since the epoch) falls in,
+        or None if it is ambiguous or doesn't exist.
+        """
+        found = None
+        last = len(self.times) - 1
+        # Offsets are under a day, so only transitions close to the same value read as UTC can match
+        index = self.utc_index(local_seconds)
+        for i in range(max(index - 2, 0), min(index + 3, last + 1)):
+            utc = local_seconds - self.offsets[i]
+            if utc >= self.times[i] and (i == last or utc < self.times[i + 1]):
+                if found is not None:
+                    return None
+                found = i
+        return found
+
+@lru_cache(maxsize=None)
+def _transition_table(timezone_name):
+    """
+    Returns the _TransitionTable of a timezone, or None if it can't be built from this version
+    of pytz, in which case the batch functions convert each value with localize/normalize.
+    """
+    try:
+        return _TransitionTable(_timezone(timezone_name))
+    except AttributeError:
+        return None
+
+def posix_to_local_datetimes(posix_timestamps, timezone_name):
+    """
+    Batch version of posix_to_local_datetime, converts a sequence of posix timestamps
+    to a list of aware datetimes in the timezone.
+    The timezone's transitions are looked up once and cached for later calls.
+    """
+    table = _transition_table(timezone_name)
+    if table is None:
+        return [posix_to_local_datetime(posix_timestamp, timezone_name) for posix_timestamp in posix_timestamps]
+    utcfromtimestamp = datetime.datetime.utcfromtimestamp
+    timedelta = datetime.timedelta
+
+    result = []
+    for posix_timestamp in posix_timestamps:
+        i = table.utc_index(posix_timestamp)
+        local = utcfromtimestamp(posix_timestamp) + timedelta(seconds=table.offsets[i])
+        result.append(local.replace(tzinfo=table.tzinfos[i]))
+    return result
+
+def local_datetimes_to_posix(local_datetimes, timezone_name):
+    """
+    Batch version of local_datetime_to_posix, converts a sequence of datetimes in the
+    timezone to a list of posix timestamps.
+    Aware datetimes, and local times which are ambiguous or skipped by a DST change,
+    are converted one at a time with pytz so they resolve exactly as local_datetime_to_posix does.
+    """
+    table = _transition_table(timezone_name)
+    if table is None:
+        return [local_datetime_to_posix(local_datetime, timezone_name) for local_datetime in local_datetimes]
+
+    result = []
+    for local_datetime in local_datetimes:
+        i = None
+        if local_datetime.tzinfo is None:
+            local_seconds = _naive_to_posix(local_datetime)
+            i = table.local_index(local_seconds)
+
+        if i is None:
+            result.append(local_datetime_to_posix(local_datetime, timezone_name))
+        else:
+            result.append(local_seconds - table.offsets[i])
+    return result
+
+def datetime_tz_offsets(local_datetimes, tz_name):
+    """
+    Batch version of datetime_tz_offset, returns the '+HHMM' offset of each naive datetime.
+    """
+    table = _transition_table(tz_name)
+    if table is None:
+        return [datetime_tz_offset(local_datetime, tz_name) for local_datetime in local_datetimes]
+
+    result = []
+    for local_datetime in local_datetimes:
+        i = table.local_index(_naive_to_posix(local_datetime))
+        if i is None:
+            result.append(datetime_tz_offset(local_datetime, tz_name))
+        elif table.offsets[i] % 60:
+            # Historical offsets with seconds in them, leave the formatting to strftime
+            result.append(local_datetime.replace(tzinfo=table.tzinfos[i]).strftime("%z"))
+        else:
+            minutes = abs(table.offsets[i]) // 60
+            result.append('{0}{1:02d}{2:02d}'.format('-' if table.offsets[i] < 0 else '+', minutes // 60, minutes % 60))
+    return result
 
 def get_timezone(timezone_name):
     try:
-        return pytz.timezone(timezone_name)
+        return _timezone(timezone_name)
     except pytz.UnknownTimeZoneError:
         return None
 
@@ -0,0 +1,126 @@
+"""
+Declarative extraction of child element values
+
+Each document type declares its fields once in a FieldMap. The qualified tag names are
+built once per namespace, and extracting visits the children of an element a single time
+instead of issuing a find() for every field.
+
+    asset_fields = FieldMap(
+        Field("Id", "id", convert=urn_uuid, required=True),
+        Field("Duration", "duration", convert=int),
+    )
+    asset_fields.extract(asset_element, cpl_ns, target=asset)
+"""
+
+class FieldError(ValueError):
+    """
+    Raised when a required field is missing or a field's text can't be converted.
+    """
+    pass
+
+class Field(object):
+    """
+    A child element whose value is extracted into an attribute.
+
+    :param tag: local name of the child element
+    :param name: name of the attribute (or dict key) to store the value in
+    :param convert: callable applied to the text of the element, if it is present
+    :param required: raise FieldError if the element is missing
+    :param element: store the element itself rather than its text
+    :param many: collect every matching child into a list, rather than only the first
+    :param namespace: namespace of the child, if it differs from the one passed to extract()
+    """
+    __slots__ = ('tag', 'name', 'convert', 'required', 'element', 'many', 'namespace')
+
+    def __init__(self, tag, name, convert=None, required=False, element=False, many=False, namespace=None):
+        self.tag = tag
+        self.name = name
+        self.convert = convert
+        self.required = required
+        self.element = element
+        self.many = many
+        self.namespace = namespace
+
+    def qname(self, namespace):
+        namespace = self.namespace if self.namespace is not None else namespace
+        return "{" + namespace + "}" + self.tag if namespace else self.tag
+
+class FieldMap(object):
+    """
+    A set of fields extracted together from the children of one element.
+    """
+    def __init__(self, *fields):
+        self.fields = fields
+        self._lookups = {}
+
+    def extend(self, *fields):
+        """
+        Returns a new FieldMap with these fields added, for document types which extend another.
+        """
+        return FieldMap(*(self.fields + fields))
+
+    def _lookup(self, namespace):
+        try:
+            return self._lookups[namespace]
+        except KeyError:
+            lookup = dict((field.qname(namespace), field) for field in self.fields)
+            self._lookups[namespace] = lookup
+            return lookup
+
+    def extract(self, element, namespace, target=None):
+        """
+        Extracts the fields from the direct children of element.
+
+        Text values behave like findtext(): a missing element gives None and an empty one ''.
+        Returns a dict of the values keyed by field name, and sets them as attributes on
+        target if one is given.
+        """
+        lookup = self._lookup(namespace)
+
+        found = {}
+        for child in element:
+            field = lookup.get(child.tag)
+            if field is None:
+                continue
+            value = child if field.element else (child.text or '')
+            if field.many:
+                found.setdefault(field.name, []).append(value)
+            elif field.name not in found:
+                found[field.name] = value
+
+        values = {}
+        for field in self.fields:
+            value = found.get(field.name)
+            if value is None:
+                if field.required:
+                    raise FieldError("Missing required element: {0}".format(field.tag))
+                value = [] if field.many else None
+            elif field.convert is not None:
+                try:
+                    value = [field.convert(v) for v in value] if field.many else field.convert(value)
+                except (ValueError, TypeError, IndexError) as e:
+                    raise FieldError("Invalid {0} {1!r}: {2}".format(field.tag, value, e))
+            values[field.name] = value
+
+        if target is not None:
+            for name, value in values.items():
+                setattr(target, name, value)
+        return values
+
+def urn_uuid(urn):
+    """
+    Returns the UUID from a 'urn:uuid:<uuid>' string, raising IndexError if it isn't one.
+    """
+    return urn.split(":")[2]
+
+def int_tuple(text):
+    """
+    Converts a space separated list of integers, e.g. an edit rate '24 1', to a tuple.
+    """
+    return tuple([int(x) for x in text.split()])
+
+def float_tuple(text):
+    """
+    Converts a space separated list of numbers to a tuple of floats.
+    """
+    return tuple([float(x) for x in text.split()])
@@ -0,0 +1,67 @@
+"""
+Filesystem utilities
+"""
+import os, stat
+
+try:
+    from os import scandir
+except ImportError:
+    # Python 2, use the scandir package if it's installed
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+class DirectoryListing(object):
+    """
+    Checks many files for existence and size, reading each directory once. Paths which
+    aren't in the listing exactly as given are checked with stat.
+
+        listing = DirectoryListing()
+        for path in paths:
+            size = listing.size(path)   # None if it isn't a file
+    """
+    def __init__(self):
+        self._dirs = {}
+
+    def _entries(self, directory):
+        try:
+            return self._dirs[directory]
+        except KeyError:
+            pass
+
+        try:
+            if scandir is not None:
+                entries = dict((entry.name, entry) for entry in scandir(directory))
+            else:
+                entries = dict.fromkeys(os.listdir(directory))
+        except OSError:
+            # Doesn't exist or isn't a directory
+            entries = {}
+        self._dirs[directory] = entries
+        return entries
+
+    def size(self, path):
+        """
+        Returns the size in bytes of a regular file, or None if there's no file at the path.
+        """
+        directory, name = os.path.split(os.path.normpath(path))
+        # A bare file name is in the current directory
+        entries = self._entries(directory or os.curdir)
+
+        entry = entries.get(name)
+        try:
+            if entry is not None:
+                # is_file() is usually answered from the listing, so other entries are skipped
+                # without a stat. The size still needs one, except on Windows
+                if not entry.is_file():
+                    return None
+                return entry.stat().st_size
+            # Not listed under this exact name, but it may be on a case-insensitive filesystem
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+    def exists(self, path):
+        return self.size(path) is not None
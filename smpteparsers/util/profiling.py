@@ -0,0 +1,204 @@
+"""
+Timing and counting hooks for the parsers
+
+The parsers wrap their stages (reading, validating, parsing, building objects) in named
+spans and count what they process. Nothing is measured until a sink is added, and with no
+sinks a span is a shared no-op object, so the hooks cost a function call each.
+
+    from smpteparsers.util import profiling
+
+    stats = profiling.Aggregator()
+    profiling.add_sink(stats)
+    CPL(path)
+    print(stats.report())
+
+Span names are dotted, e.g. "cpl.parse" or "flmx.fetch", and counter names likewise,
+e.g. "xml.bytes" or "cpl.reels".
+"""
+import logging, socket, threading
+
+try:
+    # Durations are timed on a clock which doesn't jump when the system time is changed
+    from time import monotonic as clock
+except ImportError:
+    # Python 2 has no monotonic clock, use the most precise timer it has
+    from timeit import default_timer as clock
+
+_sinks = []
+
+def add_sink(sink):
+    """
+    Starts sending timings and counts to a sink. A sink is any object with
+    timing(name, seconds) and count(name, value) methods.
+    """
+    global _sinks
+    # Replace rather than mutate the list, so it's safe to iterate without a lock
+    _sinks = _sinks + [sink]
+
+def remove_sink(sink):
+    global _sinks
+    _sinks = [s for s in _sinks if s is not sink]
+
+def clear_sinks():
+    global _sinks
+    _sinks = []
+
+def enabled():
+    """
+    Whether any sinks are registered, for skipping work that's only needed to report a count.
+    """
+    return bool(_sinks)
+
+class _NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_null_span = _NullSpan()
+
+class Span(object):
+    """
+    Times the block it wraps and reports it to every sink when the block exits.
+    """
+    __slots__ = ('name', 'sinks', 'start')
+
+    def __init__(self, name, sinks):
+        self.name = name
+        self.sinks = sinks
+
+    def __enter__(self):
+        self.start = clock()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = clock() - self.start
+        for sink in self.sinks:
+            sink.timing(self.name, seconds)
+        return False
+
+def span(name):
+    """
+    Returns a context manager timing a named stage.
+    """
+    sinks = _sinks
+    if not sinks:
+        return _null_span
+    return Span(name, sinks)
+
+def count(name, value=1):
+    """
+    Adds value to a named counter.
+    """
+    for sink in _sinks:
+        sink.count(name, value)
+
+class LoggingSink(object):
+    """
+    Logs every timing and count.
+    """
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def timing(self, name, seconds):
+        self.logger.log(self.level, "%s took %.3fms", name, seconds * 1000)
+
+    def count(self, name, value):
+        self.logger.log(self.level, "%s += %s", name, value)
+
+class Stat(object):
+    """
+    Summary of the timings for one span name.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+class Aggregator(object):
+    """
+    Collects timings and counts in memory.
+
+    :ivar timings: dict of Stat objects keyed by span name
+    :ivar counters: dict of counter totals keyed by counter name
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+
+    def timing(self, name, seconds):
+        with self.lock:
+            stat = self.timings.get(name)
+            if stat is None:
+                stat = self.timings[name] = Stat()
+            stat.add(seconds)
+
+    def count(self, name, value):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        with self.lock:
+            self.timings = {}
+            self.counters = {}
+
+    def report(self):
+        """
+        Returns the collected timings and counts as a table.
+        """
+        with self.lock:
+            lines = ["{0:<24} {1:>8} {2:>12} {3:>12} {4:>12}".format("span", "count", "total ms", "mean ms", "max ms")]
+            for name in sorted(self.timings):
+                stat = self.timings[name]
+                lines.append("{0:<24} {1:>8} {2:>12.3f} {3:>12.3f} {4:>12.3f}".format(
+                    name, stat.count, stat.total * 1000, stat.mean * 1000, stat.max * 1000))
+            for name in sorted(self.counters):
+                lines.append("{0:<24} {1:>8}".format(name, self.counters[name]))
+        return "\n".join(lines)
+
+class StatsdSink(object):
+    """
+    Writes timings and counts as StatsD lines, e.g. "smpteparsers.cpl.parse:1.234|ms".
+
+    :param send: callable taking each line as a string, e.g. to write it to a file or socket.
+        Use StatsdSink.udp() to send to a StatsD server.
+    :param prefix: prepended to every name, followed by a dot.
+    """
+    def __init__(self, send, prefix="smpteparsers"):
+        self.send = send
+        self.prefix = prefix + "." if prefix else ""
+
+    @classmethod
+    def udp(cls, host="localhost", port=8125, prefix="smpteparsers"):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        address = (host, port)
+        def send(line):
+            try:
+                sock.sendto(line.encode("utf-8"), address)
+            except socket.error:
+                # Metrics are best effort, never fail a parse because of them
+                pass
+        return cls(send, prefix=prefix)
+
+    def timing(self, name, seconds):
+        self.send("{0}{1}:{2:.3f}|ms".format(self.prefix, name, seconds * 1000))
+
+    def count(self, name, value):
+        self.send("{0}{1}:{2}|c".format(self.prefix, name, value))
@@ -0,0 +1,47 @@
+"""
+SQLite utilities, shared by the stores which keep their state in a database file
+"""
+import sqlite3
+from contextlib import contextmanager
+
+def connect(path, timeout=30.0):
+    """
+    Opens a connection in autocommit mode, transactions are opened explicitly where they're needed.
+
+    :param timeout: seconds to wait for a lock held by another process
+    """
+    return sqlite3.connect(path, timeout=timeout, isolation_level=None)
+
+@contextmanager
+def connection(path, timeout=30.0):
+    """
+    Context manager for a connection from connect, closed at the end of the block.
+
+        with connection(path) as conn:
+            rows = conn.execute("SELECT ...").fetchall()
+    """
+    conn = connect(path, timeout)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+@contextmanager
+def transaction(path, timeout=30.0):
+    """
+    Context manager for a connection in a write transaction, committed at the end of the block or
+    rolled back if it raises. The write lock is taken up front, so a read-modify-write in the
+    block is atomic across processes.
+
+        with transaction(path) as conn:
+            row = conn.execute("SELECT ...").fetchone()
+            conn.execute("INSERT OR REPLACE ...")
+    """
+    with connection(path, timeout) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
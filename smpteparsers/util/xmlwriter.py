@@ -0,0 +1,58 @@
+"""
+Streaming XML output
+"""
+from xml.sax.saxutils import XMLGenerator
+from xml.sax.xmlreader import AttributesImpl
+
+class XMLWriter(object):
+    """
+    Writes an XML document an element at a time, so large documents are never held in memory.
+
+        writer = XMLWriter(f)
+        writer.start("AssetList", {"xmlns": namespace})
+        writer.element("Id", "urn:uuid:" + asset_id)
+        writer.end("AssetList")
+        writer.close()
+
+    :param out: binary file object to write to
+    :param encoding:
+    :param indent: indentation of each level of elements, or None to write no whitespace
+    """
+    def __init__(self, out, encoding="utf-8", indent="  "):
+        self.generator = XMLGenerator(out, encoding)
+        self.indent = indent
+        self.depth = 0
+        self.generator.startDocument()
+
+    def _newline(self):
+        if self.indent is not None:
+            self.generator.ignorableWhitespace("\n" + self.indent * self.depth)
+
+    def start(self, tag, attrs=None):
+        if self.depth:
+            # The XML declaration already ends with a newline
+            self._newline()
+        self.generator.startElement(tag, AttributesImpl(attrs or {}))
+        self.depth += 1
+
+    def end(self, tag):
+        self.depth -= 1
+        self._newline()
+        self.generator.endElement(tag)
+
+    def element(self, tag, text, attrs=None):
+        """
+        Writes an element holding only text.
+        """
+        self._newline()
+        self.generator.startElement(tag, AttributesImpl(attrs or {}))
+        self.generator.characters(text)
+        self.generator.endElement(tag)
+
+    def close(self):
+        """
+        Ends the document and flushes it to the file, which is left open.
+        """
+        if self.indent is not None:
+            self.generator.ignorableWhitespace("\n")
+        self.generator.endDocument()
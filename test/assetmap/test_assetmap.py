@@ -30,8 +30,17 @@ am_paths = {
 
 class TestAssetmap(unittest.TestCase):
     def test_success(self):
-        am = Assetmap(am_paths["success"])
+        self.assert_success(Assetmap(am_paths["success"]))
 
+    def test_success_sources(self):
+        with open(am_paths["success"], 'rb') as f:
+            self.assert_success(Assetmap(f))
+        with open(am_paths["success"], 'rb') as f:
+            xml = f.read()
+        self.assert_success(Assetmap(xml))
+        self.assert_success(Assetmap(memoryview(xml)))
+
+    def assert_success(self, am):
         self.assertEqual(am.id, "aea7e1f1-aa1b-4467-9002-2ff11e0f3669")
         self.assertEqual(am.annotation_text, "TMS ASSETMAP - aea7e1f1-aa1b-4467-9002-2ff11e0f3669")
         self.assertEqual(am.volume_count, 1)
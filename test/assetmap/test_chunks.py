@@ -0,0 +1,114 @@
+import unittest, hashlib, base64, io, os, shutil, tempfile
+from smpteparsers.assetmap import Assetmap, AssetmapError, AssetData
+from smpteparsers.assetmap.chunks import ChunkedAssetReader
+from smpteparsers.pkl import generate_hash
+
+ASSETMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<AssetMap xmlns="http://www.digicine.com/PROTO-ASDCP-AM-20040311#">
+    <Id>urn:uuid:aea7e1f1-aa1b-4467-9002-2ff11e0f3669</Id>
+    <VolumeCount>2</VolumeCount>
+    <IssueDate>2013-05-28T10:47:08-00:00</IssueDate>
+    <Issuer>Arts Alliance Media</Issuer>
+    <Creator>TMS</Creator>
+    <AssetList>
+        <Asset>
+            <Id>urn:uuid:7ec59b28-8ef4-4963-88e8-9d0a08763b4a</Id>
+            <ChunkList>
+                <Chunk>
+                    <Path>picture.mxf.2</Path>
+                    <VolumeIndex>2</VolumeIndex>
+                    <Offset>1000</Offset>
+                    <Length>500</Length>
+                </Chunk>
+                <Chunk>
+                    <Path>picture.mxf.1</Path>
+                    <VolumeIndex>1</VolumeIndex>
+                    <Offset>0</Offset>
+                    <Length>1000</Length>
+                </Chunk>
+            </ChunkList>
+        </Asset>
+        <Asset>
+            <Id>urn:uuid:01658edd-edfb-4c52-beec-1f5b9616e813</Id>
+            <ChunkList>
+                <Chunk>
+                    <Path>cpl.xml</Path>
+                </Chunk>
+            </ChunkList>
+        </Asset>
+    </AssetList>
+</AssetMap>
+"""
+
+PICTURE = "7ec59b28-8ef4-4963-88e8-9d0a08763b4a"
+CPL = "01658edd-edfb-4c52-beec-1f5b9616e813"
+
+class TestChunks(unittest.TestCase):
+    def setUp(self):
+        self.volumes = {1: tempfile.mkdtemp(), 2: tempfile.mkdtemp()}
+        self.contents = bytes(bytearray(i % 251 for i in range(1500)))
+        for volume, path, contents in [(1, "picture.mxf.1", self.contents[:1000]),
+                                       (2, "picture.mxf.2", self.contents[1000:]),
+                                       (1, "cpl.xml", b"<CompositionPlaylist/>")]:
+            with open(os.path.join(self.volumes[volume], path), 'wb') as f:
+                f.write(contents)
+        self.assetmap = Assetmap(ASSETMAP)
+
+    def tearDown(self):
+        for path in self.volumes.values():
+            shutil.rmtree(path)
+
+    def open(self, asset_id=PICTURE):
+        return self.assetmap.open(asset_id, self.volumes[1], self.volumes)
+
+    def test_parse(self):
+        self.assertTrue(self.assetmap.is_chunked(PICTURE))
+        self.assertFalse(self.assetmap.is_chunked(CPL))
+        self.assertEqual([chunk.path for chunk in self.assetmap.chunks[PICTURE]], ["picture.mxf.1", "picture.mxf.2"])
+        self.assertEqual(self.assetmap[PICTURE].path, "picture.mxf.1")
+
+    def test_read(self):
+        with self.open() as f:
+            self.assertEqual(f.size, 1500)
+            self.assertEqual(f.read(), self.contents)
+            self.assertEqual(f.read(10), b"")
+
+    def test_read_across_chunks(self):
+        with self.open() as f:
+            f.seek(990)
+            self.assertEqual(f.read(20), self.contents[990:1010])
+            self.assertEqual(f.tell(), 1010)
+            f.seek(-5, os.SEEK_END)
+            self.assertEqual(f.read(), self.contents[-5:])
+            f.seek(10)
+            f.seek(5, os.SEEK_CUR)
+            self.assertEqual(f.read(3), self.contents[15:18])
+
+    def test_readinto(self):
+        buf = bytearray(1200)
+        with self.open() as f:
+            self.assertEqual(f.readinto(buf), 1200)
+            self.assertEqual(bytes(buf), self.contents[:1200])
+            self.assertEqual(f.readinto(buf), 300)
+        with io.BufferedReader(self.open(), 256) as f:
+            self.assertEqual(f.read(), self.contents)
+
+    def test_hash(self):
+        with self.open() as f:
+            self.assertEqual(generate_hash(f, chunk_size=64), base64.b64encode(hashlib.sha1(self.contents).digest()))
+
+    def test_length_from_file(self):
+        with self.open(CPL) as f:
+            self.assertEqual(f.read(), b"<CompositionPlaylist/>")
+
+    def test_gap(self):
+        chunks = [AssetData("picture.mxf.1", 1, 0, 1000), AssetData("picture.mxf.2", 1, 1200, 300)]
+        self.assertRaises(AssetmapError, ChunkedAssetReader, chunks, self.volumes[1])
+
+    def test_short_chunk(self):
+        chunks = [AssetData("picture.mxf.1", 1, 0, 1200)]
+        with ChunkedAssetReader(chunks, self.volumes[1]) as f:
+            self.assertRaises(AssetmapError, f.read)
+
+if __name__ == '__main__':
+    unittest.main()
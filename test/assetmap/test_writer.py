@@ -0,0 +1,37 @@
+import unittest, datetime, io
+from smpteparsers.assetmap import Assetmap, AssetData
+from smpteparsers.assetmap.writer import AssetmapWriter, write_assetmap, INTEROP_NS
+
+class TestAssetmapWriter(unittest.TestCase):
+    def test_round_trip(self):
+        assets = [("6e7d8f02-2a0c-4a4e-8d5b-7a3c2b1f9e01", AssetData("cpl.xml", 1, 0, 8075)),
+                  ("0b8c5d9e-3f1a-4b7c-9e2d-1c4a6f8b3d02", AssetData("reel/picture.mxf", 1, 0, 1335588317))]
+        out = io.BytesIO()
+        assetmap_id = write_assetmap(out, assets, issue_date=datetime.datetime(2013, 5, 1, 12, 30),
+                                     annotation_text=u"Caf\xe9 & Bar", namespace=INTEROP_NS)
+
+        # Validated against the Interop schema as it's parsed
+        assetmap = Assetmap(out.getvalue())
+        self.assertEqual(assetmap.id, assetmap_id)
+        self.assertEqual(assetmap.annotation_text, u"Caf\xe9 & Bar")
+        self.assertEqual(assetmap.volume_count, 1)
+        self.assertEqual(assetmap.issue_date.year, 2013)
+        self.assertEqual(set(assetmap.assets), set(asset_id for asset_id, _ in assets))
+        picture = assetmap["0b8c5d9e-3f1a-4b7c-9e2d-1c4a6f8b3d02"]
+        self.assertEqual(picture.path, "reel/picture.mxf")
+        self.assertEqual(picture.length, 1335588317)
+
+    def test_packing_list(self):
+        out = io.BytesIO()
+        writer = AssetmapWriter(out, "6e7d8f02-2a0c-4a4e-8d5b-7a3c2b1f9e01")
+        writer.add("0b8c5d9e-3f1a-4b7c-9e2d-1c4a6f8b3d02", AssetData("pkl.xml", None, None, None), packing_list=True)
+        writer.close()
+
+        xml = out.getvalue()
+        self.assertEqual(writer.count, 1)
+        self.assertTrue(b'xmlns="http://www.smpte-ra.org/schemas/429-9/2007/AM"' in xml)
+        self.assertTrue(b"<PackingList>true</PackingList>" in xml)
+        self.assertFalse(b"<Offset>" in xml)
+
+if __name__ == '__main__':
+    unittest.main()
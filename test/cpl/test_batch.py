@@ -0,0 +1,50 @@
+import unittest, os
+from datetime import datetime
+from smpteparsers.cpl.batch import parse_cpls
+
+base_data_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'interop')
+success_path = os.path.join(base_data_path, 'success.xml')
+no_id_path = os.path.join(base_data_path, 'id', 'no_id.xml')
+
+class TestParseCPLs(unittest.TestCase):
+
+    def setUp(self):
+        with open(success_path, 'rb') as f:
+            self.success_xml = f.read()
+        self.sources = [success_path, no_id_path, self.success_xml, b'<CompositionPlaylist>']
+
+    def check_results(self, results):
+        self.assertEqual([r.index for r in results], [0, 1, 2, 3])
+
+        success = results[0]
+        self.assertEqual(success.path, success_path)
+        self.assertEqual(success.id, "649a5ca6-95d9-4dab-ad21-7636a636ca54")
+        self.assertEqual(success.issue_date, datetime(2013, 2, 19, 15, 57, 55))
+        self.assertEqual(success.reels, 1)
+        self.assertEqual(success.duration_in_frames, 500)
+        self.assertEqual(success.edit_rate, (24, 1))
+        self.assertEqual(success.valid, True)
+        self.assertEqual(success.error, None)
+
+        self.assertEqual(results[1].path, no_id_path)
+        self.assertEqual(results[1].valid, False)
+        self.assertTrue(results[1].error)
+
+        self.assertEqual(results[2].path, None)
+        self.assertEqual(results[2].id, success.id)
+
+        self.assertTrue(results[3].error)
+
+    def test_in_process(self):
+        self.check_results(list(parse_cpls(self.sources, processes=1)))
+
+    def test_pool(self):
+        self.check_results(list(parse_cpls(self.sources, processes=2, chunksize=1)))
+
+    def test_without_validation(self):
+        results = list(parse_cpls([memoryview(self.success_xml)], processes=1, validate=False))
+        self.assertEqual(results[0].valid, None)
+        self.assertEqual(results[0].reels, 1)
+
+if __name__ == '__main__':
+    unittest.main()
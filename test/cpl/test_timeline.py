@@ -0,0 +1,91 @@
+import unittest
+from smpteparsers.cpl import CPL
+
+CPL_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<CompositionPlaylist xmlns="http://www.digicine.com/PROTO-ASDCP-CPL-20040511#">
+  <Id>urn:uuid:649a5ca6-95d9-4dab-ad21-7636a636ca54</Id>
+  <IssueDate>2013-02-19T15:57:55+00:00</IssueDate>
+  <ContentTitleText>Timeline</ContentTitleText>
+  <ReelList>{reels}</ReelList>
+</CompositionPlaylist>
+"""
+
+REEL_XML = """
+    <Reel>
+      <Id>urn:uuid:00000000-0000-0000-0000-00000000000{n}</Id>
+      <AssetList>
+        <MainPicture>
+          <Id>urn:uuid:10000000-0000-0000-0000-00000000000{n}</Id>
+          <EditRate>24 1</EditRate>
+          <IntrinsicDuration>{intrinsic}</IntrinsicDuration>
+          <EntryPoint>{entry}</EntryPoint>
+          {duration}
+          <FrameRate>24 1</FrameRate>
+          <ScreenAspectRatio>1998 1080</ScreenAspectRatio>
+        </MainPicture>
+      </AssetList>
+    </Reel>"""
+
+def make_cpl(*reels):
+    xml = CPL_XML.format(reels="".join(
+        REEL_XML.format(n=n, intrinsic=intrinsic, entry=entry,
+                        duration="" if duration is None else "<Duration>{0}</Duration>".format(duration))
+        for n, (intrinsic, entry, duration) in enumerate(reels)
+    ))
+    cpl = CPL()
+    cpl.fromstring(xml.encode("utf-8"))
+    return cpl
+
+class TestTimeline(unittest.TestCase):
+
+    def setUp(self):
+        # Reels of 100, 50 and (without a Duration) 60 frames
+        self.cpl = make_cpl((100, 0, 100), (80, 10, 50), (80, 20, None))
+        self.timeline = self.cpl.timeline
+
+    def test_starts(self):
+        self.assertEqual(list(self.timeline.starts), [0, 100, 150])
+        self.assertEqual(self.cpl.duration_in_frames, 210)
+        self.assertEqual(len(self.timeline), 210)
+        self.assertEqual(self.cpl.edit_rate, (24, 1))
+
+    def test_locate(self):
+        position = self.timeline.locate(0)
+        self.assertEqual((position.index, position.offset, position.asset_frame), (0, 0, 0))
+        self.assertTrue(position.reel is self.cpl.reels[0])
+        self.assertTrue(position.asset is self.cpl.reels[0].picture)
+
+        position = self.timeline.locate(99)
+        self.assertEqual((position.index, position.offset, position.asset_frame), (0, 99, 99))
+
+        position = self.timeline.locate(100)
+        self.assertEqual((position.index, position.offset, position.asset_frame), (1, 0, 10))
+
+        position = self.timeline.locate(209)
+        self.assertEqual((position.index, position.offset, position.asset_frame), (2, 59, 79))
+
+    def test_out_of_range(self):
+        self.assertRaises(IndexError, self.timeline.locate, -1)
+        self.assertRaises(IndexError, self.timeline.locate, 210)
+
+    def test_timecode(self):
+        self.assertEqual(self.timeline.timecode(0), "00:00:00:00")
+        self.assertEqual(self.timeline.timecode(100), "00:00:04:04")
+        self.assertEqual(self.timeline.timecode(24 * 3661 + 5), "01:01:01:05")
+        self.assertEqual(self.timeline.frame("01:01:01:05"), 24 * 3661 + 5)
+        self.assertEqual(self.timeline.locate_timecode("00:00:06:06").index, 2)
+        self.assertEqual(self.timeline.seconds(48), 2.0)
+
+    def test_invalid_timecode(self):
+        self.assertRaises(ValueError, self.timeline.frame, "00:00:01")
+        self.assertRaises(ValueError, self.timeline.frame, "00:00:01:24")
+        self.assertRaises(ValueError, self.timeline.frame, "00:60:00:00")
+        self.assertRaises(ValueError, self.timeline.timecode, -1)
+
+    def test_rebuilt_after_parse(self):
+        self.cpl.fromstring(CPL_XML.format(reels=REEL_XML.format(n=9, intrinsic=10, entry=0, duration="")).encode("utf-8"))
+        self.assertEqual(len(self.cpl.reels), 1)
+        self.assertEqual(self.cpl.duration_in_frames, 10)
+
+if __name__ == '__main__':
+    unittest.main()
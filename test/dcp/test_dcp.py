@@ -0,0 +1,21 @@
+import unittest
+from smpteparsers.dcp import DCP
+from smpteparsers.library.index import AssetIndex
+
+class TestDCP(unittest.TestCase):
+    def make_dcp(self, asset_index=None):
+        # Without parsing, the package's documents aren't needed
+        dcp = DCP.__new__(DCP)
+        dcp.path = "/dcp"
+        dcp.asset_index = asset_index
+        dcp.cpls = {}
+        return dcp
+
+    def test_dependencies_without_index(self):
+        self.assertRaises(ValueError, self.make_dcp().dependencies)
+
+    def test_dependencies(self):
+        self.assertEqual(self.make_dcp(AssetIndex()).dependencies(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.assetmap import AssetData, Assetmap, AssetmapValidationError
+from smpteparsers.pkl import PKLData, PKLValidationError, generate_hash
+from smpteparsers.dcp.verify import verify_dcp, check_files, MISSING, SIZE, HASH
+from smpteparsers.util.files import DirectoryListing
+
+class TestVerify(unittest.TestCase):
+    def setUp(self):
+        self.dcp_path = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.dcp_path, "reel"))
+
+        self.assets = {}
+        self.pkl_assets = {}
+        for asset_id, path, contents in [
+                ("cpl", "cpl.xml", b"<CompositionPlaylist/>"),
+                ("picture", os.path.join("reel", "picture.mxf"), b"p" * 1000),
+                ("sound", os.path.join("reel", "sound.mxf"), b"s" * 500)]:
+            full_path = os.path.join(self.dcp_path, path)
+            with open(full_path, 'wb') as f:
+                f.write(contents)
+            self.assets[asset_id] = AssetData(path, 1, 0, len(contents))
+            self.pkl_assets[asset_id] = PKLData(generate_hash(full_path).decode("ascii"), str(len(contents)), "application/mxf")
+
+        self.hashed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.dcp_path)
+
+    def hash_func(self, path):
+        # Chunked assets are hashed from a file object of their chunks
+        name = path.paths[0] if hasattr(path, 'read') else path
+        self.hashed.append(os.path.basename(name))
+        return generate_hash(path)
+
+    def chunk_picture(self):
+        """
+        Splits the picture into two chunk files, as a chunked ASSETMAP lists them.
+        """
+        full_path = os.path.join(self.dcp_path, "reel", "picture.mxf")
+        with open(full_path, 'rb') as f:
+            contents = f.read()
+        os.remove(full_path)
+        chunks = []
+        for index, (offset, length) in enumerate([(0, 600), (600, 400)]):
+            path = os.path.join("reel", "picture.mxf.{0}".format(index + 1))
+            with open(os.path.join(self.dcp_path, path), 'wb') as f:
+                f.write(contents[offset:offset + length])
+            chunks.append(AssetData(path, 1, offset, length))
+        self.assets["picture"] = chunks
+
+    def verify(self, **kwargs):
+        return verify_dcp(self.dcp_path, self.assets, self.pkl_assets, hash_func=self.hash_func, **kwargs)
+
+    def test_success(self):
+        report = self.verify()
+        self.assertTrue(report.ok)
+        self.assertEqual(report.checked, 3)
+        self.assertEqual(report.hashed, 3)
+        self.assertEqual(report.bytes_hashed, 1522)
+        # Smallest first
+        self.assertEqual(self.hashed, ["cpl.xml", "sound.mxf", "picture.mxf"])
+
+    def test_missing(self):
+        os.remove(os.path.join(self.dcp_path, "reel", "sound.mxf"))
+        report = self.verify()
+        self.assertEqual([(i.asset_id, i.kind) for i in report.issues], [("sound", MISSING)])
+        self.assertTrue(report.hashes_skipped)
+        self.assertEqual(self.hashed, [])
+
+    def test_not_in_assetmap(self):
+        del self.assets["cpl"]
+        issues, found = check_files(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertEqual([(i.asset_id, i.kind, i.path) for i in issues], [("cpl", MISSING, None)])
+        self.assertEqual(sorted(found), ["picture", "sound"])
+
+    def test_truncated(self):
+        with open(os.path.join(self.dcp_path, "reel", "picture.mxf"), 'wb') as f:
+            f.write(b"p" * 10)
+        report = self.verify()
+        self.assertEqual([(i.asset_id, i.kind, i.expected, i.actual) for i in report.issues], [("picture", SIZE, 1000, 10)])
+        self.assertEqual(self.hashed, [])
+
+        # Without fail_fast the other files are still hashed
+        report = self.verify(fail_fast=False)
+        self.assertEqual(report.hashed, 2)
+
+    def test_hash(self):
+        for name in ("cpl.xml", os.path.join("reel", "sound.mxf")):
+            with open(os.path.join(self.dcp_path, name), 'r+b') as f:
+                f.write(b"x")
+        report = self.verify()
+        self.assertEqual([(i.asset_id, i.kind) for i in report.issues], [("cpl", HASH)])
+        self.assertEqual(self.hashed, ["cpl.xml"])
+
+        self.hashed = []
+        report = self.verify(fail_fast=False)
+        self.assertEqual([i.asset_id for i in report.issues], ["cpl", "sound"])
+        self.assertEqual(report.hashed, 3)
+
+    def test_without_hashes(self):
+        report = self.verify(hashes=False, skip_mxf=True)
+        self.assertTrue(report.ok)
+        self.assertEqual(self.hashed, [])
+
+    def test_skip_mxf(self):
+        report = self.verify(skip_mxf=True)
+        self.assertEqual(self.hashed, ["cpl.xml"])
+
+    def test_chunked(self):
+        self.chunk_picture()
+        report = self.verify()
+        self.assertTrue(report.ok)
+        self.assertEqual(report.bytes_hashed, 1522)
+        self.assertEqual(self.hashed, ["cpl.xml", "sound.mxf", "picture.mxf.1"])
+
+        issues, found = check_files(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertEqual(found["picture"], (os.path.join(self.dcp_path, "reel", "picture.mxf.1"), 1000))
+
+    def test_chunked_changed(self):
+        self.chunk_picture()
+        with open(os.path.join(self.dcp_path, "reel", "picture.mxf.2"), 'r+b') as f:
+            f.write(b"x")
+        report = self.verify()
+        self.assertEqual([(i.asset_id, i.kind) for i in report.issues], [("picture", HASH)])
+
+    def test_chunked_missing(self):
+        self.chunk_picture()
+        chunk_path = os.path.join(self.dcp_path, "reel", "picture.mxf.2")
+        with open(chunk_path, 'r+b') as f:
+            f.truncate(100)
+        report = self.verify()
+        self.assertEqual([(i.asset_id, i.path, i.kind, i.expected, i.actual) for i in report.issues],
+                         [("picture", chunk_path, SIZE, 400, 100)])
+
+        os.remove(chunk_path)
+        report = self.verify()
+        self.assertEqual([(i.asset_id, i.path, i.kind) for i in report.issues], [("picture", chunk_path, MISSING)])
+
+    def test_directory_listing(self):
+        listing = DirectoryListing()
+        self.assertEqual(listing.size(os.path.join(self.dcp_path, "reel", "sound.mxf")), 500)
+        self.assertEqual(listing.size(os.path.join(self.dcp_path, "reel")), None)
+        self.assertEqual(listing.size(os.path.join(self.dcp_path, "nothing", "sound.mxf")), None)
+        self.assertFalse(listing.exists(os.path.join(self.dcp_path, "reel", "other.mxf")))
+
+    def test_validate_files(self):
+        assetmap = Assetmap(None, parse=False)
+        assetmap.assets = self.assets
+        assetmap.validate_files(self.dcp_path)
+
+        os.remove(os.path.join(self.dcp_path, "cpl.xml"))
+        self.assertRaises(AssetmapValidationError, assetmap.validate_files, self.dcp_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.assetmap import Assetmap
+from smpteparsers.pkl import PKL
+from smpteparsers.dcp.writer import write_package
+
+class TestWritePackage(unittest.TestCase):
+    def setUp(self):
+        self.dcp_path = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.dcp_path, "reel"))
+        self.files = []
+        for asset_id, path, contents, file_type in [
+                ("01658edd-edfb-4c52-beec-1f5b9616e813", "cpl.xml", b"<CompositionPlaylist/>", "text/xml;asdcpKind=CPL"),
+                ("7ec59b28-8ef4-4963-88e8-9d0a08763b4a", "reel/picture.mxf", b"p" * 1000, "application/mxf")]:
+            with open(os.path.join(self.dcp_path, path), 'wb') as f:
+                f.write(contents)
+            self.files.append((asset_id, path, file_type))
+
+    def tearDown(self):
+        shutil.rmtree(self.dcp_path)
+
+    def test_interop(self):
+        pkl_id, assetmap_id = write_package(self.dcp_path, self.files, smpte=False)
+
+        assetmap = Assetmap(os.path.join(self.dcp_path, "ASSETMAP"))
+        self.assertEqual(assetmap.id, assetmap_id)
+        self.assertEqual(set(assetmap.assets), set([pkl_id] + [f[0] for f in self.files]))
+        self.assertEqual(assetmap[pkl_id].path, "PKL_{0}.xml".format(pkl_id))
+
+        pkl = PKL(os.path.join(self.dcp_path, assetmap[pkl_id].path))
+        self.assertEqual(pkl.id, pkl_id)
+        self.assertEqual(set(pkl.assets), set(f[0] for f in self.files))
+        self.assertEqual(sorted(os.listdir(self.dcp_path)), sorted(["ASSETMAP", "PKL_{0}.xml".format(pkl_id), "cpl.xml", "reel"]))
+
+        # Both documents describe the files as they are on disk
+        pkl.validate_hashes(self.dcp_path, assetmap.assets)
+
+    def test_failure_leaves_existing_assetmap(self):
+        assetmap_path = os.path.join(self.dcp_path, "ASSETMAP.xml")
+        with open(assetmap_path, 'wb') as f:
+            f.write(b"<AssetMap/>")
+
+        self.files.append(("missing", "missing.mxf", "application/mxf"))
+        self.assertRaises(OSError, write_package, self.dcp_path, self.files)
+
+        with open(assetmap_path, 'rb') as f:
+            self.assertEqual(f.read(), b"<AssetMap/>")
+        self.assertEqual(sorted(os.listdir(self.dcp_path)), ["ASSETMAP.xml", "cpl.xml", "reel"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from smpteparsers.flmx import facility as flmx, helper
+
+# Accepts any content under the root element, in place of a schema which imports remote schemas
+LOCAL_SCHEMA = u"""<?xml version="1.0" encoding="utf-8"?>
+<schema xmlns="http://www.w3.org/2001/XMLSchema" targetNamespace="{0}" elementFormDefault="qualified">
+    <element name="{1}">
+        <complexType>
+            <sequence>
+                <any minOccurs="0" maxOccurs="unbounded" processContents="skip"/>
+            </sequence>
+            <anyAttribute processContents="skip"/>
+        </complexType>
+    </element>
+</schema>
+"""
+
+LOCAL_SCHEMAS = {
+    u'schema_sitelist.xsd': (u'http://isdcf.com/2010/04/SiteList', u'SiteList'),
+    u'schema_facility.xsd': (u'http://isdcf.com/2010/06/FLM', u'FacilityListMessage'),
+}
+
+def use_local_schemas(testcase):
+    # Validate against local schemas so the tests don't depend on the remote schemas
+    schema_dir = os.path.join(os.path.dirname(flmx.__file__), u'schema')
+    for name, (namespace, root) in LOCAL_SCHEMAS.items():
+        xsd = os.path.join(schema_dir, name)
+        schema = etree.XMLSchema(etree.fromstring(LOCAL_SCHEMA.format(namespace, root).encode(u'utf-8')))
+        previous = helper._schemas.get(xsd)
+        helper._schemas[xsd] = schema
+        testcase.addCleanup(_restore_schema, xsd, previous)
+
+def _restore_schema(xsd, previous):
+    if previous is None:
+        helper._schemas.pop(xsd, None)
+    else:
+        helper._schemas[xsd] = previous
+
+def make_facility(xml, facility_id=u'fox.com:5132'):
+    # Build the facility from its parts so the tests don't depend on the remote schemas
+    fp = flmx.FacilityParser.__new__(flmx.FacilityParser)
+    fp.id = facility_id
+    fp.name = u'A Cinema'
+    fp.circuit = u'Independent'
+    fp.timezone = None
+    fp.auditoriums = {}
+    for auditorium in BeautifulSoup(xml, u'xml')(u'Auditorium'):
+        a = flmx.Auditorium(auditorium)
+        fp.auditoriums[a.number or a.name] = a
+    return fp
@@ -0,0 +1,111 @@
+import unittest, os, sys, shutil, tempfile, threading
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+
+if sys.version_info >= (3, 7):
+    import asyncio
+    from smpteparsers.flmx import aio
+    from smpteparsers.flmx.error import FlmxRequestError
+    from smpteparsers.flmx.failures import FailureStore
+
+from test.flmx.fixtures import use_local_schemas
+
+SITELIST = b"""<?xml version="1.0" encoding="UTF-8"?>
+<SiteList xmlns="http://isdcf.com/2010/04/SiteList" xmlns:xlink="http://www.w3.org/1999/xlink">
+    <Originator>orig</Originator>
+    <SystemName>sysName</SystemName>
+    <DateTimeCreated>2001-01-01T15:49:40.220</DateTimeCreated>
+    <FacilityList>
+        <Facility id="A" modified="2011-04-07T12:10:01-00:00" xlink:href="flm.xml" xlink:type="simple"/>
+        <Facility id="B" modified="2012-05-08T12:11:02-01:20" xlink:href="missing.xml" xlink:type="simple"/>
+    </FacilityList>
+</SiteList>
+"""
+
+class Handler(BaseHTTPRequestHandler):
+    # Path to response body, anything else is a 404
+    documents = {}
+    auth = []
+
+    def do_GET(self):
+        Handler.auth.append(self.headers.get(u'Authorization'))
+        if self.path == u'/redirect':
+            self.send_response(302)
+            self.send_header(u'Location', u'/sites.xml')
+            self.end_headers()
+        elif self.path in Handler.documents:
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(Handler.documents[self.path])
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+@unittest.skipIf(sys.version_info < (3, 7), u'asyncio parser requires Python 3.7+')
+class TestAsyncParser(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(os.path.dirname(__file__), u'testFLM.xml'), u'rb') as f:
+            Handler.documents = {u'/sites.xml': SITELIST, u'/flm.xml': f.read()}
+        Handler.auth = []
+
+        self.server = HTTPServer((u'127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.base = u'http://127.0.0.1:{0}'.format(self.server.server_port)
+
+        self.dir = tempfile.mkdtemp()
+        self.failures = os.path.join(self.dir, u'failures.db')
+        self.loop = asyncio.new_event_loop()
+        use_local_schemas(self)
+
+    def tearDown(self):
+        self.loop.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.dir)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_fetch(self):
+        body = self.run_async(aio.fetch(self.base + u'/redirect', username=u'user', password=u'pass'))
+        self.assertEqual(body, SITELIST)
+        self.assertEqual(Handler.auth[-1], u'Basic dXNlcjpwYXNz')
+
+    def test_fetch_error(self):
+        self.assertRaises(FlmxRequestError, self.run_async, aio.fetch(self.base + u'/missing.xml'))
+
+    def test_fetch_too_large(self):
+        self.assertRaises(FlmxRequestError, self.run_async,
+                          aio.fetch(self.base + u'/sites.xml', max_size=len(SITELIST) - 1))
+        self.assertEqual(self.run_async(aio.fetch(self.base + u'/sites.xml', max_size=len(SITELIST))), SITELIST)
+
+    def test_parse(self):
+        # Drive the async iterator by hand, this module must still import on Python 2
+        facilities = []
+        iterator = aio.parse_async(self.base + u'/sites.xml', failures_file=self.failures).__aiter__()
+        while True:
+            try:
+                facilities.append(self.run_async(iterator.__anext__()))
+            except StopAsyncIteration:
+                break
+        self.assertEqual([fp.id for fp in facilities], [u'fox.com:5132'])
+
+        # The missing FLM is recorded as a failure against the site list
+        failures = FailureStore(self.failures).get_failures(self.base + u'/sites.xml')
+        self.assertEqual(list(failures.keys()), [u'missing.xml'])
+
+        # Facilities can be marked as failed by the caller
+        self.run_async(aio.add_failure_async(self.base + u'/sites.xml', facilities[0], failures_file=self.failures))
+        failures = FailureStore(self.failures).get_failures(self.base + u'/sites.xml')
+        self.assertEqual(sorted(failures.keys()), [u'fox.com:5132', u'missing.xml'])
+
+if __name__ == '__main__':
+    unittest.main()
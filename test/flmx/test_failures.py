@@ -0,0 +1,103 @@
+import unittest, os, shutil, tempfile
+
+from smpteparsers.flmx.error import FlmxError
+from smpteparsers.flmx.failures import FailureStore
+from smpteparsers.flmx.parse import Parser
+
+class TestFailureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, u'failures.db')
+        self.store = FailureStore(self.path, backoff=10, max_backoff=35)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_add_failure(self):
+        failure = self.store.add_failure(u'http://a.com/sites', u'flm1.xml', now=100)
+
+        self.assertEqual(failure.retries, 1)
+        self.assertEqual(failure.first_failed, 100)
+        self.assertEqual(failure.next_retry, 110)
+
+        failures = self.store.get_failures(u'http://a.com/sites')
+        self.assertEqual(list(failures.keys()), [u'flm1.xml'])
+        self.assertEqual(failures[u'flm1.xml'].retries, 1)
+
+    def test_backoff(self):
+        self.store.add_failure(u'http://a.com/sites', u'flm1.xml', now=100)
+        failure = self.store.add_failure(u'http://a.com/sites', u'flm1.xml', now=200)
+        self.assertEqual(failure.retries, 2)
+        self.assertEqual(failure.first_failed, 100)
+        self.assertEqual(failure.next_retry, 220)
+
+        # Backoff is capped at max_backoff
+        failure = self.store.add_failure(u'http://a.com/sites', u'flm1.xml', now=300)
+        self.assertEqual(failure.next_retry, 335)
+
+        self.assertEqual(self.store.get_due(u'http://a.com/sites', now=334), [])
+        self.assertEqual(self.store.get_due(u'http://a.com/sites', now=335), [u'flm1.xml'])
+
+    def test_sitelists_are_separate(self):
+        self.store.add_failure(u'http://a.com/sites', u'flm1.xml')
+        self.store.add_failure(u'http://b.com/sites', u'flm1.xml')
+
+        # A second store on the same file sees the same data
+        other = FailureStore(self.path)
+        other.clear(u'http://a.com/sites')
+
+        self.assertEqual(self.store.get_failures(u'http://a.com/sites'), {})
+        self.assertEqual(list(self.store.get_failures(u'http://b.com/sites').keys()), [u'flm1.xml'])
+
+    def test_clear_failure(self):
+        self.store.add_failure(u'http://a.com/sites', u'flm1.xml')
+        self.store.add_failure(u'http://a.com/sites', u'flm2.xml')
+        self.store.clear_failure(u'http://a.com/sites', u'flm1.xml')
+
+        self.assertEqual(list(self.store.get_failures(u'http://a.com/sites').keys()), [u'flm2.xml'])
+
+    def test_clear_failure_before(self):
+        self.store.add_failure(u'http://a.com/sites', u'flm1.xml', now=100)
+        self.store.add_failure(u'http://a.com/sites', u'flm2.xml', now=100)
+
+        # flm2.xml failed again after the time given, so keeps its retry count
+        self.store.add_failure(u'http://a.com/sites', u'flm2.xml', now=300)
+        self.store.clear_failure(u'http://a.com/sites', u'flm1.xml', before=200)
+        self.store.clear_failure(u'http://a.com/sites', u'flm2.xml', before=200)
+
+        failures = self.store.get_failures(u'http://a.com/sites')
+        self.assertEqual(list(failures.keys()), [u'flm2.xml'])
+        self.assertEqual(failures[u'flm2.xml'].retries, 2)
+
+    def test_json_file(self):
+        path = os.path.join(self.dir, u'failures.json')
+        with open(path, u'w') as f:
+            f.write(u'{"http://a.com/sites": ["flm1.xml", "flm2.xml"], "http://b.com/sites": []}')
+
+        store = FailureStore(path)
+        self.assertEqual(sorted(store.get_due(u'http://a.com/sites')), [u'flm1.xml', u'flm2.xml'])
+        self.assertEqual(store.get_failures(u'http://b.com/sites'), {})
+
+        # The file is now a database, and opening it again keeps the failures
+        store.add_failure(u'http://a.com/sites', u'flm1.xml')
+        self.assertEqual(FailureStore(path).get_failures(u'http://a.com/sites')[u'flm1.xml'].retries, 2)
+        self.assertEqual(sorted(os.listdir(self.dir)), [u'failures.db', u'failures.json'])
+
+    def test_not_a_failures_file(self):
+        path = os.path.join(self.dir, u'failures.txt')
+        with open(path, u'w') as f:
+            f.write(u'not a failures file')
+        self.assertRaises(FlmxError, FailureStore, path)
+
+    def test_relative_path(self):
+        cwd = os.getcwd()
+        os.chdir(self.dir)
+        try:
+            store = Parser(u'http://a.com/sites').get_failure_store(u'relative.db')
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(store.path, os.path.join(os.path.realpath(self.dir), u'relative.db'))
+
+if __name__ == '__main__':
+    unittest.main()
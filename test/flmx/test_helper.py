@@ -0,0 +1,87 @@
+import unittest, os, shutil, tempfile
+from io import BytesIO, StringIO
+
+from smpteparsers.flmx import helper
+from smpteparsers.flmx import error
+
+xsd = b"""<?xml version="1.0" encoding="utf-8"?>
+    <schema xmlns="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:test" elementFormDefault="qualified">
+        <element name="List">
+            <complexType>
+                <sequence>
+                    <element name="Item" maxOccurs="unbounded">
+                        <complexType>
+                            <sequence>
+                                <element name="Number" type="int"/>
+                            </sequence>
+                            <attribute name="id" type="string"/>
+                        </complexType>
+                    </element>
+                </sequence>
+            </complexType>
+        </element>
+    </schema>
+    """
+
+class TestIterparse(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.xsd = os.path.join(self.dir, u'test.xsd')
+        with open(self.xsd, u'wb') as f:
+            f.write(xsd)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def items(self, count, last=b'1'):
+        return (b'<List xmlns="urn:test">' + b'<Item id="a"><Number>1</Number></Item>' * count +
+                b'<Item id="b"><Number>' + last + b'</Number></Item></List>')
+
+    def test_stream(self):
+        nodes = [(node.name, node[u'id'], helper.get_uint(node.Number))
+                 for node in helper.iterparse_XML(BytesIO(self.items(2)), self.xsd, (u'Item',))]
+        self.assertEqual(nodes, [(u'Item', u'a', 1), (u'Item', u'a', 1), (u'Item', u'b', 1)])
+
+    def test_string(self):
+        nodes = list(helper.iterparse_XML(self.items(2).decode(u'utf-8'), self.xsd, (u'Number',)))
+        self.assertEqual(len(nodes), 3)
+
+    def test_text_stream(self):
+        # More than one read, with characters which are more than one byte in UTF-8
+        xml = self.items(5000).decode(u'utf-8').replace(u'id="a"', u'id="\u00e9"')
+        nodes = [node[u'id'] for node in helper.iterparse_XML(StringIO(xml), self.xsd, (u'Item',))]
+        self.assertEqual(nodes, [u'\u00e9'] * 5000 + [u'b'])
+
+    def test_invalid(self):
+        def parse():
+            for node in helper.iterparse_XML(BytesIO(self.items(2, last=b'x')), self.xsd, (u'Item',)):
+                pass
+        self.assertRaises(error.FlmxParseError, parse)
+
+    def test_malformed(self):
+        def parse():
+            for node in helper.iterparse_XML(BytesIO(b'<List xmlns="urn:test"><Item>'), self.xsd, (u'Item',)):
+                pass
+        self.assertRaises(error.FlmxParseError, parse)
+
+    def test_external_entity(self):
+        number = os.path.join(self.dir, u'number.txt')
+        with open(number, u'wb') as f:
+            f.write(b'7')
+        xml = (b'<!DOCTYPE List [<!ENTITY number SYSTEM "' + number.encode(u'utf-8') + b'">]>'
+               b'<List xmlns="urn:test"><Item id="a"><Number>&number;</Number></Item></List>')
+        # The entity isn't expanded, so the Number is empty and the document is invalid
+        self.assertRaises(error.FlmxParseError, list, helper.iterparse_XML(BytesIO(xml), self.xsd, (u'Item',)))
+
+    def test_not_a_file(self):
+        self.assertRaises(error.FlmxCriticalError, list, helper.iterparse_XML(5, self.xsd, (u'Item',)))
+
+    def test_missing_children(self):
+        node = next(helper.iterparse_XML(BytesIO(self.items(0)), self.xsd, (u'Item',)))
+        self.assertEqual(node.Missing, None)
+        self.assertEqual(node(u'Missing'), [])
+        self.assertEqual(node.get_text(), u'1')
+
+if __name__ == '__main__':
+    unittest.main()
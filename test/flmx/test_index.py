@@ -0,0 +1,48 @@
+import unittest, os
+
+from smpteparsers.flmx.index import CertificateIndex
+from test.flmx.fixtures import make_facility
+
+class TestCertificateIndex(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(os.path.dirname(__file__), u'testFLM.xml')) as f:
+            self.xml = f.read()
+        self.index = CertificateIndex([make_facility(self.xml, u'fox.com:5132')])
+
+    def test_get_certificate(self):
+        ref = self.index.get_certificate(u'qualifier2=')
+
+        self.assertEqual(ref.facility.id, u'fox.com:5132')
+        self.assertEqual(ref.screen, 1)
+        self.assertEqual(ref.device.id, u'OthN+QPcj6n9v5dhCtTDsnN2v6A=')
+        self.assertEqual(ref.certificate.entity_name, u'le.ca.a.com')
+        self.assertEqual(self.index.get_certificate(u'missing'), None)
+
+    def test_get_device_and_screen(self):
+        ref = self.index.get_device(u'OthN+QPcj6n9v5dhCtTDsnN2v6A=')
+        self.assertEqual(ref.screen, 1)
+        self.assertTrue(self.index.get_screen(u'fox.com:5132', 1) is ref.auditorium)
+
+    def test_reparse(self):
+        fp = make_facility(self.xml, u'fox.com:5132')
+        device = fp.auditoriums[1].devices[0]
+        device.certificates = device.certificates[:1]
+        self.index.add_facility(fp)
+
+        self.assertTrue(u'qualifier=' in self.index)
+        self.assertFalse(u'qualifier2=' in self.index)
+        self.assertTrue(self.index.get_certificate(u'qualifier=').facility is fp)
+
+    def test_moved_device(self):
+        # The same device turns up in a second facility, then the first is re-parsed without it
+        other = make_facility(self.xml, u'fox.com:9999')
+        self.index.add_facility(other)
+        self.assertTrue(self.index.get_certificate(u'qualifier=').facility is other)
+
+        self.index.remove_facility(u'fox.com:5132')
+        self.assertTrue(self.index.get_certificate(u'qualifier=').facility is other)
+        self.assertEqual(self.index.get_screen(u'fox.com:5132', 1), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest, os, shutil, tempfile
+
+from smpteparsers.flmx.parse import Parser
+from smpteparsers.flmx.failures import FailureStore
+
+SITELIST_URL = u'http://a.com/sites'
+
+class Facility(object):
+    def __init__(self, id):
+        self.id = id
+
+class SiteList(object):
+    def __init__(self, sites):
+        self.sites = sites
+
+    def get_sites(self, last_ran):
+        return dict((site, None) for site in self.sites)
+
+class LocalParser(Parser):
+    """Parser serving a fixed site list, each site's facility having the site as its id."""
+    def __init__(self, sites):
+        super(LocalParser, self).__init__(SITELIST_URL)
+        self.sites = sites
+
+    def get_sitelist(self, username=u'', password=u''):
+        return SiteList(self.sites)
+
+    def get_facility(self, url, username=u'', password=u''):
+        return Facility(url)
+
+class TestParser(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.failures = os.path.join(self.dir, u'failures.db')
+        self.store = FailureStore(self.failures)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_failure_cleared_after_facility(self):
+        self.store.add_failure(SITELIST_URL, u'flm1.xml', now=0)
+        parser = LocalParser([u'flm1.xml'])
+
+        for fp in parser.parse(failures_file=self.failures):
+            # Still recorded while the caller has the facility
+            self.assertEqual(list(self.store.get_failures(SITELIST_URL).keys()), [u'flm1.xml'])
+        self.assertEqual(self.store.get_failures(SITELIST_URL), {})
+
+    def test_failure_added_by_caller(self):
+        self.store.add_failure(SITELIST_URL, u'flm1.xml', now=0)
+        parser = LocalParser([u'flm1.xml'])
+
+        for fp in parser.parse(failures_file=self.failures):
+            parser.add_failure(fp.id, failures_file=self.failures)
+
+        # The caller's failure is kept and counts as another retry
+        failures = self.store.get_failures(SITELIST_URL)
+        self.assertEqual(list(failures.keys()), [u'flm1.xml'])
+        self.assertEqual(failures[u'flm1.xml'].retries, 2)
+
+if __name__ == '__main__':
+    unittest.main()
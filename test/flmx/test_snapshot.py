@@ -0,0 +1,68 @@
+import unittest, os, shutil, tempfile
+
+from smpteparsers.flmx.snapshot import SnapshotStore, serialise_facility, diff_facilities
+from test.flmx.fixtures import make_facility
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(os.path.dirname(__file__), u'testFLM.xml')) as f:
+            self.xml = f.read()
+        self.dir = tempfile.mkdtemp()
+        self.store = SnapshotStore(os.path.join(self.dir, u'snapshots.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_serialise(self):
+        snapshot = serialise_facility(make_facility(self.xml))
+        device = snapshot[u'auditoriums'][u'1'][u'devices'][u'OthN+QPcj6n9v5dhCtTDsnN2v6A=']
+
+        self.assertEqual(snapshot[u'id'], u'fox.com:5132')
+        self.assertEqual(sorted(device[u'certificates'].keys()), [u'qualifier2=', u'qualifier='])
+
+    def test_first_update(self):
+        diff = self.store.update(make_facility(self.xml))
+
+        self.assertTrue(diff)
+        self.assertEqual(diff.added_screens, [u'1'])
+        self.assertTrue(diff.certificates_changed)
+        self.assertEqual(self.store.get(u'fox.com:5132')[u'id'], u'fox.com:5132')
+
+    def test_unchanged(self):
+        self.store.update(make_facility(self.xml))
+        diff = self.store.update(make_facility(self.xml))
+
+        self.assertFalse(diff)
+        self.assertFalse(diff.certificates_changed)
+
+    def test_certificate_changes(self):
+        self.store.update(make_facility(self.xml))
+
+        fp = make_facility(self.xml)
+        device = fp.auditoriums[1].devices[0]
+        device.certificates[0].certificate = u'reissued'
+        del device.certificates[1]
+        diff = self.store.update(fp)
+
+        self.assertEqual(diff.added_screens, [])
+        self.assertEqual(diff.changed_devices, [])
+        self.assertEqual(diff.added_certificates, [(u'1', device.id, u'qualifier=')])
+        self.assertEqual(sorted(diff.removed_certificates),
+                         [(u'1', device.id, u'qualifier2='), (u'1', device.id, u'qualifier=')])
+
+    def test_device_swap(self):
+        old = serialise_facility(make_facility(self.xml))
+
+        fp = make_facility(self.xml)
+        fp.auditoriums[1].devices[0].id = u'new-device'
+        fp.auditoriums[1].audio_format = u'7.1'
+        diff = diff_facilities(old, serialise_facility(fp))
+
+        self.assertEqual(diff.changed_screens, [u'1'])
+        self.assertEqual(diff.added_devices, [(u'1', u'new-device')])
+        self.assertEqual(diff.removed_devices, [(u'1', u'OthN+QPcj6n9v5dhCtTDsnN2v6A=')])
+        self.assertTrue(diff.certificates_changed)
+
+if __name__ == '__main__':
+    unittest.main()
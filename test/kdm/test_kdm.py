@@ -1,4 +1,5 @@
 import unittest
+import mmap
 import os.path
 try:
     from StringIO import StringIO
@@ -41,6 +42,21 @@ class TestKDM(unittest.TestCase):
         kdm = KDM(self.smpte_kdm_xml)
         kdm.validate()
 
+    def test_smpte_validation_from_file(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'smpte_kdm.xml')
+        with open(path, 'rb') as f:
+            kdm = KDM(f)
+            self._check_smpte_kdm(kdm)
+            kdm.validate()
+
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                kdm = KDM(buf)
+                self.assertTrue(kdm.raw is buf)
+                kdm.validate()
+            finally:
+                buf.close()
+
     def _check_interop_kdm(self, kdm):
         self.assertEqual(kdm.kind, KDM.INTEROP)
         self.assertEqual(kdm.id, 'fceeeb51-a60d-4771-bd23-5844d6a881ea')
@@ -0,0 +1,99 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.assetmap import AssetData
+from smpteparsers.cpl import CPL
+from smpteparsers.library import AssetRegistry
+from smpteparsers.library.index import AssetIndex
+from smpteparsers.pkl import PKLData
+
+test_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+cpl_path = os.path.join(test_path, 'cpl', 'interop', 'success.xml')
+assetmap_path = os.path.join(test_path, 'assetmap', 'data', 'success.xml')
+
+PICTURE_ID = "fe3c6d6d-d36f-447b-aa19-af28955880bd"
+SOUND_ID = "14d7b547-8b75-4df1-a126-5adebaead7dc"
+
+class TestAssetIndex(unittest.TestCase):
+    def setUp(self):
+        self.ov_path = os.path.join("library", "ov")
+        self.vf_path = os.path.join("library", "vf")
+
+        self.index = AssetIndex()
+        self.index.add_dcp(self.ov_path, {
+            PICTURE_ID: AssetData("picture.mxf", 1, 0, 100),
+            SOUND_ID: AssetData("sound.mxf", 1, 0, 100),
+        })
+        # A VF with a localised sound track, playing the OV's picture
+        self.vf_assets = {SOUND_ID: AssetData("sound_fr.mxf", 1, 0, 100)}
+        self.index.add_dcp(self.vf_path, self.vf_assets)
+
+    def test_lookup(self):
+        self.assertEqual(len(self.index), 2)
+        self.assertTrue(PICTURE_ID in self.index)
+        # Paths are made absolute
+        ov_path, vf_path = os.path.abspath(self.ov_path), os.path.abspath(self.vf_path)
+        self.assertEqual(self.index[PICTURE_ID].path, os.path.join(ov_path, "picture.mxf"))
+        self.assertEqual([a.dcp_path for a in self.index.locations(SOUND_ID)], [ov_path, vf_path])
+        self.assertEqual(self.index.resolve(SOUND_ID, prefer=self.vf_path).path, os.path.join(vf_path, "sound_fr.mxf"))
+        self.assertEqual(self.index.resolve(SOUND_ID, prefer=vf_path + os.sep).dcp_path, vf_path)
+        self.assertEqual(self.index.get("missing"), None)
+        self.assertRaises(KeyError, lambda: self.index["missing"])
+
+    def test_resolve_cpl(self):
+        class VFAssetmap(object):
+            assets = self.vf_assets
+            def __getitem__(self, k):
+                return self.assets[k]
+
+        cpl = CPL(cpl_path, assetmap=VFAssetmap(), asset_index=self.index)
+        reel = cpl.reels[0]
+        # Its own assets first, then the other packages
+        self.assertEqual(reel.sound.path, "sound_fr.mxf")
+        self.assertEqual(reel.picture.path, os.path.join(os.path.abspath(self.ov_path), "picture.mxf"))
+        # Either kind of path can be joined onto the package's path
+        self.assertEqual(os.path.join(self.vf_path, reel.picture.path), reel.picture.path)
+
+        self.assertEqual(self.index.dependencies(cpl, self.vf_path), [os.path.abspath(self.ov_path)])
+        self.assertEqual(self.index.dependencies(cpl, os.path.abspath(self.vf_path)), [os.path.abspath(self.ov_path)])
+        self.assertEqual(self.index.dependencies(cpl, self.ov_path), [])
+        self.assertEqual(self.index.missing(cpl), [])
+
+        self.index.remove_dcp(self.ov_path)
+        cpl = CPL(cpl_path, assetmap=VFAssetmap(), asset_index=self.index)
+        self.assertEqual(cpl.reels[0].picture.path, None)
+        self.assertEqual(self.index.missing(cpl), [PICTURE_ID])
+        self.assertEqual(self.index.packages, [os.path.abspath(self.vf_path)])
+
+    def test_scan(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            for name, filename, source in [("a", "ASSETMAP", assetmap_path), ("b", "ASSETMAP.xml", None)]:
+                os.makedirs(os.path.join(tmp, name, "sub"))
+                with open(os.path.join(tmp, name, filename), 'wb') as f:
+                    if source is not None:
+                        with open(source, 'rb') as s:
+                            f.write(s.read())
+                    else:
+                        f.write(b"<AssetMap>")
+
+            index = AssetIndex()
+            self.assertEqual(index.scan(tmp), 1)
+            self.assertEqual(index["7ec59b28-8ef4-4963-88e8-9d0a08763b4a"].path,
+                             os.path.join(tmp, "a", "7ec59b28-8ef4-4963-88e8-9d0a08763b4a.mxf"))
+            self.assertEqual(list(index.errors), [os.path.join(tmp, "b", "ASSETMAP.xml")])
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_from_registry(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            registry = AssetRegistry(os.path.join(tmp, "library.db"))
+            registry.add_dcp(self.ov_path, {PICTURE_ID: AssetData("picture.mxf", 1, 0, 100)},
+                             {PICTURE_ID: PKLData("hash", "100", "application/mxf")})
+            index = AssetIndex.from_registry(registry)
+            self.assertEqual(index[PICTURE_ID].path, os.path.join(os.path.abspath(self.ov_path), "picture.mxf"))
+            self.assertEqual(index.packages, [os.path.abspath(self.ov_path)])
+        finally:
+            shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    unittest.main()
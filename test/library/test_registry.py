@@ -0,0 +1,136 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.assetmap import AssetData
+from smpteparsers.pkl import PKLData, generate_hash
+from smpteparsers.dcp.verify import verify_dcp
+from smpteparsers.library import AssetRegistry, HASHED, LINKED, COPY
+
+class TestAssetRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.registry = AssetRegistry(os.path.join(self.tmp, "library.db"))
+        self.trailer = os.urandom(4096)
+        self.hashed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def make_dcp(self, name, files, link_from=None):
+        """
+        Writes a DCP with the given {asset_id: contents}, hard linking the trailer from another DCP.
+        """
+        dcp_path = os.path.join(self.tmp, name)
+        os.mkdir(dcp_path)
+        assets, pkl_assets = {}, {}
+        for asset_id, contents in files.items():
+            full_path = os.path.join(dcp_path, asset_id + ".mxf")
+            if link_from is not None and asset_id == "trailer":
+                os.link(os.path.join(self.tmp, link_from, "trailer.mxf"), full_path)
+            else:
+                with open(full_path, 'wb') as f:
+                    f.write(contents)
+            assets[asset_id] = AssetData(asset_id + ".mxf", 1, 0, len(contents))
+            pkl_assets[asset_id] = PKLData(generate_hash(full_path).decode("ascii"), str(len(contents)), "application/mxf")
+        self.registry.add_dcp(dcp_path, assets, pkl_assets)
+        return dcp_path, assets, pkl_assets
+
+    def hash_func(self, path):
+        self.hashed.append(os.path.relpath(path, self.tmp))
+        return generate_hash(path)
+
+    def test_verify_once(self):
+        self.make_dcp("a", {"trailer": self.trailer, "feature": os.urandom(1000)})
+        self.make_dcp("b", {"trailer": self.trailer}, link_from="a")
+        self.make_dcp("c", {"trailer": self.trailer})
+
+        result = self.registry.verify(hash_func=self.hash_func)
+        self.assertTrue(result.ok)
+        self.assertEqual((result.hashed, result.linked, result.copies), (3, 1, 0))
+        methods = dict((os.path.relpath(l.path, self.tmp), l.method) for l in self.registry.locations("trailer"))
+        self.assertEqual(methods[os.path.join("a", "trailer.mxf")], HASHED)
+        self.assertEqual(methods[os.path.join("b", "trailer.mxf")], LINKED)
+        self.assertEqual(methods[os.path.join("c", "trailer.mxf")], HASHED)
+
+        # Nothing changed, nothing to hash
+        self.hashed = []
+        result = self.registry.verify(hash_func=self.hash_func)
+        self.assertEqual(self.hashed, [])
+        file_hash = self.registry.locations("trailer")[0].file_hash
+        self.assertTrue(self.registry.is_verified("trailer", file_hash))
+        self.assertFalse(self.registry.is_verified("trailer", "other"))
+
+    def test_trust_copies(self):
+        self.make_dcp("a", {"trailer": self.trailer})
+        self.make_dcp("c", {"trailer": self.trailer})
+        result = self.registry.verify(hash_func=self.hash_func, trust_copies=True)
+        self.assertEqual((result.hashed, result.copies), (1, 1))
+        self.assertEqual(sorted(l.method for l in self.registry.locations("trailer")), [COPY, HASHED])
+
+    def test_changed_file(self):
+        dcp_path, assets, pkl_assets = self.make_dcp("a", {"trailer": self.trailer})
+        self.registry.verify(hash_func=self.hash_func)
+
+        with open(os.path.join(dcp_path, "trailer.mxf"), 'r+b') as f:
+            f.write(b"changed")
+        os.utime(os.path.join(dcp_path, "trailer.mxf"), (0, 0))
+        result = self.registry.verify(hash_func=self.hash_func)
+        self.assertEqual(result.hashed, 1)
+        self.assertEqual([l.asset_id for l in result.invalid], ["trailer"])
+
+    def test_missing(self):
+        dcp_path, assets, pkl_assets = self.make_dcp("a", {"trailer": self.trailer})
+        os.remove(os.path.join(dcp_path, "trailer.mxf"))
+        result = self.registry.verify(hash_func=self.hash_func)
+        self.assertEqual(result.hashed, 0)
+        self.assertEqual([l.valid for l in result.invalid], [False])
+
+    def test_duplicates(self):
+        self.make_dcp("a", {"trailer": self.trailer, "feature": os.urandom(1000)})
+        self.make_dcp("b", {"trailer": self.trailer}, link_from="a")
+        self.make_dcp("c", {"trailer": self.trailer})
+
+        duplicates = self.registry.duplicates()
+        self.assertEqual([d.asset_id for d in duplicates], ["trailer"])
+        self.assertEqual(duplicates[0].reclaimable, 4096)
+        self.assertEqual(sorted(len(paths) for paths in duplicates[0].files), [1, 2])
+
+    def test_hash_file(self):
+        dcp_path, assets, pkl_assets = self.make_dcp("a", {"trailer": self.trailer})
+        self.registry.verify()
+
+        # A new package hard linking the verified trailer
+        other_path, other_assets, other_pkl_assets = self.make_dcp("b", {"trailer": self.trailer}, link_from="a")
+        report = verify_dcp(other_path, other_assets, other_pkl_assets,
+                            hash_func=lambda path: self.registry.hash_file(path, hash_func=self.hash_func))
+        self.assertTrue(report.ok)
+        self.assertEqual(self.hashed, [])
+
+    def test_chunked(self):
+        dcp_path, assets, pkl_assets = self.make_dcp("a", {"trailer": self.trailer, "feature": os.urandom(1000)})
+        with open(os.path.join(dcp_path, "feature.mxf"), 'rb') as f:
+            contents = f.read()
+        os.remove(os.path.join(dcp_path, "feature.mxf"))
+        for name, data in [("feature.mxf.1", contents[:600]), ("feature.mxf.2", contents[600:])]:
+            with open(os.path.join(dcp_path, name), 'wb') as f:
+                f.write(data)
+        assets["feature"] = [AssetData("feature.mxf.1", 1, 0, 600), AssetData("feature.mxf.2", 1, 600, 400)]
+
+        # Only the trailer is a single file to register, the chunks are verified as one stream
+        self.assertEqual(self.registry.add_dcp(dcp_path, assets, pkl_assets), 1)
+        self.assertTrue(self.registry.verify().ok)
+        report = verify_dcp(dcp_path, assets, pkl_assets, hash_func=self.registry.hash_file)
+        self.assertTrue(report.ok)
+
+    def test_reregister(self):
+        dcp_path, assets, pkl_assets = self.make_dcp("a", {"trailer": self.trailer, "feature": os.urandom(10)})
+        self.registry.verify()
+        del pkl_assets["feature"]
+        self.registry.add_dcp(dcp_path, assets, pkl_assets)
+        self.assertEqual([l.asset_id for l in self.registry.locations_in(dcp_path)], ["trailer"])
+        # Unchanged files keep their verification
+        self.assertEqual(self.registry.locations("trailer")[0].method, HASHED)
+
+        self.registry.remove_dcp(dcp_path)
+        self.assertEqual(self.registry.locations("trailer"), [])
+
+if __name__ == '__main__':
+    unittest.main()
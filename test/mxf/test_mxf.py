@@ -0,0 +1,115 @@
+import unittest, io, os, shutil, struct, tempfile, uuid
+from smpteparsers.cpl import CPL
+from smpteparsers.mxf import (read_header, check_cpl, check_assets, MXFError,
+                              UNREADABLE, ASSET_ID, EDIT_RATE, DURATION)
+
+cpl_path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'cpl', 'interop', 'success.xml')
+PICTURE = "fe3c6d6d-d36f-447b-aa19-af28955880bd"
+SOUND = "14d7b547-8b75-4df1-a126-5adebaead7dc"
+
+def klv(key, value):
+    # Long form BER lengths, as most writers use
+    return key + b"\x83" + struct.pack(">I", len(value))[1:] + value
+
+def local_set(kind, items):
+    key = b"\x06\x0e\x2b\x34\x02\x53\x01\x01\x0d\x01\x01\x01\x01\x01" + kind + b"\x00"
+    return klv(key, b"".join(struct.pack(">HH", tag, len(value)) + value for tag, value in items))
+
+FILL_KEY = b"\x06\x0e\x2b\x34\x01\x01\x01\x02\x03\x01\x02\x10\x01\x00\x00\x00"
+
+def make_mxf(asset_id, edit_rate=(24, 1), duration=500, run_in=b"", essence_size=4096, kag_fill=0):
+    descriptor_uid = uuid.uuid4().bytes
+    umid = b"\x06\x0a\x2b\x34\x01\x01\x01\x05\x01\x01\x0d\x20\x13\x00\x00\x00" + uuid.UUID(asset_id).bytes
+    header = b"".join([
+        klv(b"\x06\x0e\x2b\x34\x02\x05\x01\x01\x0d\x01\x02\x01\x01\x05\x01\x00", struct.pack(">II", 0, 18)),
+        # Material package, which isn't the file package
+        local_set(b"\x36", [(0x3c0a, uuid.uuid4().bytes), (0x4401, b"\x00" * 32)]),
+        local_set(b"\x37", [(0x3c0a, uuid.uuid4().bytes), (0x4401, umid), (0x4701, descriptor_uid)]),
+        local_set(b"\x28", [(0x3c0a, descriptor_uid), (0x3001, struct.pack(">ii", *edit_rate)),
+                            (0x3002, struct.pack(">q", duration))]),
+        # Fill
+        klv(FILL_KEY, b"\x00" * 100),
+    ])
+    partition = struct.pack(">HHIQQQQQIQI", 1, 2, 1, 0, 0, 0, len(header), 0, 0, 0, 1) + b"\x00" * 16 + struct.pack(">II", 0, 16)
+    partition_key = b"\x06\x0e\x2b\x34\x02\x05\x01\x01\x0d\x01\x02\x01\x01\x02\x04\x00"
+    # Fill aligning the header metadata to the KAG isn't in the header byte count
+    fill = klv(FILL_KEY, b"\x00" * kag_fill) if kag_fill else b""
+    return run_in + klv(partition_key, partition) + fill + header + b"\xff" * essence_size
+
+class TestReadHeader(unittest.TestCase):
+    def test_header(self):
+        header = read_header(io.BytesIO(make_mxf(PICTURE, (48, 1), 1234)))
+        self.assertEqual(header.asset_id, PICTURE)
+        self.assertEqual(header.edit_rate, (48, 1))
+        self.assertEqual(header.duration, 1234)
+
+    def test_run_in(self):
+        header = read_header(io.BytesIO(make_mxf(PICTURE, run_in=b"\x00" * 1000)))
+        self.assertEqual(header.asset_id, PICTURE)
+
+    def test_kag_fill(self):
+        header = read_header(io.BytesIO(make_mxf(PICTURE, kag_fill=400)))
+        self.assertEqual(header.asset_id, PICTURE)
+        self.assertEqual(header.duration, 500)
+
+    def test_reads_only_the_header(self):
+        f = io.BytesIO(make_mxf(PICTURE, essence_size=1048576))
+        header = read_header(f)
+        self.assertTrue(f.tell() < 1024)
+        self.assertTrue(header.header_size < 1024)
+
+    def test_invalid(self):
+        self.assertRaises(MXFError, read_header, io.BytesIO(b"\x00" * 100))
+        self.assertRaises(MXFError, read_header, io.BytesIO(make_mxf(PICTURE)[:200]))
+        self.assertRaises(MXFError, read_header, "/nonexistent/file.mxf")
+
+class TestCheckCPL(unittest.TestCase):
+    def setUp(self):
+        self.dcp_path = tempfile.mkdtemp()
+        self.cpl = CPL(cpl_path)
+        for asset_id in (PICTURE, SOUND):
+            self.cpl.assets[asset_id].path = asset_id + ".mxf"
+
+    def tearDown(self):
+        shutil.rmtree(self.dcp_path)
+
+    def write(self, asset_id, contents):
+        with open(os.path.join(self.dcp_path, asset_id + ".mxf"), 'wb') as f:
+            f.write(contents)
+
+    def test_match(self):
+        self.write(PICTURE, make_mxf(PICTURE))
+        self.write(SOUND, make_mxf(SOUND))
+        self.assertEqual(check_cpl(self.cpl, self.dcp_path), [])
+
+    def test_mismatch(self):
+        self.write(PICTURE, make_mxf(SOUND, (25, 1), 499))
+        issues = check_cpl(self.cpl, self.dcp_path)
+
+        self.assertEqual([issue.kind for issue in issues], [ASSET_ID, EDIT_RATE, DURATION, UNREADABLE])
+        self.assertEqual((issues[1].expected, issues[1].actual), ((24, 1), (25, 1)))
+        self.assertEqual((issues[2].expected, issues[2].actual), (500, 499))
+        self.assertEqual(issues[3].asset_id, SOUND)
+        self.assertTrue("Duration doesn't match" in str(issues[2]))
+
+    def test_upper_case_id(self):
+        self.write(PICTURE, make_mxf(PICTURE))
+        self.write(SOUND, make_mxf(SOUND))
+        asset = self.cpl.assets[PICTURE]
+        asset.id = asset.id.upper()
+        self.assertEqual(check_assets([asset], self.dcp_path), [])
+
+    def test_files_read_once(self):
+        self.cpl.assets[SOUND].path = PICTURE + ".mxf"
+        self.write(PICTURE, make_mxf(PICTURE))
+        read = []
+        def reader(path):
+            read.append(path)
+            return read_header(path)
+
+        issues = check_assets([self.cpl.assets[PICTURE], self.cpl.assets[SOUND]], self.dcp_path, reader)
+        self.assertEqual(len(read), 1)
+        self.assertEqual([issue.kind for issue in issues], [ASSET_ID])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.assetmap import AssetData
+from smpteparsers.pkl import PKL, PKLError, PKLValidationError
+
+pkl_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'success.xml')
+
+class TestPKL(unittest.TestCase):
+    def test_success(self):
+        pkl = PKL(pkl_path)
+
+        self.assertEqual(pkl.id, "5f3a8dc4-8c6b-4c4e-9e27-2b0fbb4d9c51")
+        self.assertEqual(set(pkl.assets.keys()), set(["01658edd-edfb-4c52-beec-1f5b9616e813",
+                                                      "7ec59b28-8ef4-4963-88e8-9d0a08763b4a"]))
+
+        asset = pkl.assets["01658edd-edfb-4c52-beec-1f5b9616e813"]
+        self.assertEqual(asset.file_hash, "3Xbz4m3yVrMnzX6bY1hJ2vXrVfI=")
+        self.assertEqual(asset.size, "8075")
+        self.assertEqual(asset.file_type, "text/xml;asdcpKind=CPL")
+
+    def test_fields(self):
+        # Every field of an asset is extracted in the one pass over its children, in any order
+        xml = b"""<?xml version="1.0" encoding="UTF-8"?>
+<PackingList xmlns="http://www.digicine.com/PROTO-ASDCP-PKL-20040311#">
+  <Id>urn:uuid:5f3a8dc4-8c6b-4c4e-9e27-2b0fbb4d9c51</Id>
+  <AssetList>
+    <Asset>
+      <Type>application/x-smpte-mxf;asdcpKind=Sound</Type>
+      <Size>1024</Size>
+      <Id>urn:uuid:01658edd-edfb-4c52-beec-1f5b9616e813</Id>
+      <Hash>3Xbz4m3yVrMnzX6bY1hJ2vXrVfI=</Hash>
+    </Asset>
+    <Asset>
+      <Id>urn:uuid:7ec59b28-8ef4-4963-88e8-9d0a08763b4a</Id>
+      <Hash>Hx9iKr8Kr2vFzz8e6JkZ2yJ1Xsc=</Hash>
+    </Asset>
+  </AssetList>
+</PackingList>"""
+        pkl = PKL(xml)
+
+        sound = pkl.assets["01658edd-edfb-4c52-beec-1f5b9616e813"]
+        self.assertEqual((sound.file_hash, sound.size, sound.file_type),
+                         ("3Xbz4m3yVrMnzX6bY1hJ2vXrVfI=", "1024", "application/x-smpte-mxf;asdcpKind=Sound"))
+        picture = pkl.assets["7ec59b28-8ef4-4963-88e8-9d0a08763b4a"]
+        self.assertEqual((picture.size, picture.file_type), (None, None))
+
+    def test_missing_id(self):
+        xml = b"""<PackingList xmlns="http://www.digicine.com/PROTO-ASDCP-PKL-20040311#">
+  <AssetList>
+    <Asset><Hash>3Xbz4m3yVrMnzX6bY1hJ2vXrVfI=</Hash></Asset>
+  </AssetList>
+</PackingList>"""
+        self.assertRaises(PKLError, PKL, xml)
+        self.assertRaises(PKLError, PKL, xml.replace(b"<AssetList>", b"<Id>urn:uuid:5f3a8dc4-8c6b-4c4e-9e27-2b0fbb4d9c51</Id><AssetList>"))
+
+    def test_malformed(self):
+        self.assertRaises(PKLError, PKL, b'<PackingList>')
+
+    def test_validate_hashes_size_first(self):
+        pkl = PKL(pkl_path)
+        dcp_path = tempfile.mkdtemp()
+        try:
+            assets = {
+                "01658edd-edfb-4c52-beec-1f5b9616e813": AssetData("cpl.xml", 1, 0, 8075),
+                "7ec59b28-8ef4-4963-88e8-9d0a08763b4a": AssetData("picture.mxf", 1, 0, 1335588317),
+            }
+            # Both files truncated, the size check fails without hashing
+            for asset in assets.values():
+                with open(os.path.join(dcp_path, asset.path), 'wb') as f:
+                    f.write(b"x")
+            with self.assertRaises(PKLValidationError) as cm:
+                pkl.validate_hashes(dcp_path, assets)
+            self.assertTrue("Size doesn't match" in str(cm.exception))
+        finally:
+            shutil.rmtree(dcp_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest, os, random, shutil, tempfile
+from smpteparsers.assetmap import AssetData
+from smpteparsers.pkl import PKLData, generate_hash
+from smpteparsers.pkl.quickcheck import QuickCheck, sample_offsets
+from smpteparsers.dcp.verify import SAMPLE, SIZE
+
+class TestQuickCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.dcp_path = os.path.join(self.tmp, "dcp")
+        os.mkdir(self.dcp_path)
+
+        self.assets = {}
+        self.pkl_assets = {}
+        for asset_id, name, size in [("cpl", "cpl.xml", 300), ("picture", "picture.mxf", 100 * 1024)]:
+            full_path = os.path.join(self.dcp_path, name)
+            with open(full_path, 'wb') as f:
+                f.write(os.urandom(size))
+            self.assets[asset_id] = AssetData(name, 1, 0, size)
+            self.pkl_assets[asset_id] = PKLData(generate_hash(full_path).decode("ascii"), str(size), "application/mxf")
+
+        self.quick = QuickCheck(os.path.join(self.tmp, "samples.db"), samples=4, block_size=1024, reads=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def overwrite(self, name, offset):
+        with open(os.path.join(self.dcp_path, name), 'r+b') as f:
+            f.seek(offset)
+            data = f.read(1)
+            f.seek(offset)
+            f.write(bytes(bytearray([(bytearray(data)[0] + 1) % 256])))
+
+    def test_sample_offsets(self):
+        self.assertEqual(sample_offsets(3000, samples=4, block_size=1024), [0, 1024, 2048])
+        self.assertEqual(sample_offsets(100 * 1024, samples=4, block_size=1024), [0, 20275, 40550, 60825, 81100, 101376])
+        self.assertEqual(sample_offsets(0), [])
+
+    def test_record_and_check(self):
+        report = self.quick.record(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertTrue(report.ok)
+        self.assertEqual(self.quick.get_records(["picture"])["picture"].offsets, sample_offsets(100 * 1024, 4, 1024))
+
+        report = self.quick.check(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.unrecorded, [])
+        # One block of the small file, two of the large one
+        self.assertEqual(report.sampled, 3)
+
+    def test_changed_block(self):
+        self.quick.record(self.dcp_path, self.assets, self.pkl_assets)
+        self.overwrite("picture.mxf", 100 * 1024 - 1)
+
+        # The last block may not be picked from the random reads, but it is when they're all read
+        report = self.quick.check(self.dcp_path, self.assets, self.pkl_assets, reads=0)
+        self.assertEqual([(i.asset_id, i.kind) for i in report.issues], [("picture", SAMPLE)])
+
+        found = False
+        rng = random.Random(1)
+        for _ in range(20):
+            found = found or not self.quick.check(self.dcp_path, self.assets, self.pkl_assets, rng=rng).ok
+        self.assertTrue(found)
+
+    def test_chunked(self):
+        full_path = os.path.join(self.dcp_path, "picture.mxf")
+        with open(full_path, 'rb') as f:
+            contents = f.read()
+        os.remove(full_path)
+        chunks = []
+        for index, offset in enumerate([0, 60 * 1024]):
+            name = "picture.mxf.{0}".format(index + 1)
+            with open(os.path.join(self.dcp_path, name), 'wb') as f:
+                f.write(contents[offset:offset + 60 * 1024])
+            chunks.append(AssetData(name, 1, offset, len(contents[offset:offset + 60 * 1024])))
+        self.assets["picture"] = chunks
+
+        self.assertTrue(self.quick.record(self.dcp_path, self.assets, self.pkl_assets).ok)
+        self.assertTrue(self.quick.check(self.dcp_path, self.assets, self.pkl_assets, reads=0).ok)
+
+        # The last block is in the second chunk
+        self.overwrite("picture.mxf.2", 40 * 1024 - 1)
+        report = self.quick.check(self.dcp_path, self.assets, self.pkl_assets, reads=0)
+        self.assertEqual([(i.asset_id, i.kind) for i in report.issues], [("picture", SAMPLE)])
+
+    def test_truncated(self):
+        self.quick.record(self.dcp_path, self.assets, self.pkl_assets)
+        with open(os.path.join(self.dcp_path, "picture.mxf"), 'r+b') as f:
+            f.truncate(1000)
+        report = self.quick.check(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertEqual([(i.asset_id, i.kind) for i in report.issues], [("picture", SIZE)])
+
+    def test_unrecorded(self):
+        report = self.quick.check(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertEqual(sorted(report.unrecorded), ["cpl", "picture"])
+
+        self.quick.record(self.dcp_path, self.assets, self.pkl_assets)
+        self.quick.forget(["cpl"])
+        # A new version of the PKL with a different hash needs recording again
+        self.pkl_assets["picture"] = PKLData("other", str(100 * 1024), "application/mxf")
+        report = self.quick.check(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertEqual(sorted(report.unrecorded), ["cpl", "picture"])
+
+    def test_not_recorded_when_invalid(self):
+        self.overwrite("cpl.xml", 0)
+        report = self.quick.record(self.dcp_path, self.assets, self.pkl_assets)
+        self.assertFalse(report.ok)
+        self.assertEqual(self.quick.get_records(["cpl", "picture"]), {})
+
+if __name__ == '__main__':
+    unittest.main()
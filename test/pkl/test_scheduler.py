@@ -0,0 +1,95 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.pkl import generate_hash
+from smpteparsers.pkl.scheduler import HashScheduler, HashCancelled, TokenBucket
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+class TestTokenBucket(unittest.TestCase):
+    def test_consume(self):
+        clock = FakeClock()
+        bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+
+        self.assertEqual(bucket.consume(100), 0)
+        self.assertEqual(bucket.consume(50), 0.5)
+        clock.now += 2
+        # Refilled, but only up to the burst
+        self.assertEqual(bucket.consume(100), 0)
+        self.assertEqual(bucket.consume(200), 2.0)
+        self.assertEqual(clock.slept, 2.5)
+
+    def test_unlimited(self):
+        bucket = TokenBucket(None)
+        self.assertEqual(bucket.consume(10 ** 12), 0)
+
+class TestHashScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = []
+        for n in range(4):
+            path = os.path.join(self.tmp, "{0}.mxf".format(n))
+            with open(path, 'wb') as f:
+                f.write(os.urandom(10 * 1024))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_rate(self):
+        clock = FakeClock()
+        scheduler = HashScheduler(bytes_per_second=1024, chunk_size=1024, clock=clock, sleep=clock.sleep)
+
+        self.assertEqual(scheduler.hash_file(self.paths[0]), generate_hash(self.paths[0]))
+        # Ten chunks at one a second, the first is within the burst
+        self.assertAlmostEqual(clock.slept, 9.0)
+        self.assertEqual(scheduler.bytes_hashed, 10 * 1024)
+        self.assertEqual(scheduler.files_hashed, 1)
+
+    def test_adapt(self):
+        clock = FakeClock()
+        scheduler = HashScheduler(bytes_per_second=1600, target_latency=0.1, clock=clock, sleep=clock.sleep)
+
+        scheduler._adapt(0.5)
+        self.assertEqual(scheduler.rate, 800)
+        for _ in range(10):
+            scheduler._adapt(0.5)
+        self.assertEqual(scheduler.rate, 100)
+
+        for _ in range(30):
+            scheduler._adapt(0.01)
+        self.assertEqual(scheduler.rate, 1600)
+
+    def test_background(self):
+        results = {}
+        def callback(key, path, digest, error):
+            results[key] = (digest, error)
+
+        scheduler = HashScheduler(max_readers=2, chunk_size=1024)
+        scheduler.pause()
+        scheduler.start(enumerate(self.paths + [os.path.join(self.tmp, "missing.mxf")]), callback=callback)
+        self.assertFalse(scheduler.join(0.1))
+        self.assertEqual(results, {})
+
+        scheduler.resume()
+        self.assertTrue(scheduler.join(5))
+        self.assertEqual(sorted(results), [0, 1, 2, 3, 4])
+        for n, path in enumerate(self.paths):
+            self.assertEqual(results[n], (generate_hash(path), None))
+        self.assertTrue(isinstance(results[4][1], (IOError, OSError)))
+
+    def test_cancel(self):
+        scheduler = HashScheduler(chunk_size=1024)
+        scheduler.cancel()
+        self.assertRaises(HashCancelled, scheduler.hash_file, self.paths[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest, datetime, io, os, shutil, tempfile
+from smpteparsers.pkl import PKL, PKLData, generate_hash
+from smpteparsers.pkl.writer import PKLWriter, describe_files, write_pkl, INTEROP_NS
+from smpteparsers.util import validate_xml
+
+schema_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))),
+                          'smpteparsers', 'pkl')
+pkl_schema = os.path.join(schema_dir, 'pkl.xsd')
+# The schema doesn't import the signature schema itself
+schema_imports = [{"namespace": "http://www.w3.org/2000/09/xmldsig#",
+                   "schemaLocation": u"/".join(os.path.join(schema_dir, 'sig.xsd').split(os.sep))}]
+
+class TestPKLWriter(unittest.TestCase):
+    def test_round_trip(self):
+        assets = [("01658edd-edfb-4c52-beec-1f5b9616e813", PKLData("3Xbz4m3yVrMnzX6bY1hJ2vXrVfI=", "8075", "text/xml;asdcpKind=CPL")),
+                  ("7ec59b28-8ef4-4963-88e8-9d0a08763b4a", PKLData("Xy8a1Yb6i2+e7nCgD3cvw1WQZkU=", 1335588317, "application/mxf"))]
+        out = io.BytesIO()
+        pkl_id = write_pkl(out, assets, issue_date=datetime.datetime(2013, 5, 1, 12, 30), namespace=INTEROP_NS)
+
+        validate_xml(pkl_schema, out.getvalue(), schema_imports)
+        pkl = PKL(out.getvalue())
+        self.assertEqual(pkl.id, pkl_id)
+        picture = pkl.assets["7ec59b28-8ef4-4963-88e8-9d0a08763b4a"]
+        self.assertEqual(picture.file_hash, "Xy8a1Yb6i2+e7nCgD3cvw1WQZkU=")
+        self.assertEqual(picture.size, "1335588317")
+        self.assertEqual(picture.file_type, "application/mxf")
+
+    def test_optional_elements(self):
+        out = io.BytesIO()
+        writer = PKLWriter(out, annotation_text="Feature")
+        writer.add("01658edd-edfb-4c52-beec-1f5b9616e813", PKLData("3Xbz4m3yVrMnzX6bY1hJ2vXrVfI=", "8075", "text/xml"),
+                   original_file_name="cpl.xml")
+        writer.close()
+
+        xml = out.getvalue()
+        self.assertTrue(b'xmlns="http://www.smpte-ra.org/schemas/429-8/2007/PKL"' in xml)
+        self.assertTrue(b"<AnnotationText>Feature</AnnotationText>" in xml)
+        self.assertTrue(b"<OriginalFileName>cpl.xml</OriginalFileName>" in xml)
+
+class TestDescribeFiles(unittest.TestCase):
+    def setUp(self):
+        self.dcp_path = tempfile.mkdtemp()
+        self.files = []
+        for i in range(20):
+            path = "asset{0}.mxf".format(i)
+            with open(os.path.join(self.dcp_path, path), 'wb') as f:
+                f.write(b"a" * (i * 100))
+            self.files.append(("id{0}".format(i), path, "application/mxf"))
+
+    def tearDown(self):
+        shutil.rmtree(self.dcp_path)
+
+    def test_in_order(self):
+        for workers in (1, 4):
+            described = list(describe_files(self.dcp_path, iter(self.files), workers=workers))
+            self.assertEqual([asset_id for asset_id, _, _ in described], [f[0] for f in self.files])
+            for (asset_id, asset_data, pkl_data), (_, path, _) in zip(described, self.files):
+                full_path = os.path.join(self.dcp_path, path)
+                self.assertEqual(asset_data.path, path)
+                self.assertEqual(asset_data.length, os.path.getsize(full_path))
+                self.assertEqual(pkl_data.size, str(asset_data.length))
+                self.assertEqual(pkl_data.file_hash, generate_hash(full_path).decode("ascii"))
+
+    def test_read_ahead_is_bounded(self):
+        consumed = []
+        def files():
+            for f in self.files:
+                consumed.append(f)
+                yield f
+
+        described = describe_files(self.dcp_path, files(), workers=2)
+        next(described)
+        self.assertTrue(len(consumed) <= 5)
+        described.close()
+
+    def test_missing_file(self):
+        self.files.append(("missing", "missing.mxf", "application/mxf"))
+        self.assertRaises(OSError, list, describe_files(self.dcp_path, self.files, workers=4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest, os
+from smpteparsers.cpl import CPL
+from smpteparsers.playlist import Playlist
+from smpteparsers.playlist.compiler import PlaylistCompiler, PlaylistCompileError
+
+cpl_path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'cpl', 'interop', 'success.xml')
+
+FEATURE_ID = "649a5ca6-95d9-4dab-ad21-7636a636ca54"
+HFR_ID = "649a5ca6-95d9-4dab-ad21-000000000048"
+MISSING_ID = "00000000-0000-0000-0000-100000000001"
+
+def load_cpls():
+    feature = CPL(cpl_path)
+
+    # The same 500 frame CPL at 48 fps
+    with open(cpl_path, 'rb') as f:
+        xml = f.read().replace(b"24 1", b"48 1").replace(FEATURE_ID.encode("ascii"), HFR_ID.encode("ascii"))
+    hfr = CPL()
+    hfr.fromstring(xml)
+    return {FEATURE_ID: feature, HFR_ID: hfr}
+
+def make_playlist(*cpl_ids):
+    return Playlist({
+        "title": "Test playlist",
+        "duration": 60,
+        "events": [{
+            "cpl_id": cpl_id,
+            "type": "composition",
+            "text": "Event {0}".format(n),
+            "duration_in_frames": 240,
+            "duration_in_seconds": 10,
+            "edit_rate": [24, 1]
+        } for n, cpl_id in enumerate(cpl_ids)]
+    })
+
+class TestPlaylistCompiler(unittest.TestCase):
+    def setUp(self):
+        self.cpls = load_cpls()
+        self.compiler = PlaylistCompiler(self.cpls)
+
+    def test_compile(self):
+        show = self.compiler.compile(make_playlist(FEATURE_ID, HFR_ID, FEATURE_ID))
+
+        self.assertEqual(show.edit_rate, (24, 1))
+        self.assertEqual([e.start_frame for e in show.events], [0, 500, 750])
+        self.assertEqual([e.start_seconds for e in show.events], [0.0, 500 / 24.0, 750 / 24.0])
+        self.assertEqual([e.edit_rate for e in show.events], [(24, 1), (48, 1), (24, 1)])
+        self.assertEqual([e.duration_in_frames for e in show.events], [500, 500, 500])
+        self.assertEqual(show.duration_in_frames, 1250)
+        self.assertEqual(show.duration_in_seconds, 1250 / 24.0)
+        self.assertTrue(show.events[1].cpl is self.cpls[HFR_ID])
+        self.assertEqual(show.unresolved, [])
+
+        self.assertEqual(show.event_at(499).index, 0)
+        self.assertEqual(show.event_at(500).index, 1)
+        self.assertEqual(show.event_at_seconds(40).index, 2)
+        self.assertRaises(IndexError, show.event_at, 1250)
+
+    def test_unresolved(self):
+        show = self.compiler.compile(make_playlist(MISSING_ID, FEATURE_ID))
+        self.assertEqual([e.resolved for e in show.events], [False, True])
+        self.assertEqual(show.events[1].start_frame, 240)
+        self.assertEqual(len(show.unresolved), 1)
+
+        strict = PlaylistCompiler(self.cpls, strict=True)
+        self.assertRaises(PlaylistCompileError, strict.compile, make_playlist(MISSING_ID))
+
+    def test_cpl_without_reels(self):
+        self.cpls[MISSING_ID] = CPL()
+        self.assertRaises(PlaylistCompileError, self.compiler.compile, make_playlist(MISSING_ID))
+
+    def test_cache(self):
+        playlist = make_playlist(FEATURE_ID, MISSING_ID)
+        show = self.compiler.compile(playlist)
+        self.assertTrue(self.compiler.compile(playlist) is show)
+
+        # Adding a missing CPL
+        self.cpls[MISSING_ID] = self.cpls[HFR_ID]
+        show = self.compiler.compile(playlist)
+        self.assertEqual(show.events[1].edit_rate, (48, 1))
+        self.assertTrue(self.compiler.compile(playlist) is show)
+
+        # Parsing a CPL again
+        self.cpls[FEATURE_ID].parse()
+        recompiled = self.compiler.compile(playlist)
+        self.assertFalse(recompiled is show)
+        self.assertEqual(recompiled.events[0].duration_in_frames, 500)
+
+        # Changing the events in place
+        playlist.events[1].cpl_id = FEATURE_ID
+        show = self.compiler.compile(playlist)
+        self.assertFalse(show is recompiled)
+        self.assertEqual(show.events[1].edit_rate, (24, 1))
+        playlist.events.append(playlist.events[0])
+        self.assertEqual(len(self.compiler.compile(playlist).events), 3)
+        recompiled = self.compiler.compile(playlist)
+
+        # Parsing the playlist again
+        playlist.parse()
+        self.assertFalse(self.compiler.compile(playlist) is recompiled)
+
+        show = self.compiler.compile(playlist)
+        self.compiler.invalidate(FEATURE_ID)
+        self.assertFalse(self.compiler.compile(playlist) is show)
+
+    def test_compile_all(self):
+        playlists = [make_playlist(FEATURE_ID), make_playlist(HFR_ID, FEATURE_ID)]
+        shows = self.compiler.compile_all(playlists)
+        # The second show takes the 48 fps edit rate of its first event
+        self.assertEqual([show.edit_rate for show in shows], [(24, 1), (48, 1)])
+        self.assertEqual([show.duration_in_frames for show in shows], [500, 500 + 1000])
+
+if __name__ == '__main__':
+    unittest.main()
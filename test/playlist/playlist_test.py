@@ -1,5 +1,5 @@
 import unittest, json, re
-from smpteparsers.playlist import Playlist, PlaylistValidationError
+from smpteparsers.playlist import Playlist, PlaylistValidationError, get_validator, validate_playlists
 
 uuid_re = re.compile("^[a-fA-F\d]{8}-[a-fA-F\d]{4}-[a-fA-F\d]{4}-[a-fA-F\d]{4}-[a-fA-F\d]{12}$")
 # Minimal info required for a playlist to be successful.
@@ -188,5 +188,23 @@ class TestPlaylist(unittest.TestCase):
         err_playlist["events"][0]["edit_rate"] = [24, 1]
         pl.parse(err_playlist)
 
+    def test_validator_cached(self):
+        self.assertTrue(get_validator() is get_validator())
+
+    def test_validate_playlists(self):
+        no_title = json.loads(success_playlist)
+        del(no_title["title"])
+        bad_events = json.loads(success_playlist)
+        bad_events["events"][0]["type"] = "pattern"
+        bad_events["events"][1]["edit_rate"] = [24]
+
+        errors = validate_playlists([success_playlist, no_title, Playlist(success_playlist), bad_events, "not json"])
+        self.assertEqual(sorted(errors.keys()), [1, 3, 4])
+        self.assertEqual(len(errors[1]), 1)
+        self.assertEqual(len(errors[3]), 2)
+        self.assertTrue(all(isinstance(e, PlaylistValidationError) for e in errors[3]))
+
+        self.assertEqual(validate_playlists([success_playlist] * 3), {})
+
 if __name__ == '__main__':
     unittest.main()
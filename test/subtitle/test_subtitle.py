@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import unittest, io, os, shutil, tempfile
+from smpteparsers.cpl import CPL
+from smpteparsers.subtitle import (parse_subtitles, parse_time, SubtitleReel, SubtitleTrack, Cue,
+                                   SubtitleError, INTEROP, SMPTE)
+
+INTEROP_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<DCSubtitle Version="1.0">
+  <SubtitleID>b6c1b7d0-4e2a-4b7e-9a53-8bbf1d3b2f10</SubtitleID>
+  <MovieTitle>Example</MovieTitle>
+  <ReelNumber>1</ReelNumber>
+  <Language>English</Language>
+  <LoadFont Id="Font1" URI="font.ttf"/>
+  <Font Id="Font1" Size="42">
+    <Subtitle SpotNumber="1" TimeIn="00:00:01:000" TimeOut="00:00:03:125" FadeUpTime="20" FadeDownTime="20">
+      <Text VAlign="bottom" VPosition="10">Hello <Font Italic="yes">there</Font></Text>
+    </Subtitle>
+    <Subtitle SpotNumber="3" TimeIn="00:00:02:000" TimeOut="00:00:02:125">
+      <Text VAlign="top" VPosition="10">Sign</Text>
+    </Subtitle>
+    <Subtitle SpotNumber="2" TimeIn="00:00:04.500" TimeOut="00:00:06.000">
+      <Image VAlign="bottom" VPosition="10">sub_0002.png</Image>
+    </Subtitle>
+  </Font>
+</DCSubtitle>
+"""
+
+SMPTE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<SubtitleReel xmlns="http://www.smpte-ra.org/schemas/428-7/2010/DCST">
+  <Id>urn:uuid:c0e5e0e2-7a8d-4d5b-8f5e-1f9d2c3b4a51</Id>
+  <ContentTitleText>Example</ContentTitleText>
+  <ReelNumber>2</ReelNumber>
+  <Language>fr</Language>
+  <EditRate>25 1</EditRate>
+  <TimeCodeRate>25</TimeCodeRate>
+  <StartTime>00:00:01:00</StartTime>
+  <LoadFont ID="Font1">urn:uuid:3dec6dc0-39d0-498d-97d0-928d2eb78391</LoadFont>
+  <SubtitleList>
+    <Font ID="Font1">
+      <Subtitle SpotNumber="1" TimeIn="00:00:02:05" TimeOut="00:00:03:00" FadeUpTime="00:00:00:00" FadeDownTime="00:00:00:00">
+        <Text Valign="bottom" Vposition="10">Bonjour</Text>
+        <Text Valign="bottom" Vposition="4">\xc3\xa0 tous</Text>
+      </Subtitle>
+    </Font>
+  </SubtitleList>
+</SubtitleReel>
+"""
+
+CPL_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<CompositionPlaylist xmlns="http://www.digicine.com/PROTO-ASDCP-CPL-20040511#">
+  <Id>urn:uuid:649a5ca6-95d9-4dab-ad21-7636a636ca54</Id>
+  <IssueDate>2013-02-19T15:57:55+00:00</IssueDate>
+  <ContentTitleText>Subtitles</ContentTitleText>
+  <ReelList>{reels}</ReelList>
+</CompositionPlaylist>
+"""
+
+REEL_XML = """
+    <Reel>
+      <Id>urn:uuid:00000000-0000-0000-0000-00000000000{n}</Id>
+      <AssetList>
+        <MainPicture>
+          <Id>urn:uuid:10000000-0000-0000-0000-00000000000{n}</Id>
+          <EditRate>24 1</EditRate>
+          <IntrinsicDuration>240</IntrinsicDuration>
+          <FrameRate>24 1</FrameRate>
+          <ScreenAspectRatio>1998 1080</ScreenAspectRatio>
+        </MainPicture>{subtitle}
+      </AssetList>
+    </Reel>"""
+
+SUBTITLE_XML = """
+        <MainSubtitle>
+          <Id>urn:uuid:20000000-0000-0000-0000-00000000000{n}</Id>
+          <EditRate>24 1</EditRate>
+          <IntrinsicDuration>480</IntrinsicDuration>
+          <EntryPoint>{entry}</EntryPoint>
+        </MainSubtitle>"""
+
+class TestParse(unittest.TestCase):
+    def test_interop(self):
+        reel = parse_subtitles(io.BytesIO(INTEROP_XML))
+
+        self.assertEqual(reel.standard, INTEROP)
+        self.assertEqual(reel.id, "b6c1b7d0-4e2a-4b7e-9a53-8bbf1d3b2f10")
+        self.assertEqual((reel.title, reel.reel_number, reel.language), ("Example", 1, "English"))
+        self.assertEqual(reel.fonts, {"Font1": "font.ttf"})
+        self.assertEqual([cue.spot_number for cue in reel.cues], [1, 3, 2])
+        self.assertEqual([(cue.start, cue.end) for cue in reel.cues], [(24, 84), (48, 60), (108, 144)])
+        self.assertEqual(reel.cues[0].texts, ["Hello there"])
+        self.assertEqual(reel.cues[2].images, ["sub_0002.png"])
+
+    def test_smpte(self):
+        reel = parse_subtitles(io.BytesIO(SMPTE_XML))
+
+        self.assertEqual(reel.standard, SMPTE)
+        self.assertEqual(reel.id, "c0e5e0e2-7a8d-4d5b-8f5e-1f9d2c3b4a51")
+        self.assertEqual(reel.edit_rate, (25, 1))
+        self.assertEqual(reel.fonts, {"Font1": "urn:uuid:3dec6dc0-39d0-498d-97d0-928d2eb78391"})
+        # From the StartTime
+        self.assertEqual([(cue.start, cue.end) for cue in reel.cues], [(30, 50)])
+        self.assertEqual(reel.cues[0].texts, [u"Bonjour", u"\xe0 tous"])
+
+    def test_edit_rate(self):
+        reel = parse_subtitles(io.BytesIO(INTEROP_XML), edit_rate=(48, 1))
+        self.assertEqual((reel.cues[0].start, reel.cues[0].end), (48, 168))
+
+    def test_invalid(self):
+        self.assertRaises(SubtitleError, parse_subtitles, io.BytesIO(b"<DCSubtitle>"))
+        self.assertRaises(SubtitleError, parse_subtitles, io.BytesIO(b"<CompositionPlaylist/>"))
+        self.assertRaises(SubtitleError, parse_subtitles,
+                          io.BytesIO(INTEROP_XML.replace(b'"00:00:02:125"', b'"2 seconds"')))
+
+    def test_parse_time(self):
+        self.assertEqual(parse_time("01:00:00:000", 250, (24, 1)), 86400)
+        self.assertEqual(parse_time("00:00:00:125", 250, (24, 1)), 12)
+        self.assertEqual(parse_time("00:00:01.5", 250, (24, 1)), 36)
+        self.assertEqual(parse_time("00:00:01:12", 24, (48, 1)), 72)
+
+class TestActive(unittest.TestCase):
+    def setUp(self):
+        self.reel = parse_subtitles(io.BytesIO(INTEROP_XML))
+
+    def spots(self, frame):
+        return [cue.spot_number for cue in self.reel.active(frame)]
+
+    def test_active(self):
+        self.assertEqual(self.spots(0), [])
+        self.assertEqual(self.spots(24), [1])
+        self.assertEqual(self.spots(49), [1, 3])
+        self.assertEqual(self.spots(60), [1])
+        self.assertEqual(self.spots(84), [])
+        self.assertEqual(self.spots(143), [2])
+        self.assertEqual(self.spots(144), [])
+
+    def test_long_cue_under_short_ones(self):
+        cues = [Cue(0, 1000, 1)] + [Cue(n * 10, n * 10 + 5, n + 1) for n in range(1, 50)]
+        reel = SubtitleReel(cues)
+        self.assertEqual([cue.spot_number for cue in reel.active(203)], [1, 21])
+        self.assertEqual([cue.spot_number for cue in reel.active(207)], [1])
+        self.assertEqual(reel.active(1000), [])
+
+    def test_next_change(self):
+        self.assertEqual(self.reel.next_change(0), 24)
+        self.assertEqual(self.reel.next_change(48), 60)
+        self.assertEqual(self.reel.next_change(60), 84)
+        self.assertEqual(self.reel.next_change(144), None)
+
+class TestSubtitleTrack(unittest.TestCase):
+    def setUp(self):
+        self.dcp_path = tempfile.mkdtemp()
+        with open(os.path.join(self.dcp_path, "reel2.xml"), 'wb') as f:
+            f.write(INTEROP_XML)
+
+    def tearDown(self):
+        shutil.rmtree(self.dcp_path)
+
+    def test_from_cpl(self):
+        cpl = CPL()
+        cpl.fromstring(CPL_XML.format(reels=REEL_XML.format(n=1, subtitle="") +
+                                      REEL_XML.format(n=2, subtitle=SUBTITLE_XML.format(n=2, entry=24))))
+        cpl.assets["20000000-0000-0000-0000-000000000002"].path = "reel2.xml"
+        track = SubtitleTrack.from_cpl(cpl, self.dcp_path)
+
+        self.assertEqual(track.active(30), [])
+        # Reel 2 starts at 240, 24 frames into the subtitles
+        self.assertEqual(track.active(239), [])
+        self.assertEqual([cue.spot_number for cue in track.active(240)], [1])
+        self.assertEqual([cue.spot_number for cue in track.active(240 + 25)], [1, 3])
+        self.assertRaises(IndexError, track.active, 480)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from smpteparsers.util.cache import lru_cache
+
+class TestLRUCache(unittest.TestCase):
+    def test_least_recently_used_evicted(self):
+        calls = []
+        @lru_cache(maxsize=2)
+        def double(x):
+            calls.append(x)
+            return x * 2
+
+        for x in (1, 2, 1, 3, 2, 1, 1):
+            self.assertEqual(double(x), x * 2)
+        # 2 is evicted by 3 as 1 was used more recently, then 1 by 2 and 3 by 1
+        self.assertEqual(calls, [1, 2, 3, 2, 1])
+
+        double.cache_clear()
+        double(1)
+        self.assertEqual(calls, [1, 2, 3, 2, 1, 1])
+        self.assertEqual(double.__wrapped__(4), 8)
+
+    def test_unbounded(self):
+        calls = []
+        @lru_cache(maxsize=None)
+        def add(x, y=0):
+            calls.append((x, y))
+            return x + y
+
+        for x in range(100):
+            add(x, y=1)
+        for x in range(100):
+            self.assertEqual(add(x, y=1), x + 1)
+        self.assertEqual(len(calls), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest, time
+import pytz
+from datetime import datetime, timedelta
+from smpteparsers.util import date_utils
+from smpteparsers.util.date_utils import parse_date
+
+class TestParseDate(unittest.TestCase):
+
+    def setUp(self):
+        parse_date.cache_clear()
+
+    def test_offsets(self):
+        self.assertEqual(parse_date('2013-02-19T15:57:55+00:00'), datetime(2013, 2, 19, 15, 57, 55))
+        self.assertEqual(parse_date('2013-02-19T15:57:55+01:00'), datetime(2013, 2, 19, 14, 57, 55))
+        self.assertEqual(parse_date('2013-02-19T15:57:55-05:30'), datetime(2013, 2, 19, 21, 27, 55))
+        self.assertEqual(parse_date('2013-02-19T15:57:55Z'), datetime(2013, 2, 19, 15, 57, 55))
+        self.assertEqual(parse_date('2013-12-31T23:30:00-01:00'), datetime(2014, 1, 1, 0, 30, 0))
+
+    def test_utc_without_offset(self):
+        self.assertEqual(parse_date('2013-02-19T15:57:55', False), datetime(2013, 2, 19, 15, 57, 55))
+        self.assertEqual(parse_date('2013-02-19 15:57:55', False), datetime(2013, 2, 19, 15, 57, 55))
+
+    def test_general_forms(self):
+        self.assertEqual(parse_date('20130219T155755Z'), datetime(2013, 2, 19, 15, 57, 55))
+        self.assertEqual(parse_date('2013-02-19T15:57:55.123+01:00'), datetime(2013, 2, 19, 14, 57, 55))
+        self.assertEqual(parse_date('2013-02-19', False), datetime(2013, 2, 19))
+        self.assertEqual(parse_date('2013-02-19T24:00:00Z'), datetime(2013, 2, 20))
+
+    def test_fast_path_matches_general(self):
+        for s in ('2013-02-19T15:57:55+00:00', '2013-02-19T15:57:55-08:00', '2000-02-29T00:00:00+13:45',
+                  '2013-02-19T15:57:55Z', '1999-12-31 23:59:59+02:00'):
+            self.assertEqual(date_utils._parse_date_fast(s, True), date_utils._parse_date_general(s, True))
+
+    def test_fast_path_falls_back(self):
+        for s in ('2013-02-19T15:57:55', '2013-02-19T24:00:00Z', '2013-02-19T15:57:55.5Z',
+                  '20130219T155755Z', '2013-02-19T15:57:55+0100', '+013-02-19T15:57:55Z'):
+            self.assertEqual(date_utils._parse_date_fast(s, True), None)
+
+    def test_local_time(self):
+        expected = datetime.utcfromtimestamp(time.mktime((2013, 2, 19, 15, 57, 55, 0, 0, -1)))
+        self.assertEqual(parse_date('2013-02-19T15:57:55'), expected)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, parse_date, 'not a date')
+        self.assertRaises(ValueError, parse_date, '')
+        self.assertRaises(ValueError, parse_date, '2013-13-19T15:57:55Z')
+
+    def test_memoised(self):
+        first = parse_date('2013-02-19T15:57:55+01:00')
+        self.assertTrue(parse_date('2013-02-19T15:57:55+01:00') is first)
+
+class TestBatchTimezones(unittest.TestCase):
+
+    def test_posix_to_local_datetimes(self):
+        # Either side of the 2013 European spring and autumn changes
+        timestamps = [1364691599, 1364691600, 1382835599, 1382835600, 1382835600.5]
+        for tz_name in ('Europe/London', 'America/New_York', 'Asia/Kolkata', 'UTC'):
+            expected = [date_utils.posix_to_local_datetime(t, tz_name) for t in timestamps]
+            converted = date_utils.posix_to_local_datetimes(timestamps, tz_name)
+            self.assertEqual(converted, expected)
+            self.assertEqual([d.tzname() for d in converted], [d.tzname() for d in expected])
+
+    def test_local_datetimes_to_posix(self):
+        start = datetime(2013, 3, 30)
+        local_datetimes = [start + timedelta(minutes=30 * i) for i in range(96)]
+        for tz_name in ('Europe/London', 'America/New_York', 'UTC'):
+            expected = [date_utils.local_datetime_to_posix(d, tz_name) for d in local_datetimes]
+            self.assertEqual(date_utils.local_datetimes_to_posix(local_datetimes, tz_name), expected)
+
+    def test_ambiguous_and_missing_times(self):
+        # 01:30 happens twice on 2013-10-27 in London and doesn't happen on 2013-03-31
+        local_datetimes = [datetime(2013, 10, 27, 1, 30), datetime(2013, 3, 31, 1, 30)]
+        expected = [date_utils.local_datetime_to_posix(d, 'Europe/London') for d in local_datetimes]
+        self.assertEqual(date_utils.local_datetimes_to_posix(local_datetimes, 'Europe/London'), expected)
+        self.assertEqual(date_utils.datetime_tz_offsets(local_datetimes, 'Europe/London'),
+                         [date_utils.datetime_tz_offset(d, 'Europe/London') for d in local_datetimes])
+
+    def test_datetime_tz_offsets(self):
+        local_datetimes = [datetime(2013, 1, 1, 12), datetime(2013, 7, 1, 12)]
+        self.assertEqual(date_utils.datetime_tz_offsets(local_datetimes, 'Europe/London'), ['+0000', '+0100'])
+        self.assertEqual(date_utils.datetime_tz_offsets(local_datetimes, 'America/New_York'), ['-0500', '-0400'])
+
+    def test_without_transition_attributes(self):
+        # A pytz without the private attributes the transition tables are built from
+        class Stripped(pytz.tzinfo.DstTzInfo):
+            def __init__(self, tz):
+                pass
+            def missing(self):
+                raise AttributeError("Not in this version of pytz")
+            _utc_transition_times = _transition_info = property(missing)
+
+        timestamps = [1364691599, 1364691600, 1382835599, 1382835600]
+        local_datetimes = [datetime(2013, 1, 1, 12), datetime(2013, 7, 1, 12), datetime(2013, 10, 27, 1, 30)]
+        expected = (date_utils.posix_to_local_datetimes(timestamps, 'Europe/London'),
+                    date_utils.local_datetimes_to_posix(local_datetimes, 'Europe/London'),
+                    date_utils.datetime_tz_offsets(local_datetimes, 'Europe/London'))
+
+        table_class = date_utils._TransitionTable
+        date_utils._TransitionTable = lambda tz: table_class(Stripped(tz))
+        date_utils._transition_table.cache_clear()
+        try:
+            self.assertEqual(date_utils._transition_table('Europe/London'), None)
+            self.assertEqual((date_utils.posix_to_local_datetimes(timestamps, 'Europe/London'),
+                              date_utils.local_datetimes_to_posix(local_datetimes, 'Europe/London'),
+                              date_utils.datetime_tz_offsets(local_datetimes, 'Europe/London')), expected)
+        finally:
+            date_utils._TransitionTable = table_class
+            date_utils._transition_table.cache_clear()
+
+if __name__ == '__main__':
+    unittest.main()
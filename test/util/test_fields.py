@@ -0,0 +1,82 @@
+import unittest
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from smpteparsers.util.fields import Field, FieldMap, FieldError, urn_uuid, int_tuple
+
+NS = "http://example.com/ns"
+OTHER_NS = "http://example.com/other"
+
+XML = """<Asset xmlns="http://example.com/ns" xmlns:o="http://example.com/other">
+  <Id>urn:uuid:fe3c6d6d-d36f-447b-aa19-af28955880bd</Id>
+  <AnnotationText/>
+  <EditRate>24 1</EditRate>
+  <Duration>500</Duration>
+  <Duration>600</Duration>
+  <Chunk>a</Chunk>
+  <Chunk>b</Chunk>
+  <o:Extra>other</o:Extra>
+</Asset>"""
+
+class TestFieldMap(unittest.TestCase):
+
+    def setUp(self):
+        self.root = ET.fromstring(XML)
+        self.fields = FieldMap(
+            Field("Id", "id", convert=urn_uuid, required=True),
+            Field("AnnotationText", "annotation_text"),
+            Field("EditRate", "edit_rate", convert=int_tuple),
+            Field("Duration", "duration", convert=int),
+            Field("EntryPoint", "entry_point", convert=int),
+            Field("Chunk", "chunks", many=True),
+            Field("Extra", "extra", namespace=OTHER_NS),
+        )
+
+    def test_extract(self):
+        values = self.fields.extract(self.root, NS)
+        self.assertEqual(values["id"], "fe3c6d6d-d36f-447b-aa19-af28955880bd")
+        self.assertEqual(values["edit_rate"], (24, 1))
+        self.assertEqual(values["extra"], "other")
+        self.assertEqual(values["chunks"], ["a", "b"])
+
+    def test_findtext_semantics(self):
+        values = self.fields.extract(self.root, NS)
+        # Missing elements are None, empty ones '' and the first of repeated elements wins
+        self.assertEqual(values["entry_point"], None)
+        self.assertEqual(values["annotation_text"], "")
+        self.assertEqual(values["duration"], 500)
+
+    def test_target(self):
+        class Target(object):
+            pass
+        target = Target()
+        self.fields.extract(self.root, NS, target=target)
+        self.assertEqual(target.duration, 500)
+        self.assertEqual(target.entry_point, None)
+
+    def test_elements(self):
+        fields = FieldMap(Field("Chunk", "chunks", element=True, many=True))
+        chunks = fields.extract(self.root, NS)["chunks"]
+        self.assertEqual([chunk.text for chunk in chunks], ["a", "b"])
+        self.assertEqual(FieldMap(Field("Missing", "missing", many=True)).extract(self.root, NS)["missing"], [])
+
+    def test_extend(self):
+        fields = FieldMap(Field("Id", "id")).extend(Field("Duration", "duration", convert=int))
+        self.assertEqual(fields.extract(self.root, NS), {"id": "urn:uuid:fe3c6d6d-d36f-447b-aa19-af28955880bd", "duration": 500})
+
+    def test_required(self):
+        fields = FieldMap(Field("EntryPoint", "entry_point", required=True))
+        self.assertRaises(FieldError, fields.extract, self.root, NS)
+
+    def test_invalid(self):
+        self.assertRaises(FieldError, FieldMap(Field("EditRate", "edit_rate", convert=int)).extract, self.root, NS)
+        self.assertRaises(FieldError, FieldMap(Field("AnnotationText", "id", convert=urn_uuid)).extract, self.root, NS)
+
+    def test_wrong_namespace(self):
+        values = FieldMap(Field("Duration", "duration")).extract(self.root, OTHER_NS)
+        self.assertEqual(values["duration"], None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.assetmap import Assetmap, AssetData
+from smpteparsers.util.files import DirectoryListing
+
+class TestDirectoryListing(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.path = tempfile.mkdtemp()
+        os.chdir(self.path)
+        os.mkdir("reel")
+        for path, size in [("a1", 5), (os.path.join("reel", "a2"), 7)]:
+            with open(path, 'wb') as f:
+                f.write(b"x" * size)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.path)
+
+    def test_size(self):
+        listing = DirectoryListing()
+        self.assertEqual(listing.size(os.path.join(self.path, "a1")), 5)
+        self.assertEqual(listing.size(os.path.join(self.path, "reel", "a2")), 7)
+        self.assertEqual(listing.size(os.path.join(self.path, "missing")), None)
+        self.assertEqual(listing.size(os.path.join(self.path, "reel")), None)
+
+    def test_not_listed(self):
+        listing = DirectoryListing()
+        self.assertEqual(listing.size("a1"), 5)
+
+        # Not in the listing as given, as for a different case on a case-insensitive filesystem
+        with open("a3", 'wb') as f:
+            f.write(b"x" * 3)
+        self.assertEqual(listing.size("a3"), 3)
+
+    def test_relative_paths(self):
+        listing = DirectoryListing()
+        self.assertEqual(listing.size("a1"), 5)
+        self.assertEqual(listing.size(os.path.join(".", "a1")), 5)
+        self.assertEqual(listing.size(os.path.join("reel", "a2")), 7)
+        self.assertTrue(listing.exists("a1"))
+        self.assertFalse(listing.exists("missing"))
+
+    def test_validate_files_in_current_directory(self):
+        assetmap = Assetmap(None, parse=False)
+        assetmap.assets = {"a1": AssetData("a1", 1, 0, 5)}
+        for dcp_path in ("", "."):
+            assetmap.validate_files(dcp_path)
+
+if __name__ == '__main__':
+    unittest.main()
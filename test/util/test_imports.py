@@ -0,0 +1,25 @@
+import unittest, json, subprocess, sys
+
+SCRIPT = """
+import json, sys
+import {module}
+print(json.dumps([name for name in {names!r} if name in sys.modules]))
+"""
+
+def loaded(module, names):
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT.format(module=module, names=names)])
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+class TestLazyImports(unittest.TestCase):
+    def test_dcp_parsers(self):
+        for module in ("smpteparsers.util", "smpteparsers.cpl", "smpteparsers.pkl", "smpteparsers.dcp"):
+            self.assertEqual(loaded(module, ("lxml.etree", "requests", "bs4", "jsonschema")), [], module)
+
+    def test_flmx(self):
+        self.assertEqual(loaded("smpteparsers.flmx", ("requests", "bs4", "asyncio", "jsonschema")), [])
+
+    def test_playlist(self):
+        self.assertEqual(loaded("smpteparsers.playlist", ("jsonschema", "lxml.etree")), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest, os, mmap, tempfile
+from io import BytesIO
+from lxml import etree
+
+from smpteparsers.util import parse_xml, validate_xml, get_schema, is_xml_content
+
+XML = b'<?xml version="1.0" encoding="UTF-8"?>\n<!-- comment --><Root xmlns="http://example.com/ns"><Id>1</Id></Root>'
+
+class TestParseXML(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.xml')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(XML)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def assert_root(self, root):
+        self.assertEqual(root.tag, '{http://example.com/ns}Root')
+        self.assertEqual([child.text for child in root], ['1'])
+
+    def test_path(self):
+        self.assert_root(parse_xml(self.path))
+
+    def test_bytes(self):
+        self.assert_root(parse_xml(XML))
+        self.assert_root(parse_xml(b'\xef\xbb\xbf' + XML))
+
+    def test_text(self):
+        self.assert_root(parse_xml(XML.decode('utf-8')))
+
+    def test_buffers(self):
+        self.assert_root(parse_xml(bytearray(XML)))
+        self.assert_root(parse_xml(memoryview(XML)))
+
+    def test_file_objects(self):
+        self.assert_root(parse_xml(BytesIO(XML)))
+        with open(self.path, 'rb') as f:
+            self.assert_root(parse_xml(f))
+        with open(self.path, 'rb') as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self.assert_root(parse_xml(m))
+            finally:
+                m.close()
+
+    def test_from_path(self):
+        self.assertRaises(IOError, parse_xml, XML.decode('utf-8'), from_path=True)
+
+    def test_is_xml_content(self):
+        self.assertTrue(is_xml_content(XML))
+        self.assertTrue(is_xml_content(u'  <Root/>'))
+        self.assertFalse(is_xml_content(u'/tmp/ASSETMAP'))
+        self.assertFalse(is_xml_content(b'ASSETMAP.xml'))
+
+    def test_malformed(self):
+        self.assertRaises(etree.XMLSyntaxError, parse_xml, b'<Root>')
+        self.assertRaises(etree.XMLSyntaxError, parse_xml, memoryview(b'<Root>'))
+
+    def test_external_entity(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'secret')
+        xml = (b'<!DOCTYPE Root [<!ENTITY file SYSTEM "' + self.path.encode('utf-8') + b'">]>'
+               b'<Root><Id>&file;</Id></Root>')
+        root = parse_xml(xml)
+        self.assertFalse('secret' in etree.tostring(root).decode('utf-8'))
+
+class TestValidateXML(unittest.TestCase):
+    xsd = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                       'smpteparsers', 'assetmap', 'am.xsd')
+
+    def test_schema_cached(self):
+        self.assertTrue(get_schema(self.xsd) is get_schema(self.xsd))
+
+    def test_invalid(self):
+        self.assertRaises(etree.XMLSyntaxError, validate_xml, self.xsd, XML)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest, os
+from smpteparsers.util import profiling
+from smpteparsers.cpl import CPL
+
+cpl_path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'cpl', 'interop', 'success.xml')
+
+class TestProfiling(unittest.TestCase):
+
+    def tearDown(self):
+        profiling.clear_sinks()
+
+    def test_disabled(self):
+        self.assertFalse(profiling.enabled())
+        span = profiling.span("test")
+        self.assertTrue(span is profiling.span("other"))
+        with span:
+            pass
+        profiling.count("test")
+
+    def test_aggregator(self):
+        stats = profiling.Aggregator()
+        profiling.add_sink(stats)
+        for _ in range(3):
+            with profiling.span("test"):
+                pass
+        profiling.count("things", 2)
+        profiling.count("things")
+
+        self.assertEqual(stats.timings["test"].count, 3)
+        self.assertTrue(stats.timings["test"].max >= stats.timings["test"].min >= 0)
+        self.assertEqual(stats.counters, {"things": 3})
+        self.assertTrue("test" in stats.report())
+
+        stats.reset()
+        self.assertEqual(stats.counters, {})
+
+    def test_remove_sink(self):
+        stats = profiling.Aggregator()
+        profiling.add_sink(stats)
+        profiling.remove_sink(stats)
+        profiling.count("things")
+        self.assertEqual(stats.counters, {})
+        self.assertFalse(profiling.enabled())
+
+    def test_statsd(self):
+        lines = []
+        profiling.add_sink(profiling.StatsdSink(lines.append, prefix="dcp"))
+        profiling.count("things", 5)
+        with profiling.span("test"):
+            pass
+        self.assertEqual(lines[0], "dcp.things:5|c")
+        self.assertTrue(lines[1].startswith("dcp.test:") and lines[1].endswith("|ms"))
+
+    def test_parser_spans(self):
+        stats = profiling.Aggregator()
+        profiling.add_sink(stats)
+        CPL(cpl_path)
+
+        self.assertEqual(set(stats.timings), set(["cpl.parse", "cpl.build"]))
+        self.assertEqual(stats.counters["cpl.reels"], 1)
+        self.assertEqual(stats.counters["xml.bytes"], os.path.getsize(cpl_path))
+        self.assertTrue(stats.counters["xml.elements"] > 0)
+
+if __name__ == '__main__':
+    unittest.main()
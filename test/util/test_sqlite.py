@@ -0,0 +1,38 @@
+import unittest, os, shutil, tempfile
+from smpteparsers.util.sqlite import connection, transaction
+
+class TestSqlite(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "test.db")
+        with connection(self.path) as conn:
+            conn.execute("CREATE TABLE items (name TEXT PRIMARY KEY)")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def names(self):
+        with connection(self.path) as conn:
+            return [row[0] for row in conn.execute("SELECT name FROM items ORDER BY name")]
+
+    def test_commit(self):
+        with transaction(self.path) as conn:
+            conn.execute("INSERT INTO items VALUES ('a')")
+            conn.execute("INSERT INTO items VALUES ('b')")
+        self.assertEqual(self.names(), ["a", "b"])
+
+    def test_rollback(self):
+        def insert():
+            with transaction(self.path) as conn:
+                conn.execute("INSERT INTO items VALUES ('a')")
+                conn.execute("INSERT INTO items VALUES ('a')")
+        self.assertRaises(Exception, insert)
+        self.assertEqual(self.names(), [])
+
+        # The lock was released
+        with transaction(self.path, timeout=0) as conn:
+            conn.execute("INSERT INTO items VALUES ('b')")
+        self.assertEqual(self.names(), ["b"])
+
+if __name__ == '__main__':
+    unittest.main()